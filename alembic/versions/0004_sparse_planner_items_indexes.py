@@ -0,0 +1,43 @@
+"""sparse_planner_items_indexes
+
+Revision ID: d6c4b7fc2033
+Revises: 92301a4a3004
+Create Date: 2026-10-17 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6c4b7fc2033'
+down_revision: Union[str, None] = '92301a4a3004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# keep in sync with app.const.planner.PLANNER_ITEM_INDEX_STEP
+PLANNER_ITEM_INDEX_STEP = 1024
+
+
+def renumber_indexes(table_name: str, partition_by: str, step: int) -> None:
+    """ Renumbers items indexes within each day / agenda keeping their order """
+    op.execute(f"""
+        UPDATE {table_name}
+        SET "index" = ranked.position * {step}
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY {partition_by} ORDER BY "index", id) - 1 AS position
+            FROM {table_name}
+        ) AS ranked
+        WHERE {table_name}.id = ranked.id
+    """)
+
+
+def upgrade() -> None:
+    renumber_indexes('planner_day_items', 'user_id, day', PLANNER_ITEM_INDEX_STEP)
+    renumber_indexes('planner_agenda_items', 'user_id, agenda_id', PLANNER_ITEM_INDEX_STEP)
+
+
+def downgrade() -> None:
+    renumber_indexes('planner_day_items', 'user_id, day', 1)
+    renumber_indexes('planner_agenda_items', 'user_id, agenda_id', 1)
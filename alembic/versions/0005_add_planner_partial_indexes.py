@@ -0,0 +1,45 @@
+"""add_planner_partial_indexes
+
+Revision ID: 89afe82f5e5b
+Revises: d6c4b7fc2033
+Create Date: 2026-10-17 11:02:17.830214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '89afe82f5e5b'
+down_revision: Union[str, None] = 'd6c4b7fc2033'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PLANNER_INDEXES = (
+    ('idx_planner_day_items_user_day_index', 'planner_day_items', ['user_id', 'day', 'index']),
+    ('idx_planner_agenda_items_agenda_index', 'planner_agenda_items', ['agenda_id', 'index']),
+    ('idx_planner_agendas_user_type_index', 'planner_agendas', ['user_id', 'agenda_type', 'index']),
+)
+
+
+def upgrade() -> None:
+    # create indexes concurrently to avoid locking planner tables for writes
+    with op.get_context().autocommit_block():
+        for index_name, table_name, columns in PLANNER_INDEXES:
+            op.create_index(
+                index_name,
+                table_name,
+                columns,
+                unique=False,
+                postgresql_where=sa.text('is_deleted IS false'),
+                postgresql_concurrently=True,
+                sqlite_where=sa.text('is_deleted IS 0'),
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table_name, _ in PLANNER_INDEXES:
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
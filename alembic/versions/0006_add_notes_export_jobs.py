@@ -0,0 +1,52 @@
+"""add_notes_export_jobs
+
+Revision ID: 3f1a9c2e7b64
+Revises: 89afe82f5e5b
+Create Date: 2026-10-17 14:21:05.417302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2e7b64'
+down_revision: Union[str, None] = '89afe82f5e5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notes_export_jobs',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('export_type', sa.String(length=32), nullable=False),
+    sa.Column('export_target', sa.String(length=32), nullable=False),
+    sa.Column('export_target_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=32), nullable=False),
+    sa.Column('notes_total', sa.Integer(), nullable=False),
+    sa.Column('notes_done', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('filename', sa.String(length=256), nullable=True),
+    sa.Column('file_path', sa.String(length=1024), nullable=True),
+    sa.Column('file_size', sa.BigInteger(), nullable=True),
+    sa.Column('expires_dt', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_dt', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_dt', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('deleted_dt', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notes_export_jobs_expires_dt'), 'notes_export_jobs', ['expires_dt'], unique=False)
+    op.create_index(op.f('ix_notes_export_jobs_id'), 'notes_export_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_notes_export_jobs_user_id'), 'notes_export_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_notes_export_jobs_user_id'), table_name='notes_export_jobs')
+    op.drop_index(op.f('ix_notes_export_jobs_id'), table_name='notes_export_jobs')
+    op.drop_index(op.f('ix_notes_export_jobs_expires_dt'), table_name='notes_export_jobs')
+    op.drop_table('notes_export_jobs')
@@ -0,0 +1,54 @@
+"""add_change_seq
+
+Revision ID: 5b8e2d41c9a7
+Revises: 3f1a9c2e7b64
+Create Date: 2026-10-17 16:40:12.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2d41c9a7'
+down_revision: Union[str, None] = '3f1a9c2e7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_TRACKED_TABLES = (
+    'planner_day_items',
+    'planner_agendas',
+    'planner_agenda_items',
+    'notes_folders',
+    'notes',
+)
+
+
+def upgrade() -> None:
+    # existing rows get 0 and are returned by the initial full sync
+    op.add_column('users', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    for table_name in CHANGE_TRACKED_TABLES:
+        op.add_column(table_name, sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+
+    # create indexes concurrently to avoid locking tables for writes
+    with op.get_context().autocommit_block():
+        for table_name in CHANGE_TRACKED_TABLES:
+            op.create_index(
+                f'idx_{table_name}_user_change_seq',
+                table_name,
+                ['user_id', 'change_seq'],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table_name in CHANGE_TRACKED_TABLES:
+            op.drop_index(f'idx_{table_name}_user_change_seq', table_name=table_name, postgresql_concurrently=True)
+
+    for table_name in CHANGE_TRACKED_TABLES:
+        op.drop_column(table_name, 'change_seq')
+    op.drop_column('users', 'change_seq')
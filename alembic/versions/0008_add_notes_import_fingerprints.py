@@ -0,0 +1,50 @@
+"""add_notes_import_fingerprints
+
+Revision ID: 7c3f5a9e1d28
+Revises: 5b8e2d41c9a7
+Create Date: 2026-10-17 19:05:41.638210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f5a9e1d28'
+down_revision: Union[str, None] = '5b8e2d41c9a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notes_import_fingerprints',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('folder_id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(length=1024), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('note_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_dt', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_dt', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('deleted_dt', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['folder_id'], ['notes_folders.id'], ),
+    sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notes_import_fingerprints_id'), 'notes_import_fingerprints', ['id'], unique=False)
+    op.create_index(
+        'idx_notes_import_fingerprints_user_folder_path',
+        'notes_import_fingerprints',
+        ['user_id', 'folder_id', 'path'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notes_import_fingerprints_user_folder_path', table_name='notes_import_fingerprints')
+    op.drop_index(op.f('ix_notes_import_fingerprints_id'), table_name='notes_import_fingerprints')
+    op.drop_table('notes_import_fingerprints')
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.http_utils import is_etag_matched, make_etag, not_modified_response, set_etag
 from app.schemas.notes import NoteSchema, NoteCreateSchema, NoteUpdateSchema
 from app.schemas.user import UserSchema
 from app.services.auth_service import AuthService
@@ -23,12 +24,20 @@ def create_note(
 @router.get("/{note_id}/", response_model=NoteSchema)
 def get_note(
     note_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: UserSchema = Depends(AuthService.get_current_user)
+    current_user: UserSchema = Depends(AuthService.get_current_user_readonly)
 ):
     note = NoteService.get_note(db, note_id=note_id, user_id=current_user.id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
+
+    etag = make_etag(note.id, note.updated_dt.isoformat())
+    if is_etag_matched(request, etag):
+        return not_modified_response(etag)
+
+    set_etag(response, etag)
     return note
 
 
@@ -1,11 +1,14 @@
-from fastapi import Depends, HTTPException, APIRouter, Query
-from fastapi.responses import Response, StreamingResponse
+from fastapi import BackgroundTasks, Depends, HTTPException, APIRouter, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.const.notes import ExportTarget, EXPORT_MEDIA_TYPE_MAP, ExportType
 from app.core.database import get_db
+from app.core.db_utils import run_in_new_session
+from app.schemas.notes_export import NotesExportJobCreateSchema, NotesExportJobSchema
 from app.schemas.user import UserSchema
 from app.services.auth_service import AuthService
+from app.services.notes_export_job_service import NotesExportJobService
 from app.services.notes_export_service import NotesExportService
 
 router = APIRouter()
@@ -37,23 +40,74 @@ def notes_export(
             headers={'Content-Disposition': f'attachment; filename={filename}'}
         )
     elif export_target == ExportTarget.FOLDER_NOTES and export_target_id:
-        zip_buffer, filename = NotesExportService.export_folder(
+        zip_chunks, filename = NotesExportService.export_folder(
             db,
             user_id=current_user.id,
             folder_id=export_target_id,
             export_type=export_type
         )
-        if not zip_buffer:
+        if not zip_chunks:
             raise HTTPException(status_code=404, detail='Folder not found')
     elif export_target == ExportTarget.ALL_NOTES:
-        zip_buffer, filename = NotesExportService.export_all_notes(
+        zip_chunks, filename = NotesExportService.export_all_notes(
             db, user_id=current_user.id, export_type=export_type
         )
+        if not zip_chunks:
+            raise HTTPException(status_code=404, detail='Notes not found')
     else:
         raise HTTPException(status_code=400, detail='Invalid request')
 
     return StreamingResponse(
-        zip_buffer,
+        zip_chunks,
         media_type='application/x-zip-compressed',
         headers={'Content-Disposition': f'attachment; filename={filename}'}
     )
+
+
+@router.post('/jobs/', response_model=NotesExportJobSchema)
+def create_export_job(
+    create_data: NotesExportJobCreateSchema,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user)
+):
+    """
+    Starts folder or all notes export in a background worker.
+    Poll the job status and download the archive when the job is completed.
+    """
+    if create_data.export_target == ExportTarget.SINGLE_NOTE:
+        raise HTTPException(status_code=400, detail='Single notes are exported directly')
+
+    job = NotesExportJobService.create_job(db, user_id=current_user.id, create_data=create_data)
+    if not job:
+        raise HTTPException(status_code=404, detail='Folder not found')
+
+    NotesExportJobService.submit_job(db.get_bind(), job.id)
+    background_tasks.add_task(run_in_new_session, db.get_bind(), NotesExportJobService.cleanup_expired_jobs)
+    return job
+
+
+@router.get('/jobs/{job_id}/', response_model=NotesExportJobSchema)
+def get_export_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user)
+):
+    job = NotesExportJobService.get_job(db, job_id=job_id, user_id=current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Export job not found')
+    return job
+
+
+@router.get('/jobs/{job_id}/download/')
+def download_export_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user)
+):
+    """ Serves the job archive, supports Range requests to resume interrupted downloads """
+    job = NotesExportJobService.get_downloadable_job(db, job_id=job_id, user_id=current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Export archive not found')
+
+    return FileResponse(job.file_path, media_type='application/x-zip-compressed', filename=job.filename)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.http_utils import is_etag_matched, make_etag, not_modified_response, set_etag
 from app.schemas.notes_folders import (
     NotesFolderSchema,
     NotesFolderCreateSchema,
@@ -17,9 +18,16 @@ router = APIRouter()
 
 @router.get("/", response_model=GetFolderrsResponseSchema)
 def get_folders(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: UserSchema = Depends(AuthService.get_current_user)
+    current_user: UserSchema = Depends(AuthService.get_current_user_readonly)
 ):
+    etag = make_etag(current_user.id, *NotesFolderService.get_folders_version(db, user_id=current_user.id))
+    if is_etag_matched(request, etag):
+        return not_modified_response(etag)
+
+    set_etag(response, etag)
     return NotesFolderService.get_folders(db, user_id=current_user.id)
 
 
@@ -1,3 +1,4 @@
+import os
 from fastapi import Depends, HTTPException, APIRouter, UploadFile, File, Query
 from sqlalchemy.orm import Session
 
@@ -7,15 +8,23 @@ from app.models.user import User
 from app.schemas.notes_import import NotesImportResponseSchema
 from app.services.auth_service import AuthService
 from app.services.notes_folders_service import NotesFolderService
-from app.services.notes_import_service import NotesImportService
+from app.services.notes_import_service import NotesImportError, NotesImportService
 
 router = APIRouter()
 
 
+def _get_upload_size(file: UploadFile) -> int:
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
 @router.post('/', response_model=NotesImportResponseSchema)
-async def import_notes(
+def import_notes(
     files: list[UploadFile] = File(...),
     folder_id: int | None = Query(None),
+    incremental: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(AuthService.get_current_user)
 ):
@@ -39,46 +48,33 @@ async def import_notes(
         target_folder = NotesFolderService.get_root_folder(db, current_user.id)
     folder_id = target_folder.id
 
-    # process files
-    imported_notes = []
-    total_content_size = 0
-    for file in files:
-        content = await file.read()
-        total_content_size += len(content)
-
-        # validate actual content size
-        if total_content_size > IMPORT_SIZE_LIMIT:
-             raise HTTPException(
-                status_code=413,
-                detail=f'Import content size is too large. Max total size is {IMPORT_SIZE_LIMIT_MB}MB'
-            )
+    # validate actual content size, uploads are spooled to temporary files, so they are measured without reading
+    total_content_size = sum(_get_upload_size(file) for file in files)
+    if total_content_size > IMPORT_SIZE_LIMIT:
+        raise HTTPException(
+            status_code=413,
+            detail=f'Import content size is too large. Max total size is {IMPORT_SIZE_LIMIT_MB}MB'
+        )
 
-        filename = file.filename
-        
-        if filename.lower().endswith('.zip'):
-            notes = NotesImportService.import_zip(
-                db,
-                user_id=current_user.id,
-                zip_content=content,
-                folder_id=folder_id
-            )
-            imported_notes.extend(notes)
-        else:
-            note = NotesImportService.import_file(
-                db,
-                user_id=current_user.id,
-                filename=filename,
-                content=content,
-                folder_id=folder_id
-            )
-            if not note:
-                # skip files that cannot be imported
-                continue
-            imported_notes.append(note)
+    # all files are imported within a single transaction, ZIP members are read lazily from the spooled files
+    try:
+        result = NotesImportService.import_files(
+            db,
+            user_id=current_user.id,
+            files=[(file.filename, file.file) for file in files],
+            folder_id=folder_id,
+            incremental=incremental
+        )
+    except NotesImportError as e:
+        raise HTTPException(status_code=400, detail=f'Failed to import {e.filename}')
 
-    if not imported_notes and files:
+    # re-imports of unchanged archives are not failed
+    if not any(result) and files:
         raise HTTPException(status_code=400, detail='No valid notes found in the uploaded files.')
-        
+
     return {
-        'imported_count': len(imported_notes),
+        'imported_count': result.created + result.updated,
+        'created_count': result.created,
+        'updated_count': result.updated,
+        'skipped_count': result.skipped,
     }
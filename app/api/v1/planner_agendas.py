@@ -1,16 +1,17 @@
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.const.planner import PlannerAgendaType, PlannerAgendaAction
 from app.services.auth_service import AuthService
 from app.core.database import get_db
+from app.core.db_utils import run_in_new_session
 from app.schemas.planner_agenda import (
     PlannerAgendaSchema, PlannerAgendaCreateSchema, PlannerAgendaUpdateSchema,
     PlannerAgendaItemSchema, PlannerAgendaItemCreateSchema, PlannerAgendaItemUpdateSchema,
-    ReorderAgendaItemsSchema, ReorderAgendasSchema,
+    ReorderAgendaItemsSchema, ReorderAgendasSchema, ChangeAgendaItemPositionSchema,
     CopyAgendaItemSchema, MoveAgendaItemSchema,
-    PlannerAgendaActionSchema,
+    PlannerAgendaActionSchema, AgendaItemsBatchSchema, AgendaItemBatchResultSchema,
 )
 from app.services.planner_agenda_service import PlannerAgendaService
 from app.services.planner_agenda_item_service import PlannerAgendaItemService
@@ -29,7 +30,7 @@ def get_agendas(
     ),
     with_counts: bool | None = Query(False, description="Include agenda items counts"),
     db: Session = Depends(get_db),
-    current_user: UserSchema = Depends(AuthService.get_current_user)
+    current_user: UserSchema = Depends(AuthService.get_current_user_readonly)
 ):
     agendas = PlannerAgendaService.get_agendas(db, current_user.id, agenda_types, selected_day, with_counts)
     return agendas
@@ -95,9 +96,9 @@ def reorder_agendas(
     current_user: UserSchema = Depends(AuthService.get_current_user)
 ):
     # First verify all agendas belong to the current user
+    existing_ids = PlannerAgendaService.get_existing_ids(db, request.ordered_agenda_ids, user_id=current_user.id)
     for agenda_id in request.ordered_agenda_ids:
-        db_agenda = PlannerAgendaService.get_planner_agenda(db, agenda_id=agenda_id, user_id=current_user.id)
-        if not db_agenda:
+        if agenda_id not in existing_ids:
             raise HTTPException(status_code=404, detail=f"Planner agenda with id {agenda_id} not found")
 
     # Then reorder them
@@ -122,6 +123,25 @@ def create_agenda_item(
     return PlannerAgendaItemService.create_agenda_item(db=db, item=item, user_id=current_user.id)
 
 
+@router.post("/items/batch/", response_model=list[AgendaItemBatchResultSchema])
+def apply_agenda_items_batch(
+    request: AgendaItemsBatchSchema,
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user)
+):
+    """
+    Applies a list of create, update, copy, move and delete operations in order, in a single transaction.
+    Example request: {"operations": [{"op": "create", "agenda_id": 1, "text": "Task"},
+                                     {"op": "move", "item_id": 2, "agenda_id": 3},
+                                     {"op": "delete", "item_id": 4}]}
+    Result has an entry per operation, operations on missing items or agendas have not_found status.
+    """
+    results = PlannerAgendaItemService.apply_agenda_items_batch(db, request.operations, user_id=current_user.id)
+    if results is None:
+        raise HTTPException(status_code=400, detail="Failed to apply operations, try again later")
+    return results
+
+
 @router.put("/items/{item_id}/", response_model=PlannerAgendaItemSchema)
 def update_agenda_item(
     item_id: int,
@@ -170,9 +190,9 @@ def reorder_agenda_items(
     current_user: UserSchema = Depends(AuthService.get_current_user)
 ):
     # First verify all items belong to the current user
+    existing_ids = PlannerAgendaItemService.get_existing_ids(db, request.ordered_item_ids, user_id=current_user.id)
     for item_id in request.ordered_item_ids:
-        db_item = PlannerAgendaItemService.get_agenda_item(db, item_id=item_id, user_id=current_user.id)
-        if not db_item:
+        if item_id not in existing_ids:
             raise HTTPException(status_code=404, detail=f"Planner agenda item with id {item_id} not found")
 
     # Then reorder them
@@ -182,24 +202,45 @@ def reorder_agenda_items(
     return {"detail": "Agenda items reordered successfully"}
 
 
-@router.get("/items/", response_model=dict[int, list[PlannerAgendaItemSchema]])
-def get_items_by_agendas(
-    agenda_ids: list[int] = Query(..., description="List of agenda IDs"),
+@router.post("/items/{item_id}/position/", response_model=PlannerAgendaItemSchema)
+def change_agenda_item_position(
+    request: ChangeAgendaItemPositionSchema,
+    item_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: UserSchema = Depends(AuthService.get_current_user)
 ):
-    result = {}
-    for agenda_id in agenda_ids:
-        # Check if agenda exists and belongs to the current user
-        db_agenda = PlannerAgendaService.get_planner_agenda(db, agenda_id, user_id=current_user.id)
-        if not db_agenda:
-            continue
+    """ Moves item right after another item of the same agenda, or first if after_item_id is not provided """
+    # First check if the item exists and belongs to the current user
+    db_item = PlannerAgendaItemService.get_agenda_item(db, item_id=item_id, user_id=current_user.id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Planner agenda item not found")
 
-        # Get items for this agenda
-        items = PlannerAgendaItemService.get_items_by_agendas(db, agenda_id, user_id=current_user.id)
-        result[agenda_id] = items
+    db_item, needs_rebalance = PlannerAgendaItemService.change_agenda_item_position(
+        db, item_id=item_id, after_item_id=request.after_item_id, user_id=current_user.id
+    )
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Target planner agenda item not found")
+
+    if needs_rebalance:
+        background_tasks.add_task(
+            run_in_new_session,
+            db.get_bind(),
+            PlannerAgendaItemService.rebalance_agenda_items,
+            db_item.agenda_id,
+            current_user.id,
+        )
+    return db_item
 
-    return result
+
+@router.get("/items/", response_model=dict[int, list[PlannerAgendaItemSchema]])
+def get_items_by_agendas(
+    agenda_ids: list[int] = Query(..., description="List of agenda IDs"),
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user_readonly)
+):
+    # Agendas that do not exist or do not belong to the current user are skipped
+    return PlannerAgendaItemService.get_items_for_agendas(db, agenda_ids, user_id=current_user.id)
 
 
 @router.post("/items/{item_id}/copy/", response_model=PlannerAgendaItemSchema)
@@ -1,11 +1,14 @@
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.const.planner import PLANNER_DAYS_REQUEST_LIMIT
 from app.core.database import get_db
+from app.core.db_utils import run_in_new_session
 from app.schemas.planner_day import (
     PlannerDayItemSchema, PlannerDayItemCreateSchema, PlannerDayItemUpdateSchema,
-    ReorderDayItemsSchema, CopyDayItemSchema, SnoozeDayItemSchema,
+    ReorderDayItemsSchema, ChangeDayItemPositionSchema, CopyDayItemSchema, SnoozeDayItemSchema,
+    DayItemsBatchSchema, DayItemBatchResultSchema,
 )
 from app.services.planner_day_service import PlannerDayItemService
 from app.services.auth_service import AuthService
@@ -18,18 +21,18 @@ router = APIRouter()
 def get_items_by_days(
     days: list[date] = Query(..., description="List of dates in ISO format (YYYY-MM-DD)"),
     db: Session = Depends(get_db),
-    current_user: UserSchema = Depends(AuthService.get_current_user)
+    current_user: UserSchema = Depends(AuthService.get_current_user_readonly)
 ):
     """
     Get multiple days by their dates and return a dictionary with date strings as keys and their items as values.
     Example request: /items/?days=2023-01-01&days=2023-01-02
     Result: {'2023-01-01': [...], '2023-01-02': [...]}
     """
-    result = {}
-    for day in days:
-        items = PlannerDayItemService.get_items_by_day(db, day, current_user.id)
-        result[day.isoformat()] = items
-    return result
+    if len(set(days)) > PLANNER_DAYS_REQUEST_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Too many days requested, max is {PLANNER_DAYS_REQUEST_LIMIT}")
+
+    items_by_days = PlannerDayItemService.get_items_by_days(db, days, current_user.id)
+    return {day.isoformat(): items for day, items in items_by_days.items()}
 
 
 @router.get("/items/range/", response_model=dict[date, list[PlannerDayItemSchema]])
@@ -37,7 +40,7 @@ def get_items_by_range(
     start_date: date = Query(..., description="Base date in ISO format (YYYY-MM-DD)"),
     days_count: int = Query(1, description="Number of days to fetch starting from start_date"),
     db: Session = Depends(get_db),
-    current_user: UserSchema = Depends(AuthService.get_current_user)
+    current_user: UserSchema = Depends(AuthService.get_current_user_readonly)
 ):
     """
     Get items for a range of days starting from days_count.
@@ -56,6 +59,25 @@ def create_day_item(
     return PlannerDayItemService.create_day_item(db=db, item=item, user_id=current_user.id)
 
 
+@router.post("/items/batch/", response_model=list[DayItemBatchResultSchema])
+def apply_day_items_batch(
+    request: DayItemsBatchSchema,
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user)
+):
+    """
+    Applies a list of create, update and delete operations in order, in a single transaction.
+    Example request: {"operations": [{"op": "create", "day": "2026-02-02", "text": "Task"},
+                                     {"op": "update", "item_id": 1, "state": "completed"},
+                                     {"op": "delete", "item_id": 2}]}
+    Result has an entry per operation, operations on missing items have not_found status.
+    """
+    results = PlannerDayItemService.apply_day_items_batch(db, request.operations, user_id=current_user.id)
+    if results is None:
+        raise HTTPException(status_code=400, detail="Failed to apply operations, try again later")
+    return results
+
+
 @router.put("/items/{item_id}/", response_model=PlannerDayItemSchema)
 def update_day_item(
     item_id: int,
@@ -96,10 +118,9 @@ def reorder_day_items(
     current_user: UserSchema = Depends(AuthService.get_current_user)
 ):
     # Validate that the items exist and belong to the current user
-    for item_id in request.ordered_item_ids:
-        db_item = PlannerDayItemService.get_day_item(db, item_id=item_id, user_id=current_user.id)
-        if not db_item:
-            raise HTTPException(status_code=404, detail="One of the items was not found")
+    existing_ids = PlannerDayItemService.get_existing_ids(db, request.ordered_item_ids, user_id=current_user.id)
+    if len(existing_ids) != len(set(request.ordered_item_ids)):
+        raise HTTPException(status_code=404, detail="One of the items was not found")
 
     success = PlannerDayItemService.reorder_day_items(db, request.ordered_item_ids, user_id=current_user.id)
     if not success:
@@ -107,6 +128,33 @@ def reorder_day_items(
     return {"detail": "Items reordered successfully"}
 
 
+@router.post("/items/{item_id}/position/", response_model=PlannerDayItemSchema)
+def change_day_item_position(
+    request: ChangeDayItemPositionSchema,
+    item_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user)
+):
+    """ Moves item right after another item of the same day, or first if after_item_id is not provided """
+    # Validate that the item exists and belongs to the current user
+    db_item = PlannerDayItemService.get_day_item(db, item_id=item_id, user_id=current_user.id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    db_item, needs_rebalance = PlannerDayItemService.change_day_item_position(
+        db, item_id=item_id, after_item_id=request.after_item_id, user_id=current_user.id
+    )
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Target item not found")
+
+    if needs_rebalance:
+        background_tasks.add_task(
+            run_in_new_session, db.get_bind(), PlannerDayItemService.rebalance_day_items, db_item.day, current_user.id
+        )
+    return db_item
+
+
 @router.post("/items/{item_id}/copy/", response_model=PlannerDayItemSchema)
 def copy_day_item(
     request: CopyDayItemSchema,
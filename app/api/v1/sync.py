@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.schemas.sync import SyncChangesResponseSchema
+from app.schemas.user import UserSchema
+from app.services.auth_service import AuthService
+from app.services.change_events import change_events
+from app.services.sync_service import SyncService
+
+router = APIRouter()
+
+
+@router.get("/changes/", response_model=SyncChangesResponseSchema)
+def get_changes(
+    since: int = Query(0, ge=0, description="change_seq of the previous response, 0 to get all data"),
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user_readonly)
+):
+    return SyncService.get_changes(db, user_id=current_user.id, since=since)
+
+
+@router.get("/events/")
+async def get_change_events(
+    db: Session = Depends(get_db),
+    current_user: UserSchema = Depends(AuthService.get_current_user_readonly)
+):
+    """
+    Server-sent events stream with the user change_seq, sent when planner or notes data are changed
+    on any device, so clients request /sync/changes/ only when there are changes instead of polling.
+    """
+    # subscribe before reading change_seq to not miss changes committed in between
+    queue = change_events.subscribe(current_user.id)
+    try:
+        change_seq = await run_in_threadpool(SyncService.get_change_seq, db, current_user.id)
+    except Exception:
+        change_events.unsubscribe(current_user.id, queue)
+        raise
+    finally:
+        # don't hold a database connection for the whole stream
+        db.close()
+
+    return StreamingResponse(
+        change_events.iter_events(
+            current_user.id,
+            queue,
+            first_event={'change_seq': change_seq},
+            keepalive=settings.SYNC_EVENTS_KEEPALIVE_SECONDS,
+            max_seconds=settings.SYNC_EVENTS_MAX_SECONDS,
+        ),
+        media_type='text/event-stream',
+        # disable response buffering in nginx
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
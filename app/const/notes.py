@@ -19,6 +19,19 @@ class ExportTarget(str, Enum):
     ALL_NOTES = 'all_notes'
 
 
+class ExportJobStatus(str, Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    EXPIRED = 'expired'
+
+
+class HtmlParserBackend(str, Enum):
+    LXML = 'lxml'
+    HTML_PARSER = 'html.parser'
+
+
 EXPORT_TYPE_EXTENSION_MAP = {
     ExportType.MARKDOWN: 'md',
     ExportType.HTML: 'html',
@@ -32,8 +45,23 @@ EXPORT_MEDIA_TYPE_MAP = {
     ExportType.PDF: 'application/pdf',
 }
 
+# Number of notes fetched from the db cursor at once during export
+EXPORT_NOTES_BATCH_SIZE = 200
+# Added to ZIP exports listing notes which failed to render
+EXPORT_ERRORS_FILENAME = 'export_errors.txt'
+# Export job progress is saved every N exported notes
+EXPORT_JOB_PROGRESS_STEP = 100
+# and at least every N seconds, so slow running jobs are not failed as stale
+EXPORT_JOB_HEARTBEAT_SECONDS = 60
+
 IMPORT_SIZE_LIMIT_MB = 10
 IMPORT_SIZE_LIMIT = IMPORT_SIZE_LIMIT_MB * 1024 * 1024
+# Number of parsed notes saved to the db at once during ZIP import
+IMPORT_NOTES_BATCH_SIZE = 100
+# Number of files sent to an import worker process at once
+IMPORT_PARSE_CHUNK_SIZE = 50
+# Files with longer paths are skipped by incremental imports, as their fingerprints can't be saved
+IMPORT_PATH_MAX_LENGTH = 1024
 
 # HTML sanitization settings
 NOTE_BODY_ALLOWED_TAGS = {
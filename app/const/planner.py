@@ -4,6 +4,16 @@ from enum import Enum
 PLANNER_MONTHLY_AGENDA_INDEX = 0
 PLANNER_CUSTOM_AGENDA_INDEX_MIN = 1
 
+# Planner items indexes are sparse, so an item can be placed between two others
+# by updating only its own index. Indexes are renormalised once there is no gap left.
+PLANNER_ITEM_INDEX_STEP = 1024
+
+# Max number of days that can be requested at once
+PLANNER_DAYS_REQUEST_LIMIT = 62
+
+# Max number of operations in a single batch request
+PLANNER_BATCH_OPERATIONS_LIMIT = 500
+
 
 class PlannerItemState(str, Enum):
     TODO = "todo"
@@ -26,3 +36,17 @@ class WeekStartDay(str, Enum):
 class PlannerAgendaAction(str, Enum):
     DELETE_FINISHED_ITEMS = "delete_finished_items"
     SORT_ITEMS_BY_STATE = "sort_items_by_state"
+
+
+class PlannerBatchOperation(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    # agenda items only
+    COPY = "copy"
+    MOVE = "move"
+
+
+class PlannerBatchStatus(str, Enum):
+    OK = "ok"
+    NOT_FOUND = "not_found"
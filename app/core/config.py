@@ -1,4 +1,7 @@
 import logging
+import os
+import tempfile
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -20,10 +23,60 @@ class Settings(BaseSettings):
 
     ROOT_URL_REDIRECT: str | None = None
 
+    # Authenticated users cache, set TTL to 0 to disable it
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Trust access token claims without a database lookup on read-only endpoints
+    AUTH_STATELESS_READS: bool = False
+
+    # Bearer token required by /metrics/, the endpoint is disabled when it's not set
+    METRICS_TOKEN: str | None = None
+
+    # bcrypt cost factor and bounded pool for password hashing, set workers to 0 to hash in request threads
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_POOL_WORKERS: int = 4
+    PASSWORD_POOL_QUEUE_SIZE: int = 8
+    PASSWORD_POOL_RETRY_AFTER_SECONDS: int = 1
+
+    # Worker processes rendering PDF exports, set to 0 to render in request threads
+    EXPORT_PDF_WORKERS: int = 2
+    EXPORT_PDF_TIMEOUT_SECONDS: int = 60
+    # Disk cache of rendered PDF and Markdown notes, set size to 0 to disable it
+    EXPORT_RENDER_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), 'perga_render_cache')
+    EXPORT_RENDER_CACHE_MAX_SIZE_MB: int = 512
+
+    # Background export jobs, archives are removed after TTL
+    EXPORT_JOBS_DIR: str = os.path.join(tempfile.gettempdir(), 'perga_exports')
+    EXPORT_JOB_WORKERS: int = 1
+    EXPORT_JOB_TTL_MINUTES: int = 60
+    # Running jobs without progress for this time are failed, pending jobs are resubmitted on startup
+    EXPORT_JOB_STALE_MINUTES: int = 30
+    EXPORT_JOBS_RECOVER_ON_STARTUP: bool = True
+    # Interval of failing stale jobs and removing expired archives while the app is running, 0 disables it
+    EXPORT_JOBS_MAINTENANCE_SECONDS: int = 300
+
+    # Worker processes parsing and sanitizing files of ZIP imports, set to 0 to parse in request threads
+    NOTES_IMPORT_WORKERS: int = 2
+    # Imports and PDF exports using worker processes at once, others are processed in request threads
+    WORKER_POOLS_MAX_CALLS: int = 4
+
+    # Server-sent change events, use postgres backend (LISTEN/NOTIFY) to deliver events across API workers
+    SYNC_EVENTS_BACKEND: Literal['memory', 'postgres'] = 'memory'
+    SYNC_EVENTS_QUEUE_SIZE: int = 16
+    SYNC_EVENTS_KEEPALIVE_SECONDS: int = 15
+    # Streams are closed after this time, clients reconnect and get rebalanced between workers
+    SYNC_EVENTS_MAX_SECONDS: int = 300
+
     @property
     def sqlalchemy_database_uri(self) -> str:
         return f'postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}/{self.POSTGRES_DB}'
 
+    @property
+    def sqlalchemy_async_database_uri(self) -> str:
+        return (
+            f'postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}/{self.POSTGRES_DB}'
+        )
+
     class Config:
         env_file = '.env'
         case_sensitive = True
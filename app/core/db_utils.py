@@ -1,7 +1,19 @@
-from collections.abc import Generator
+import logging
+from collections.abc import Callable, Generator
 from contextlib import contextmanager
+from itertools import chain
+from sqlalchemy import column, table, update
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
+
+# Lightweight construct to not import models here
+users_table = table('users', column('id'), column('change_seq'))
+# Session.info key of { <user_id>: <change_seq> } allocated in the current transaction
+CHANGE_SEQS_SESSION_KEY = 'change_seqs'
+
 
 class TransactionRollback(Exception):
     pass
@@ -26,3 +38,54 @@ def atomic_transaction(db: Session) -> Generator[None, None, None]:
         raise TransactionRollback(str(e))
     else:
         db.commit()
+
+
+def run_in_new_session(bind: Engine | Connection, func: Callable, *args, **kwargs) -> None:
+    """
+    Runs func(db, *args, **kwargs) within a transaction of a new session.
+    Useful for background tasks, which are executed when the request session can be already closed.
+
+    Example:
+        background_tasks.add_task(run_in_new_session, db.get_bind(), Service.method, user_id)
+    """
+    db = Session(bind=bind)
+    try:
+        with atomic_transaction(db):
+            func(db, *args, **kwargs)
+    except TransactionRollback as e:
+        logger.warning(f'run_in_new_session {func.__qualname__}: {str(e)}')
+    finally:
+        db.close()
+
+
+def next_change_seq(db: Session, user_id: int) -> int:
+    """
+    Increments and returns the user change sequence, to be stamped on rows written in the current transaction.
+    The user row stays locked until commit, so sequences of a user are committed in increasing order
+    and sync clients never skip changes of transactions which are still in progress.
+    Returns 0 for a missing user, it's possible only without foreign keys enforcement (SQLite).
+    """
+    change_seq = db.execute(
+        update(users_table)
+        .where(users_table.c.id == user_id)
+        .values(change_seq=users_table.c.change_seq + 1)
+        .returning(users_table.c.change_seq)
+    ).scalar() or 0
+    db.info.setdefault(CHANGE_SEQS_SESSION_KEY, {})[user_id] = change_seq
+    return change_seq
+
+
+def stamp_change_seq(session: Session, flush_context, instances) -> None:
+    """
+    before_flush listener setting change_seq of new and modified change tracked rows,
+    rows of a user share one sequence per flush. Bulk UPDATE statements have to set change_seq themselves.
+    """
+    rows_by_user = {}
+    for instance in chain(session.new, session.dirty):
+        if getattr(instance, '__change_tracked__', False) and session.is_modified(instance):
+            rows_by_user.setdefault(instance.user_id, []).append(instance)
+
+    for user_id, rows in rows_by_user.items():
+        change_seq = next_change_seq(session, user_id)
+        for instance in rows:
+            instance.change_seq = change_seq
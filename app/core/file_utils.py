@@ -0,0 +1,26 @@
+import os
+import stat
+from typing import BinaryIO
+
+# Directories and files with notes of users are accessible only by the app user
+PRIVATE_DIR_MODE = 0o700
+PRIVATE_FILE_MODE = 0o600
+
+
+def ensure_private_dir(path: str) -> None:
+    """
+    Creates directory accessible only by the app user. Existing directory must be owned by the app user
+    and must not be a symlink, so another local user can't pre-create a predictable path, e.g. in /tmp.
+    """
+    os.makedirs(path, mode=PRIVATE_DIR_MODE, exist_ok=True)
+
+    dir_stat = os.lstat(path)
+    if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid():
+        raise PermissionError(f'{path} is not a directory owned by the app user')
+    if stat.S_IMODE(dir_stat.st_mode) != PRIVATE_DIR_MODE:
+        os.chmod(path, PRIVATE_DIR_MODE)
+
+
+def open_private_file(path: str) -> BinaryIO:
+    """ Opens file for binary writing, new file is readable only by the app user whatever the umask is """
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, PRIVATE_FILE_MODE), 'wb')
@@ -0,0 +1,38 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+from starlette import status
+
+# Responses may be stored by the client, but have to be revalidated with If-None-Match before use
+ETAG_CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts: Any) -> str:
+    """ Weak ETag from values which change whenever the response does, e.g. ids, update dates and counts """
+    etag_hash = hashlib.sha1('\0'.join(str(part) for part in parts).encode('utf-8'), usedforsecurity=False)
+    return f'W/"{etag_hash.hexdigest()}"'
+
+
+def is_etag_matched(request: Request, etag: str) -> bool:
+    """ Checks If-None-Match header using weak comparison, as GET requests should """
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    opaque_tag = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque_tag for tag in if_none_match.split(','))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = ETAG_CACHE_CONTROL
+
+
+def not_modified_response(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
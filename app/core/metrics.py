@@ -0,0 +1,32 @@
+import secrets
+from collections.abc import Callable
+from fastapi import Header, HTTPException
+from starlette import status
+
+from app.core.config import settings
+
+# { <name>: <function returning stats dict> }
+_stats_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_stats_provider(name: str, provider: Callable[[], dict]) -> None:
+    """ Registers a function that returns in-process counters to be exposed via /metrics/ """
+    _stats_providers[name] = provider
+
+
+def collect_stats() -> dict[str, dict]:
+    return {name: provider() for name, provider in _stats_providers.items()}
+
+
+def verify_metrics_token(authorization: str | None = Header(None)) -> None:
+    """ Dependency of /metrics/, responds with 404 unless METRICS_TOKEN is set and passed as a bearer token """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Not Found')
+
+    scheme, _, token = (authorization or '').partition(' ')
+    if scheme.lower() != 'bearer' or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Invalid metrics token',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
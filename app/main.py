@@ -1,13 +1,21 @@
+import asyncio
 import logging
 import os
 import sys
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette import status
-from starlette.responses import RedirectResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, RedirectResponse, Response
 
 from app.core.config import settings
-from app.api.v1 import planner_days, planner_agendas, auth, notes, notes_folders, notes_export, notes_import
+from app.core.database import engine
+from app.core.db_utils import run_in_new_session
+from app.core.metrics import collect_stats, verify_metrics_token
+from app.services.notes_export_job_service import NotesExportJobService
+from app.services.password_pool import PasswordPoolFull
+from app.api.v1 import planner_days, planner_agendas, auth, notes, notes_folders, notes_export, notes_import, sync
 
 # Ensure logs directory exists
 logs_dir = os.path.join(os.path.dirname(__file__), 'logs')
@@ -28,10 +36,34 @@ logger.info(f"Application starting in {'development' if settings.IS_DEV else 'pr
 router_prefix = f'{settings.API_V1_STR}/'
 
 
+async def maintain_export_jobs():
+    """
+    Fails export jobs interrupted after startup, e.g. by a restart of another API worker,
+    and removes expired archives even if no new jobs are created
+    """
+    while True:
+        await asyncio.sleep(settings.EXPORT_JOBS_MAINTENANCE_SECONDS)
+        await run_in_threadpool(run_in_new_session, engine, NotesExportJobService.maintain_jobs)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.EXPORT_JOBS_RECOVER_ON_STARTUP:
+        # export jobs of a stopped process are failed or resubmitted, so clients don't poll them forever
+        await run_in_threadpool(NotesExportJobService.resume_jobs, engine)
+    maintenance_task = None
+    if settings.EXPORT_JOBS_MAINTENANCE_SECONDS > 0:
+        maintenance_task = asyncio.create_task(maintain_export_jobs())
+    yield
+    if maintenance_task:
+        maintenance_task.cancel()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f'{router_prefix}openapi.json'
+    openapi_url=f'{router_prefix}openapi.json',
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -41,9 +73,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
-    expose_headers=['Content-Disposition'],
+    expose_headers=['Content-Disposition', 'ETag'],
 )
 
+@app.exception_handler(PasswordPoolFull)
+def password_pool_full_handler(request: Request, exc: PasswordPoolFull):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={'detail': 'Too many requests, try again later'},
+        headers={'Retry-After': str(settings.PASSWORD_POOL_RETRY_AFTER_SECONDS)},
+    )
+
 # Include routers
 
 app.include_router(auth.router, prefix=f'{router_prefix}auth', tags=['auth'])
@@ -56,6 +96,8 @@ app.include_router(notes_export.router, prefix=f"{router_prefix}notes/export", t
 app.include_router(notes_import.router, prefix=f"{router_prefix}notes/import", tags=['notes_import'])
 app.include_router(notes.router, prefix=f'{router_prefix}notes', tags=['notes'])
 
+app.include_router(sync.router, prefix=f'{router_prefix}sync', tags=['sync'])
+
 @app.get('/')
 def root():
     if settings.ROOT_URL_REDIRECT:
@@ -65,3 +107,8 @@ def root():
 @app.get('/health/')
 def health():
     return Response(content='OK', status_code=status.HTTP_200_OK)
+
+@app.get('/metrics/', dependencies=[Depends(verify_metrics_token)], include_in_schema=False)
+def metrics():
+    """ In-process counters of caches and worker pools """
+    return collect_stats()
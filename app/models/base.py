@@ -1,7 +1,9 @@
 import datetime as dt
-from sqlalchemy import Column, Integer, DateTime, Boolean
+from sqlalchemy import BigInteger, Column, Integer, DateTime, Boolean, event
+from sqlalchemy.orm import Session
 
 from app.core.database import Base
+from app.core.db_utils import stamp_change_seq
 
 
 class BaseModel(Base):
@@ -21,3 +23,14 @@ class BaseModel(Base):
     def mark_as_deleted(self):
         self.is_deleted = True
         self.deleted_dt = dt.datetime.now(dt.timezone.utc)
+
+
+class ChangeTrackedModel(BaseModel):
+    """ Rows returned by the sync API, change_seq is set from the user change sequence on every write """
+    __abstract__ = True
+    __change_tracked__ = True
+
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default='0')
+
+
+event.listen(Session, 'before_flush', stamp_change_seq)
@@ -1,16 +1,18 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
-from app.const.notes import NotesFolderType
-from app.models.base import BaseModel
+from app.const.notes import IMPORT_PATH_MAX_LENGTH, ExportJobStatus, NotesFolderType
+from app.models.base import BaseModel, ChangeTrackedModel
 
 __all__ = (
     'NotesFolder',
     'Note',
+    'NotesExportJob',
+    'NotesImportFingerprint',
 )
 
 
-class NotesFolder(BaseModel):
+class NotesFolder(ChangeTrackedModel):
     __tablename__ = 'notes_folders'
 
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
@@ -39,13 +41,14 @@ class NotesFolder(BaseModel):
             postgresql_where=(folder_type == NotesFolderType.TRASH),
             sqlite_where=(folder_type == NotesFolderType.TRASH)
         ),
+        Index('idx_notes_folders_user_change_seq', 'user_id', 'change_seq'),
     )
 
     def __repr__(self):
         return f"<NotesFolder(id={self.id}, name={self.name!r}, user_id={self.user_id})>"
 
 
-class Note(BaseModel):
+class Note(ChangeTrackedModel):
     __tablename__ = 'notes'
 
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
@@ -57,5 +60,54 @@ class Note(BaseModel):
     user = relationship('User', back_populates='notes')
     folder = relationship('NotesFolder', back_populates='notes')
 
+    __table_args__ = (
+        Index('idx_notes_user_change_seq', 'user_id', 'change_seq'),
+    )
+
     def __repr__(self):
         return f"<Note(id={self.id}, title={self.title!r}, user_id={self.user_id})>"
+
+
+class NotesExportJob(BaseModel):
+    __tablename__ = 'notes_export_jobs'
+
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    export_type = Column(String(length=32), nullable=False)
+    export_target = Column(String(length=32), nullable=False)
+    export_target_id = Column(Integer, nullable=True)
+    status = Column(String(length=32), nullable=False, default=ExportJobStatus.PENDING)
+
+    notes_total = Column(Integer, nullable=False, default=0)
+    notes_done = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    # Archive built by the worker, removed after expires_dt
+    filename = Column(String(length=256), nullable=True)
+    file_path = Column(String(length=1024), nullable=True)
+    file_size = Column(BigInteger, nullable=True)
+    expires_dt = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    # Relationships
+    user = relationship('User', back_populates='notes_export_jobs')
+
+    def __repr__(self):
+        return f"<NotesExportJob(id={self.id}, status={self.status!r}, user_id={self.user_id})>"
+
+
+class NotesImportFingerprint(BaseModel):
+    """ Content hash of an imported file, so re-imports into the same folder skip unchanged files """
+    __tablename__ = 'notes_import_fingerprints'
+
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    # folder the archive was imported into and path of the file in the archive
+    folder_id = Column(Integer, ForeignKey('notes_folders.id'), nullable=False)
+    path = Column(String(length=IMPORT_PATH_MAX_LENGTH), nullable=False)
+    content_hash = Column(String(length=64), nullable=False)
+    note_id = Column(Integer, ForeignKey('notes.id'), nullable=False)
+
+    __table_args__ = (
+        Index('idx_notes_import_fingerprints_user_folder_path', 'user_id', 'folder_id', 'path', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<NotesImportFingerprint(id={self.id}, path={self.path!r}, user_id={self.user_id})>"
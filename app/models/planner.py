@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, Integer, Date, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Integer, Date, ForeignKey, Index, UniqueConstraint, column
 from sqlalchemy.orm import relationship
 
 from app.const.planner import PlannerAgendaType, PlannerItemState
-from app.models.base import BaseModel
+from app.models.base import ChangeTrackedModel
 
 
 __all__ = (
@@ -11,11 +11,23 @@ __all__ = (
     'PlannerDayItem',
 )
 
+# Condition for partial indexes, matches BaseService.get_base_query filter
+NOT_DELETED_CONDITION = column('is_deleted').is_(False)
 
-class PlannerAgenda(BaseModel):
+
+class PlannerAgenda(ChangeTrackedModel):
     __tablename__ = "planner_agendas"
     __table_args__ = (
         UniqueConstraint('user_id', 'agenda_type', 'name',  name='uix_user_agenda_type_name'),
+        Index(
+            'idx_planner_agendas_user_type_index',
+            'user_id',
+            'agenda_type',
+            'index',
+            postgresql_where=NOT_DELETED_CONDITION,
+            sqlite_where=NOT_DELETED_CONDITION
+        ),
+        Index('idx_planner_agendas_user_change_seq', 'user_id', 'change_seq'),
     )
 
     name = Column(String(length=64), nullable=False)
@@ -31,7 +43,7 @@ class PlannerAgenda(BaseModel):
         return f"<PlannerAgenda(id={self.id}, type={self.agenda_type}, name={self.name})>"
 
 
-class BasePlannerItem(BaseModel):
+class BasePlannerItem(ChangeTrackedModel):
     __abstract__ = True
 
     text = Column(String(length=256))
@@ -42,6 +54,17 @@ class BasePlannerItem(BaseModel):
 
 class PlannerDayItem(BasePlannerItem):
     __tablename__ = "planner_day_items"
+    __table_args__ = (
+        Index(
+            'idx_planner_day_items_user_day_index',
+            'user_id',
+            'day',
+            'index',
+            postgresql_where=NOT_DELETED_CONDITION,
+            sqlite_where=NOT_DELETED_CONDITION
+        ),
+        Index('idx_planner_day_items_user_change_seq', 'user_id', 'change_seq'),
+    )
 
     day = Column(Date, index=True)
 
@@ -54,6 +77,16 @@ class PlannerDayItem(BasePlannerItem):
 
 class PlannerAgendaItem(BasePlannerItem):
     __tablename__ = "planner_agenda_items"
+    __table_args__ = (
+        Index(
+            'idx_planner_agenda_items_agenda_index',
+            'agenda_id',
+            'index',
+            postgresql_where=NOT_DELETED_CONDITION,
+            sqlite_where=NOT_DELETED_CONDITION
+        ),
+        Index('idx_planner_agenda_items_user_change_seq', 'user_id', 'change_seq'),
+    )
 
     agenda_id = Column(Integer, ForeignKey("planner_agendas.id"), nullable=False)
 
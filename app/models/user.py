@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, true, false
+from sqlalchemy import BigInteger, Column, String, Boolean, true, false
 from sqlalchemy.orm import relationship
 
 from app.const.planner import WeekStartDay
@@ -22,12 +22,16 @@ class User(BaseModel):
     week_start_day = Column(String(length=32), default=WeekStartDay.MONDAY, nullable=False)
     merge_weekends = Column(Boolean, default=False, server_default=false(), nullable=False)
 
+    # Last change sequence stamped on user planner and notes rows, see ChangeTrackedModel
+    change_seq = Column(BigInteger, default=0, server_default='0', nullable=False)
+
     # Relationships
     planner_agendas = relationship("PlannerAgenda", back_populates="user")
     planner_day_items = relationship("PlannerDayItem", back_populates="user")
     planner_agenda_items = relationship("PlannerAgendaItem", back_populates="user")
     notes = relationship("Note", back_populates="user")
     notes_folders = relationship("NotesFolder", back_populates="user")
+    notes_export_jobs = relationship("NotesExportJob", back_populates="user")
 
     def __repr__(self):
         return f"<User(id={self.id}, username={self.username}, email={self.email}, is_active={self.is_active})>"
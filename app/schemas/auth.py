@@ -14,3 +14,8 @@ class SigninSchema(BaseModel):
 
 class RefreshTokenSchema(BaseModel):
     refresh_token: str
+
+
+class TokenUserSchema(BaseModel):
+    """ User built from access token claims only, used by read-only endpoints in stateless mode """
+    id: int
@@ -0,0 +1,28 @@
+import datetime as dt
+from pydantic import BaseModel
+
+from app.const.notes import ExportJobStatus, ExportTarget, ExportType
+
+
+class NotesExportJobCreateSchema(BaseModel):
+    export_type: ExportType
+    export_target: ExportTarget
+    export_target_id: int | None = None
+
+
+class NotesExportJobSchema(BaseModel):
+    id: int
+    export_type: ExportType
+    export_target: ExportTarget
+    export_target_id: int | None = None
+    status: ExportJobStatus
+    notes_total: int
+    notes_done: int
+    error: str | None = None
+    filename: str | None = None
+    file_size: int | None = None
+    created_dt: dt.datetime
+    expires_dt: dt.datetime | None = None
+
+    class Config:
+        from_attributes = True
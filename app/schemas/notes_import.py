@@ -2,4 +2,9 @@ from pydantic import BaseModel
 
 
 class NotesImportResponseSchema(BaseModel):
+    # created and updated notes
     imported_count: int
+    created_count: int = 0
+    updated_count: int = 0
+    # unchanged files of incremental imports
+    skipped_count: int = 0
@@ -1,6 +1,10 @@
-from pydantic import BaseModel
+from typing import Annotated, Literal
+from pydantic import BaseModel, Field
 
-from app.const.planner import PlannerAgendaType, PlannerItemState, PlannerAgendaAction
+from app.const.planner import (
+    PlannerAgendaType, PlannerItemState, PlannerAgendaAction, PlannerBatchOperation, PlannerBatchStatus,
+    PLANNER_BATCH_OPERATIONS_LIMIT,
+)
 from app.schemas.planner_day import BasePlannerItemBaseSchema
 
 
@@ -49,6 +53,11 @@ class ReorderAgendaItemsSchema(BaseModel):
     ordered_item_ids: list[int]
 
 
+class ChangeAgendaItemPositionSchema(BaseModel):
+    # None places the item first
+    after_item_id: int | None = None
+
+
 class ReorderAgendasSchema(BaseModel):
     ordered_agenda_ids: list[int]
 
@@ -63,3 +72,51 @@ class MoveAgendaItemSchema(BaseModel):
 
 class PlannerAgendaActionSchema(BaseModel):
     action: PlannerAgendaAction
+
+
+# Batch operations, applied in order in a single transaction
+class AgendaItemBatchCreateSchema(PlannerAgendaItemCreateSchema):
+    op: Literal[PlannerBatchOperation.CREATE]
+
+
+class AgendaItemBatchUpdateSchema(PlannerAgendaItemUpdateSchema):
+    op: Literal[PlannerBatchOperation.UPDATE]
+    item_id: int
+
+
+class AgendaItemBatchCopySchema(CopyAgendaItemSchema):
+    op: Literal[PlannerBatchOperation.COPY]
+    item_id: int
+
+
+class AgendaItemBatchMoveSchema(MoveAgendaItemSchema):
+    op: Literal[PlannerBatchOperation.MOVE]
+    item_id: int
+
+
+class AgendaItemBatchDeleteSchema(BaseModel):
+    op: Literal[PlannerBatchOperation.DELETE]
+    item_id: int
+
+
+AgendaItemBatchOperationSchema = Annotated[
+    AgendaItemBatchCreateSchema
+    | AgendaItemBatchUpdateSchema
+    | AgendaItemBatchCopySchema
+    | AgendaItemBatchMoveSchema
+    | AgendaItemBatchDeleteSchema,
+    Field(discriminator='op'),
+]
+
+
+class AgendaItemsBatchSchema(BaseModel):
+    operations: list[AgendaItemBatchOperationSchema] = Field(max_length=PLANNER_BATCH_OPERATIONS_LIMIT)
+
+
+class AgendaItemBatchResultSchema(BaseModel):
+    op: PlannerBatchOperation
+    # source item for copy and move, new item for create
+    item_id: int | None = None
+    status: PlannerBatchStatus
+    # created, updated, copied or moved item
+    item: PlannerAgendaItemSchema | None = None
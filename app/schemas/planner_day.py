@@ -1,7 +1,10 @@
 from datetime import date
-from pydantic import BaseModel
+from typing import Annotated, Literal
+from pydantic import BaseModel, Field
 
-from app.const.planner import PlannerItemState
+from app.const.planner import (
+    PlannerBatchOperation, PlannerBatchStatus, PlannerItemState, PLANNER_BATCH_OPERATIONS_LIMIT,
+)
 
 
 # Base schemas for planner items
@@ -37,9 +40,47 @@ class ReorderDayItemsSchema(BaseModel):
     ordered_item_ids: list[int]
 
 
+class ChangeDayItemPositionSchema(BaseModel):
+    # None places the item first
+    after_item_id: int | None = None
+
+
 class CopyDayItemSchema(BaseModel):
     day: date
 
 
 class SnoozeDayItemSchema(BaseModel):
     day: date
+
+
+# Batch operations, applied in order in a single transaction
+class DayItemBatchCreateSchema(PlannerDayItemCreateSchema):
+    op: Literal[PlannerBatchOperation.CREATE]
+
+
+class DayItemBatchUpdateSchema(PlannerDayItemUpdateSchema):
+    op: Literal[PlannerBatchOperation.UPDATE]
+    item_id: int
+
+
+class DayItemBatchDeleteSchema(BaseModel):
+    op: Literal[PlannerBatchOperation.DELETE]
+    item_id: int
+
+
+DayItemBatchOperationSchema = Annotated[
+    DayItemBatchCreateSchema | DayItemBatchUpdateSchema | DayItemBatchDeleteSchema,
+    Field(discriminator='op'),
+]
+
+
+class DayItemsBatchSchema(BaseModel):
+    operations: list[DayItemBatchOperationSchema] = Field(max_length=PLANNER_BATCH_OPERATIONS_LIMIT)
+
+
+class DayItemBatchResultSchema(BaseModel):
+    op: PlannerBatchOperation
+    item_id: int | None = None
+    status: PlannerBatchStatus
+    # created or updated item
+    item: PlannerDayItemSchema | None = None
@@ -0,0 +1,59 @@
+import datetime as dt
+from pydantic import BaseModel
+
+from app.const.planner import PlannerItemState
+
+
+class SyncRowSchema(BaseModel):
+    id: int
+    change_seq: int
+    updated_dt: dt.datetime | None = None
+    is_deleted: bool
+    deleted_dt: dt.datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class SyncPlannerDayItemSchema(SyncRowSchema):
+    day: dt.date
+    text: str
+    index: int
+    state: PlannerItemState
+
+
+class SyncPlannerAgendaSchema(SyncRowSchema):
+    agenda_type: str
+    name: str
+    index: int
+
+
+class SyncPlannerAgendaItemSchema(SyncRowSchema):
+    agenda_id: int
+    text: str
+    index: int
+    state: PlannerItemState
+
+
+class SyncNotesFolderSchema(SyncRowSchema):
+    parent_id: int | None = None
+    folder_type: str
+    name: str
+
+
+class SyncNoteSchema(SyncRowSchema):
+    folder_id: int
+    title: str
+    body: str
+
+
+class SyncChangesResponseSchema(BaseModel):
+    # pass as since to the next request
+    change_seq: int
+    # True when the client should replace its data instead of applying changes
+    is_full: bool
+    planner_day_items: list[SyncPlannerDayItemSchema] = []
+    planner_agendas: list[SyncPlannerAgendaSchema] = []
+    planner_agenda_items: list[SyncPlannerAgendaItemSchema] = []
+    notes_folders: list[SyncNotesFolderSchema] = []
+    notes: list[SyncNoteSchema] = []
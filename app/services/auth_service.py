@@ -1,13 +1,19 @@
+import time
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.const.auth import SIGNING_ALGORITHM, TokenType
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.models.user import User
+from app.schemas.auth import TokenUserSchema
+from app.schemas.user import UserSchema
 from app.services.auth_utils import validate_password, create_access_token, create_refresh_token
+from app.services.user_cache import user_cache
 from app.services.user_service import UserService
 
 # OAuth2 scheme for token authentication
@@ -76,8 +82,8 @@ class AuthService:
 
 
     @classmethod
-    async def get_current_user(cls, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-        """ Gets the current user from the access token or raises an exception """
+    def _get_access_token_user_id(cls, token: str) -> int:
+        """ Decodes access token and returns user_id or raises an exception """
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[SIGNING_ALGORITHM])
         except JWTError:
@@ -87,8 +93,69 @@ class AuthService:
         if user_id is None:
             raise cls.CREDENTIALS_EXCEPTION
 
-        user = UserService.get_user_by_id(db, user_id=user_id)
-        if user is None:
-            raise cls.CREDENTIALS_EXCEPTION
-            
+        return user_id
+
+    @classmethod
+    def _get_cached_user(cls, user_id: int, lookup_start: float) -> UserSchema | None:
+        user = user_cache.get(user_id)
+        if user is not None:
+            user_cache.record_lookup(is_hit=True, duration=time.perf_counter() - lookup_start)
         return user
+
+    @classmethod
+    def _cache_user(cls, user: User | None, lookup_start: float) -> UserSchema:
+        """ Validates user fetched from db and puts it into the cache """
+        if user is None or not user.is_active:
+            raise cls.CREDENTIALS_EXCEPTION
+
+        user_schema = UserSchema.model_validate(user)
+        user_cache.set(user_schema)
+        user_cache.record_lookup(is_hit=False, duration=time.perf_counter() - lookup_start)
+        return user_schema
+
+    @classmethod
+    async def get_current_user(
+        cls, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    ) -> UserSchema:
+        """
+        Gets the current user from the access token or raises an exception.
+        Users are cached for USER_CACHE_TTL_SECONDS, so deleted or deactivated users
+        can be authenticated until the cache entry expires.
+        """
+        lookup_start = time.perf_counter()
+        user_id = cls._get_access_token_user_id(token)
+
+        cached_user = cls._get_cached_user(user_id, lookup_start)
+        if cached_user is not None:
+            return cached_user
+
+        # sync session blocks, so run the query in threadpool to not stall the event loop
+        user = await run_in_threadpool(UserService.get_user_by_id, db, user_id=user_id)
+        return cls._cache_user(user, lookup_start)
+
+    @classmethod
+    async def async_get_current_user(
+        cls, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+    ) -> UserSchema:
+        """ Same as get_current_user, but for routers using async session """
+        lookup_start = time.perf_counter()
+        user_id = cls._get_access_token_user_id(token)
+
+        cached_user = cls._get_cached_user(user_id, lookup_start)
+        if cached_user is not None:
+            return cached_user
+
+        user = await UserService.async_get_user_by_id(db, user_id=user_id)
+        return cls._cache_user(user, lookup_start)
+
+    @classmethod
+    async def get_current_user_readonly(
+        cls, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    ) -> UserSchema | TokenUserSchema:
+        """
+        Dependency for read-only endpoints which need only the user id.
+        In stateless mode (AUTH_STATELESS_READS) trusts the access token claims without any lookup.
+        """
+        if settings.AUTH_STATELESS_READS:
+            return TokenUserSchema(id=cls._get_access_token_user_id(token))
+        return await cls.get_current_user(token, db)
@@ -4,24 +4,29 @@ from jose import jwt
 
 from app.const.auth import SIGNING_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, TokenType
 from app.core.config import settings
+from app.services.password_pool import password_pool
 
 
 def generate_password_hash(plain_password: str) -> str:
     """
-    Hashes password using bcrypt:
+    Hashes password using bcrypt in the password pool:
     1. Converts plain password to bytes
-    2. Generates salt
+    2. Generates salt with BCRYPT_ROUNDS cost
     3. Hashes password with salt
     4. Returns hashed bytes as string
+    Raises PasswordPoolFull if the pool is busy.
     """
     password_bytes = plain_password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password_bytes, salt)
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    hashed_password = password_pool.run(bcrypt.hashpw, password_bytes, salt)
     return hashed_password.decode('utf-8')
 
 
 def validate_password(plain_password: str, hashed_password: str) -> bool:
-    """ Verifies a plain password against a hashed password """
+    """
+    Verifies a plain password against a hashed password in the password pool.
+    Raises PasswordPoolFull if the pool is busy.
+    """
     try:
         password_bytes = plain_password.encode('utf-8')
         hashed_bytes = hashed_password.encode('utf-8')
@@ -29,7 +34,7 @@ def validate_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
     try:
-        result = bcrypt.checkpw(password_bytes, hashed_bytes)
+        result = password_pool.run(bcrypt.checkpw, password_bytes, hashed_bytes)
     except ValueError:
         # invalid bcrypt hash format
         result = False
@@ -1,8 +1,11 @@
 import logging
+from sqlalchemy import Select, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, Query
 from sqlalchemy.exc import IntegrityError
 from typing import Generic, TypeVar
 
+from app.core.db_utils import next_change_seq
 from app.models.base import BaseModel
 
 
@@ -38,3 +41,82 @@ class BaseService(Generic[T]):
 
         db.refresh(instance)
         return instance, True
+
+    @classmethod
+    def get_existing_ids(cls, db: Session, ids: list[int], user_id: int) -> set[int]:
+        """ Returns the subset of provided ids that exist and belong to the user, using a single query """
+        if not ids:
+            return set()
+
+        rows = cls.get_base_query(db).filter(
+            cls.model.user_id == user_id,
+            cls.model.id.in_(set(ids))
+        ).with_entities(cls.model.id).all()
+        return {row.id for row in rows}
+
+    @classmethod
+    def update_indexes(
+        cls, db: Session, ordered_ids: list[int], user_id: int, start_index: int = 0, step: int = 1
+    ) -> None:
+        """
+        Sets index of each record according to its position in ordered_ids
+        using a single UPDATE ... SET index = CASE id WHEN ... END statement.
+        Ids that do not exist or belong to another user are skipped but still take their position.
+        """
+        if not ordered_ids:
+            return
+
+        new_indexes = {
+            record_id: start_index + position * step for position, record_id in enumerate(ordered_ids)
+        }
+        values = {'index': case(new_indexes, value=cls.model.id)}
+        if getattr(cls.model, '__change_tracked__', False):
+            values['change_seq'] = next_change_seq(db, user_id)
+
+        cls.get_base_query(db).filter(
+            cls.model.user_id == user_id,
+            cls.model.id.in_(new_indexes.keys())
+        ).update(values, synchronize_session='fetch')
+
+    # Async variants of the helpers above, to be used with AsyncSession
+
+    @classmethod
+    def get_base_select(cls) -> Select:
+        return select(cls.model).where(cls.model.is_deleted.is_(False))
+
+    @classmethod
+    async def async_get_or_create(
+        cls, db: AsyncSession, defaults: dict | None = None, **kwargs
+    ) -> tuple[T, bool]:
+        instance = (await db.scalars(cls.get_base_select().filter_by(**kwargs).limit(1))).first()
+        if instance:
+            return instance, False
+
+        params = {k: v for k, v in kwargs.items()}
+        params.update(defaults or {})
+        instance = cls.model(**params)
+        db.add(instance)
+
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            instance = (await db.scalars(cls.get_base_select().filter_by(**kwargs).limit(1))).first()
+            return instance, False
+
+        await db.refresh(instance)
+        return instance, True
+
+    @classmethod
+    async def async_get_existing_ids(cls, db: AsyncSession, ids: list[int], user_id: int) -> set[int]:
+        """ Returns the subset of provided ids that exist and belong to the user, using a single query """
+        if not ids:
+            return set()
+
+        result = await db.scalars(
+            cls.get_base_select().with_only_columns(cls.model.id).where(
+                cls.model.user_id == user_id,
+                cls.model.id.in_(set(ids))
+            )
+        )
+        return set(result.all())
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+import psycopg2
+from sqlalchemy import event as sa_event, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db_utils import CHANGE_SEQS_SESSION_KEY
+from app.core.metrics import register_stats_provider
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel shared by all API workers
+CHANGE_EVENTS_CHANNEL = 'perga_change_events'
+
+
+def format_sse(event_name: str, data: dict) -> str:
+    return f'event: {event_name}\ndata: {json.dumps(data)}\n\n'
+
+
+class PostgresNotifyBackend:
+    """
+    Delivers events to subscribers of all API workers through Postgres LISTEN/NOTIFY.
+    A daemon thread listens on a dedicated connection and passes received events to deliver.
+    Events are published with pg_notify within the transaction of the change, so Postgres sends them on commit
+    without an extra connection or round trip after it, and drops them on rollback.
+    """
+    def __init__(self, connect: Callable[[], Any], deliver: Callable[[int, dict], None], poll_timeout: float = 1.0):
+        self.connect = connect
+        self.deliver = deliver
+        self.poll_timeout = poll_timeout
+
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def _open(connect: Callable[[], Any]):
+        connection = connect()
+        # notifications are received outside of transactions
+        connection.autocommit = True
+        return connection
+
+    @staticmethod
+    def publish(db: Session, user_id: int, event: dict) -> None:
+        """ Queues the event in the current transaction of db, it's sent to listeners when the transaction commits """
+        payload = json.dumps({'user_id': user_id, **event})
+        db.execute(text('SELECT pg_notify(:channel, :payload)'), {'channel': CHANGE_EVENTS_CHANNEL, 'payload': payload})
+
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._stopped.clear()
+            self._listener = threading.Thread(target=self._listen, name='change-events-listener', daemon=True)
+            self._listener.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.join()
+            self._listener = None
+
+    def _listen(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                connection = self._open(self.connect)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANGE_EVENTS_CHANNEL}')
+                while not self._stopped.is_set():
+                    if select.select([connection], [], [], self.poll_timeout) != ([], [], []):
+                        self._handle_notifies(connection)
+                connection.close()
+            except Exception as e:
+                # reconnect after a lost connection, events sent meanwhile are caught up by the sync API
+                logger.warning(f'PostgresNotifyBackend.listen: {str(e)}')
+                self._stopped.wait(self.poll_timeout)
+
+    def _handle_notifies(self, connection) -> None:
+        connection.poll()
+        while connection.notifies:
+            notify = connection.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+                self.deliver(event.pop('user_id'), event)
+            except (ValueError, KeyError) as e:
+                logger.warning(f'PostgresNotifyBackend.handle_notifies: {str(e)}')
+
+
+class ChangeEventsBroker:
+    """
+    In-process pub/sub of user change events, used to push changes to SSE clients instead of polling.
+    Subscribers are asyncio queues, events can be published from any thread. When a subscriber queue is full
+    the oldest event is dropped, since clients need only the latest change_seq to catch up.
+    With a backend set, events are published through it and delivered to subscribers of all workers.
+    """
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.backend: PostgresNotifyBackend | None = None
+
+        self._lock = threading.Lock()
+        # { <user_id>: { <queue>: <event loop of the queue> } }
+        self._subscribers: dict[int, dict[asyncio.Queue, asyncio.AbstractEventLoop]] = {}
+
+        self._published = 0
+        self._delivered = 0
+        self._dropped = 0
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """ Should be called from the event loop which reads the queue """
+        if self.backend is not None:
+            self.backend.start()
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, {})[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            user_subscribers = self._subscribers.get(user_id, {})
+            user_subscribers.pop(queue, None)
+            if not user_subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id: int, event: dict) -> None:
+        """ Passes committed event to subscribers of this process, used without a backend """
+        with self._lock:
+            self._published += 1
+        self.deliver(user_id, event)
+
+    def publish_in_transaction(self, db: Session, user_id: int, event: dict) -> None:
+        """ Publishes event through the backend within the current transaction of db """
+        with self._lock:
+            self._published += 1
+        self.backend.publish(db, user_id, event)
+
+    def deliver(self, user_id: int, event: dict) -> None:
+        """ Passes event to subscribers of the user in this process """
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, {}).items())
+
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:
+                # event loop of a disconnected client is closed
+                self.unsubscribe(user_id, queue)
+
+    def _put(self, queue: asyncio.Queue, event: dict) -> None:
+        if queue.full():
+            queue.get_nowait()
+            with self._lock:
+                self._dropped += 1
+        queue.put_nowait(event)
+        with self._lock:
+            self._delivered += 1
+
+    async def iter_events(
+        self, user_id: int, queue: asyncio.Queue, first_event: dict, keepalive: float, max_seconds: float
+    ) -> AsyncIterator[str]:
+        """
+        Yields server-sent events of the subscribed queue, starting with first_event,
+        and a comment line after keepalive seconds without events, so proxies don't close the connection.
+        Unsubscribes when the stream ends after max_seconds or the client disconnects.
+        """
+        deadline = time.monotonic() + max_seconds
+        try:
+            yield format_sse('changes', first_event)
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=min(keepalive, remaining))
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse('changes', event)
+        finally:
+            self.unsubscribe(user_id, queue)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'backend': 'postgres' if self.backend is not None else 'memory',
+                'users': len(self._subscribers),
+                'subscribers': sum(len(queues) for queues in self._subscribers.values()),
+                'published': self._published,
+                'delivered': self._delivered,
+                'dropped': self._dropped,
+            }
+
+
+def publish_pending_changes(session: Session) -> None:
+    """
+    before_commit listener publishing changes of the transaction through the backend, if it's set.
+    Session is flushed first, so change sequences of rows flushed by the commit are published too.
+    """
+    if change_events.backend is None:
+        return
+
+    session.flush()
+    for user_id, change_seq in session.info.pop(CHANGE_SEQS_SESSION_KEY, {}).items():
+        change_events.publish_in_transaction(session, user_id, {'change_seq': change_seq})
+
+
+def publish_committed_changes(session: Session) -> None:
+    """ after_commit listener notifying subscribers of users whose rows were changed in the transaction """
+    for user_id, change_seq in session.info.pop(CHANGE_SEQS_SESSION_KEY, {}).items():
+        change_events.publish(user_id, {'change_seq': change_seq})
+
+
+def discard_rolled_back_changes(session: Session) -> None:
+    session.info.pop(CHANGE_SEQS_SESSION_KEY, None)
+
+
+def _connect_postgres():
+    return psycopg2.connect(settings.sqlalchemy_database_uri)
+
+
+change_events = ChangeEventsBroker(queue_size=settings.SYNC_EVENTS_QUEUE_SIZE)
+if settings.SYNC_EVENTS_BACKEND == 'postgres':
+    change_events.backend = PostgresNotifyBackend(connect=_connect_postgres, deliver=change_events.deliver)
+register_stats_provider('change_events', change_events.get_stats)
+sa_event.listen(Session, 'before_commit', publish_pending_changes)
+sa_event.listen(Session, 'after_commit', publish_committed_changes)
+sa_event.listen(Session, 'after_rollback', discard_rolled_back_changes)
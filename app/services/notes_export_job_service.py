@@ -0,0 +1,222 @@
+import datetime as dt
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from sqlalchemy import update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.const.notes import ExportJobStatus, ExportTarget, EXPORT_JOB_HEARTBEAT_SECONDS, EXPORT_JOB_PROGRESS_STEP
+from app.core.config import settings
+from app.core.file_utils import ensure_private_dir, open_private_file
+from app.models.notes import NotesExportJob
+from app.schemas.notes_export import NotesExportJobCreateSchema
+from app.services.base_service import BaseService
+from app.services.notes_export_service import NotesExportService
+from app.services.notes_folders_service import NotesFolderService
+
+logger = logging.getLogger(__name__)
+
+
+class NotesExportJobService(BaseService[NotesExportJob]):
+    """
+    Builds folder and account ZIP exports to EXPORT_JOBS_DIR in background worker threads,
+    so large exports don't run inside HTTP requests.
+    """
+    model = NotesExportJob
+
+    _executor: ThreadPoolExecutor | None = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=settings.EXPORT_JOB_WORKERS, thread_name_prefix='export_job'
+                )
+            return cls._executor
+
+    @classmethod
+    def get_job(cls, db: Session, job_id: int, user_id: int) -> NotesExportJob | None:
+        return cls.get_base_query(db).filter(NotesExportJob.user_id == user_id, NotesExportJob.id == job_id).first()
+
+    @classmethod
+    def get_downloadable_job(cls, db: Session, job_id: int, user_id: int) -> NotesExportJob | None:
+        """ Returns completed job if its archive has not expired yet """
+        return cls.get_base_query(db).filter(
+            NotesExportJob.user_id == user_id,
+            NotesExportJob.id == job_id,
+            NotesExportJob.status == ExportJobStatus.COMPLETED,
+            NotesExportJob.expires_dt > dt.datetime.now(dt.timezone.utc),
+        ).first()
+
+    @classmethod
+    def create_job(cls, db: Session, user_id: int, create_data: NotesExportJobCreateSchema) -> NotesExportJob | None:
+        """ Creates pending job for folder or all notes export, returns None if the folder is not found """
+        if create_data.export_target == ExportTarget.FOLDER_NOTES:
+            if not create_data.export_target_id:
+                return None
+            if not NotesFolderService.get_folder(db, folder_id=create_data.export_target_id, user_id=user_id):
+                return None
+
+        job = NotesExportJob(user_id=user_id, status=ExportJobStatus.PENDING, **create_data.model_dump())
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @classmethod
+    def submit_job(cls, bind: Engine | Connection, job_id: int) -> Future:
+        """ Runs the job in a worker thread, returned future resolves when the archive is built """
+        return cls._get_executor().submit(cls.run_job, bind, job_id)
+
+    @classmethod
+    def run_job(cls, bind: Engine | Connection, job_id: int) -> None:
+        """
+        Builds the job archive.
+        Notes are streamed with a separate session, so progress commits don't close the notes cursor.
+        """
+        jobs_db = Session(bind=bind)
+        notes_db = Session(bind=bind)
+        tmp_file_path = None
+        try:
+            # pending job is claimed with a single update, so a job submitted twice, e.g. by recover_jobs
+            # of another API worker, is run once
+            is_claimed = jobs_db.execute(
+                update(NotesExportJob)
+                .where(NotesExportJob.id == job_id, NotesExportJob.status == ExportJobStatus.PENDING)
+                .values(status=ExportJobStatus.RUNNING, updated_dt=dt.datetime.now(dt.timezone.utc))
+            ).rowcount
+            jobs_db.commit()
+            job = jobs_db.get(NotesExportJob, job_id)
+            if not is_claimed or not job:
+                return
+
+            folder_id = job.export_target_id if job.export_target == ExportTarget.FOLDER_NOTES else None
+            job.notes_total = NotesExportService.count_notes(notes_db, user_id=job.user_id, folder_id=folder_id)
+            jobs_db.commit()
+
+            # progress commits update updated_dt, which is the heartbeat checked by fail_stale_jobs,
+            # so slow notes, e.g. PDF renders, are committed by time as well
+            last_commit_time = time.monotonic()
+
+            def on_progress(processed_count: int):
+                nonlocal last_commit_time
+                if (
+                    processed_count % EXPORT_JOB_PROGRESS_STEP == 0 or
+                        time.monotonic() - last_commit_time >= EXPORT_JOB_HEARTBEAT_SECONDS
+                ):
+                    job.notes_done = processed_count
+                    jobs_db.commit()
+                    last_commit_time = time.monotonic()
+
+            if folder_id is not None:
+                zip_chunks, filename = NotesExportService.export_folder(
+                    notes_db, job.user_id, folder_id, job.export_type, on_progress=on_progress
+                )
+            else:
+                zip_chunks, filename = NotesExportService.export_all_notes(
+                    notes_db, job.user_id, job.export_type, on_progress=on_progress
+                )
+            if zip_chunks is None:
+                raise ValueError('Nothing to export')
+
+            ensure_private_dir(settings.EXPORT_JOBS_DIR)
+            file_path = os.path.join(settings.EXPORT_JOBS_DIR, f'{job.id}_{uuid.uuid4().hex}.zip')
+            tmp_file_path = f'{file_path}.tmp'
+            with open_private_file(tmp_file_path) as file:
+                for chunk in zip_chunks:
+                    file.write(chunk)
+            os.replace(tmp_file_path, file_path)
+            tmp_file_path = None
+
+            job.status = ExportJobStatus.COMPLETED
+            job.notes_done = job.notes_total
+            job.filename = filename
+            job.file_path = file_path
+            job.file_size = os.path.getsize(file_path)
+            job.expires_dt = dt.datetime.now(dt.timezone.utc) + dt.timedelta(minutes=settings.EXPORT_JOB_TTL_MINUTES)
+            jobs_db.commit()
+        except Exception as e:
+            logger.warning(f'run_job {job_id}: {str(e)}')
+            jobs_db.rollback()
+            job = jobs_db.get(NotesExportJob, job_id)
+            if job:
+                job.status = ExportJobStatus.FAILED
+                job.error = str(e)
+                jobs_db.commit()
+            if tmp_file_path and os.path.exists(tmp_file_path):
+                os.remove(tmp_file_path)
+        finally:
+            notes_db.close()
+            jobs_db.close()
+
+    @classmethod
+    def fail_stale_jobs(cls, db: Session) -> int:
+        """
+        Fails running jobs without progress for EXPORT_JOB_STALE_MINUTES, e.g. interrupted by a restart,
+        so clients stop polling them. Returns the number of failed jobs.
+        """
+        stale_dt = dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=settings.EXPORT_JOB_STALE_MINUTES)
+        return cls.get_base_query(db).filter(
+            NotesExportJob.status == ExportJobStatus.RUNNING,
+            NotesExportJob.updated_dt <= stale_dt,
+        ).update({
+            'status': ExportJobStatus.FAILED,
+            'error': 'Export was interrupted, try again',
+            'updated_dt': dt.datetime.now(dt.timezone.utc),
+        }, synchronize_session=False)
+
+    @classmethod
+    def recover_jobs(cls, db: Session) -> list[int]:
+        """ Fails stale jobs, returns ids of pending jobs, which have to be resubmitted """
+        cls.fail_stale_jobs(db)
+        db.commit()
+
+        pending_jobs = db.query(NotesExportJob.id).filter(
+            NotesExportJob.is_deleted.is_(False),
+            NotesExportJob.status == ExportJobStatus.PENDING,
+        ).order_by(NotesExportJob.id)
+        return [job.id for job in pending_jobs]
+
+    @classmethod
+    def resume_jobs(cls, bind: Engine | Connection) -> list[Future]:
+        """ Recovers jobs left by a stopped process and submits pending ones, called on startup """
+        db = Session(bind=bind)
+        try:
+            job_ids = cls.recover_jobs(db)
+        except Exception as e:
+            logger.warning(f'resume_jobs: {str(e)}')
+            return []
+        finally:
+            db.close()
+
+        return [cls.submit_job(bind, job_id) for job_id in job_ids]
+
+    @classmethod
+    def cleanup_expired_jobs(cls, db: Session) -> int:
+        """ Removes archives of expired jobs and marks them as expired, returns the number of expired jobs """
+        jobs = cls.get_base_query(db).filter(
+            NotesExportJob.status == ExportJobStatus.COMPLETED,
+            NotesExportJob.expires_dt <= dt.datetime.now(dt.timezone.utc),
+        ).all()
+        for job in jobs:
+            if job.file_path:
+                try:
+                    os.remove(job.file_path)
+                except FileNotFoundError:
+                    pass
+            job.status = ExportJobStatus.EXPIRED
+            job.file_path = None
+        db.commit()
+        return len(jobs)
+
+    @classmethod
+    def maintain_jobs(cls, db: Session) -> None:
+        """ Fails stale jobs and removes expired archives, called periodically while the app is running """
+        cls.fail_stale_jobs(db)
+        cls.cleanup_expired_jobs(db)
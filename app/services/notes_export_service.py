@@ -1,38 +1,52 @@
 import io
+import logging
 import zipfile
+from collections.abc import Callable, Iterable, Iterator
 from markdownify import markdownify
-from weasyprint import HTML
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
-from app.const.notes import ExportType, EXPORT_TYPE_EXTENSION_MAP
-from app.models.notes import Note, NotesFolder
+from app.const.notes import ExportType, EXPORT_TYPE_EXTENSION_MAP, EXPORT_NOTES_BATCH_SIZE, EXPORT_ERRORS_FILENAME
+from app.models.notes import Note
 from app.services.notes_service import NoteService
 from app.services.notes_folders_service import NotesFolderService
+from app.services.pdf_render_pool import pdf_render_pool, render_pdf
+from app.services.render_cache import render_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ZipStreamWriter(io.RawIOBase):
+    """
+    Unseekable file object for zipfile which keeps only bytes written since the last pop().
+    zipfile writes local headers with data descriptors to such streams,
+    so the archive can be sent to the client while it's being built.
+    """
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
 
 
 class NotesExportService:
     @classmethod
-    def _generate_pdf_content(cls, note: Note) -> bytes:
+    def _generate_pdf_content(cls, note: Note | Row) -> bytes:
         """ Generate PDF content from note body HTML. """
-        html_content = f"""
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <style>
-                    body {{ font-family: Arial, sans-serif; padding: 40px; }}
-                    h1 {{ font-size: 24px; margin-bottom: 16px; }}
-                </style>
-            </head>
-            <body>
-                <h1>{note.title}</h1>
-                {note.body}
-            </body>
-            </html>
-        """
-        return HTML(string=html_content).write_pdf()
+        return render_pdf(note.title, note.body)
 
     @classmethod
-    def _get_note_content(cls, note: Note, export_type: ExportType) -> str | bytes:
+    def _get_note_content(cls, note: Note | Row, export_type: ExportType) -> str | bytes:
         """ Notes body stored as HTML. Converts it to a specified format if needed and adds a title. """
         note_content: str | bytes
         if export_type == ExportType.MARKDOWN:
@@ -46,7 +60,7 @@ class NotesExportService:
         return note_content
 
     @classmethod
-    def _generate_export_filename(cls, note: Note, export_type: ExportType) -> str:
+    def _generate_export_filename(cls, note: Note | Row, export_type: ExportType) -> str:
         extension = EXPORT_TYPE_EXTENSION_MAP[export_type]
 
         # sanitiza filename
@@ -59,18 +73,73 @@ class NotesExportService:
         return f'{safe_title}.{extension}'
 
     @classmethod
-    def _create_zip_archive(cls, items: list[Note | tuple[Note, str]], export_type: ExportType) -> io.BytesIO:
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, False) as zip_file:
+    def _get_cached_note_content(cls, note: Note | Row, export_type: ExportType) -> str | bytes:
+        """
+        Returns Markdown content from the render cache, rendering and caching it on miss.
+        HTML is only concatenated, so it's rendered faster than read from the cache.
+        """
+        if export_type != ExportType.MARKDOWN:
+            return cls._get_note_content(note, export_type)
+
+        cache_key = render_cache.make_key(export_type, note.title, note.body)
+        content = render_cache.get(cache_key)
+        if content is not None:
+            return content.decode('utf-8')
+
+        note_content = cls._get_note_content(note, export_type)
+        render_cache.set(cache_key, note_content.encode('utf-8'))
+        return note_content
+
+    @classmethod
+    def _iter_notes_content(
+        cls, items: Iterable[tuple[Note | Row, str]], export_type: ExportType
+    ) -> Iterator[tuple[Note | Row, str, str | bytes | None, str | None]]:
+        """
+        Yields (<note>, <rel_path>, <content>, <error>) in the order of items.
+        PDFs are rendered in the PDF render pool, a note which failed to render has content set to None.
+        Rendered PDF and Markdown notes are reused from the render cache.
+        """
+        if export_type == ExportType.PDF:
+            rendered = pdf_render_pool.render_many(
+                ((item, item[0].title, item[0].body) for item in items), cache=render_cache
+            )
+            for (note, rel_path), content, error in rendered:
+                yield note, rel_path, content, error
+            return
+
+        for note, rel_path in items:
+            try:
+                content = cls._get_cached_note_content(note, export_type)
+            except Exception as e:
+                logger.warning(f'_get_note_content: {str(e)}')
+                yield note, rel_path, None, str(e)
+                continue
+            yield note, rel_path, content, None
+
+    @classmethod
+    def _create_zip_archive(
+        cls,
+        items: Iterable[Note | Row | tuple[Note | Row, str]],
+        export_type: ExportType,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Yields ZIP archive chunks as notes are rendered,
+        so only a few notes content is kept in memory at a time.
+        Notes which failed to render are skipped and listed in EXPORT_ERRORS_FILENAME.
+        on_progress is called with the number of processed notes after each note.
+        """
+        items_with_paths = (item if isinstance(item, tuple) else (item, '') for item in items)
+
+        stream = ZipStreamWriter()
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED, False) as zip_file:
             used_filenames = set()
-            for item in items:
-                if isinstance(item, tuple):
-                    note, rel_path = item
-                else:
-                    note = item
-                    rel_path = ''
-
-                content = cls._get_note_content(note, export_type)
+            errors = []
+            notes_iter = cls._iter_notes_content(items_with_paths, export_type)
+            for processed_count, (note, rel_path, content, error) in enumerate(notes_iter, start=1):
+                if on_progress:
+                    on_progress(processed_count)
+
                 base_filename = cls._generate_export_filename(note, export_type)
                 
                 if rel_path:
@@ -85,31 +154,57 @@ class NotesExportService:
                     counter += 1
 
                 used_filenames.add(filename)
+                if error is not None:
+                    errors.append(f'{filename}: {error}')
+                    continue
+
                 zip_file.writestr(filename, content)
 
-        zip_buffer.seek(0)
-        return zip_buffer
+                chunk = stream.pop()
+                if chunk:
+                    yield chunk
+
+            if errors:
+                zip_file.writestr(EXPORT_ERRORS_FILENAME, '\n'.join(errors) + '\n')
+
+        # central directory is written on close
+        yield stream.pop()
 
     @classmethod
-    def _get_notes_with_paths(cls, folder: NotesFolder, current_path: str = '') -> list[tuple[Note, str]]:
-        items = []
-        for note in folder.notes:
-            if not note.is_deleted:
-                items.append((note, current_path))
-        
-        for subfolder in folder.subfolders:
-            if not subfolder.is_deleted:
-                new_path = f"{current_path}/{subfolder.name}".strip('/')
-                items.extend(cls._get_notes_with_paths(subfolder, new_path))
-        return items
+    def _get_folder_paths(cls, db: Session, folder_id: int, user_id: int) -> dict[int, str]:
+        """
+        Returns paths of the folder and all its non-deleted subfolders relative to the folder,
+        { <folder_id>: <path> }, loading the subtree with a single recursive query.
+        """
+        folder_paths = {}
+        for folder in NotesFolderService.get_subtree_folders(db, [folder_id], user_id):
+            if folder.depth == 0:
+                folder_paths[folder.id] = ''
+            else:
+                folder_paths[folder.id] = f"{folder_paths[folder.parent_id]}/{folder.name}".strip('/')
+        return folder_paths
+
+    @classmethod
+    def _iter_notes(cls, db: Session, user_id: int, folder_ids: Iterable[int] | None = None) -> Iterator[Row]:
+        """
+        Iterates over notes of the user through a server-side cursor,
+        fetching only columns needed for export in batches of EXPORT_NOTES_BATCH_SIZE.
+        """
+        query = NoteService.get_base_query(db).filter(Note.user_id == user_id)
+        if folder_ids is not None:
+            query = query.filter(Note.folder_id.in_(folder_ids))
+
+        query = query.with_entities(Note.id, Note.title, Note.body, Note.folder_id).order_by(Note.id)
+        yield from query.execution_options(yield_per=EXPORT_NOTES_BATCH_SIZE, stream_results=True)
 
     @classmethod
-    def _get_all_notes_in_folder(cls, folder: NotesFolder) -> list[Note]:
-        notes = [note for note in folder.notes if not note.is_deleted]
-        for subfolder in folder.subfolders:
-            if not subfolder.is_deleted:
-                notes.extend(cls._get_all_notes_in_folder(subfolder))
-        return notes
+    def count_notes(cls, db: Session, user_id: int, folder_id: int | None = None) -> int:
+        """ Counts notes exported with the folder and its subfolders or with all notes if folder_id is None """
+        query = NoteService.get_base_query(db).filter(Note.user_id == user_id)
+        if folder_id is not None:
+            folder_paths = cls._get_folder_paths(db, folder_id=folder_id, user_id=user_id)
+            query = query.filter(Note.folder_id.in_(folder_paths.keys()))
+        return query.count()
 
     @classmethod
     def export_single_note(
@@ -125,21 +220,31 @@ class NotesExportService:
 
     @classmethod
     def export_folder(
-        cls, db: Session, user_id: int, folder_id: int, export_type: ExportType
-    ) -> tuple[io.BytesIO, str] | tuple[None, None]:
+        cls,
+        db: Session,
+        user_id: int,
+        folder_id: int,
+        export_type: ExportType,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> tuple[Iterator[bytes], str] | tuple[None, None]:
         folder = NotesFolderService.get_folder(db, folder_id=folder_id, user_id=user_id)
         if not folder:
             return None, None
         
-        items = cls._get_notes_with_paths(folder)
-        return cls._create_zip_archive(items, export_type), f'notes_folder_{folder.name}.zip'
+        folder_paths = cls._get_folder_paths(db, folder_id=folder.id, user_id=user_id)
+        items = (
+            (note, folder_paths[note.folder_id])
+            for note in cls._iter_notes(db, user_id=user_id, folder_ids=folder_paths.keys())
+        )
+        return cls._create_zip_archive(items, export_type, on_progress), f'notes_folder_{folder.name}.zip'
 
     @classmethod
     def export_all_notes(
-        cls, db: Session, user_id: int, export_type: ExportType
-    ) -> tuple[io.BytesIO, str] | tuple[None, None]:
-        notes = NoteService.get_base_query(db).filter(Note.user_id == user_id).all()
-        if not notes:
+        cls, db: Session, user_id: int, export_type: ExportType, on_progress: Callable[[int], None] | None = None
+    ) -> tuple[Iterator[bytes], str] | tuple[None, None]:
+        has_notes = NoteService.get_base_query(db).filter(Note.user_id == user_id).with_entities(Note.id).first()
+        if not has_notes:
             return None, None
 
-        return cls._create_zip_archive(notes, export_type), 'all_notes.zip'
+        notes = cls._iter_notes(db, user_id=user_id)
+        return cls._create_zip_archive(notes, export_type, on_progress), 'all_notes.zip'
@@ -1,7 +1,10 @@
-from sqlalchemy.orm import Session
+import datetime as dt
+from sqlalchemy import Row, func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
 
 from app.const.notes import NotesFolderType
-from app.models.notes import NotesFolder
+from app.core.db_utils import next_change_seq
+from app.models.notes import Note, NotesFolder
 from app.schemas.notes_folders import NotesFolderCreateSchema, NotesFolderUpdateSchema
 from app.services.base_service import BaseService
 
@@ -30,6 +33,30 @@ class NotesFolderService(BaseService[NotesFolder]):
         db.refresh(db_folder)
         return db_folder
 
+    @classmethod
+    def insert_folders(
+        cls, db: Session, user_id: int, folders_data: list[NotesFolderCreateSchema], change_seq: int
+    ) -> list[int]:
+        """
+        Inserts folders with a single INSERT ... RETURNING statement without committing, so it can be a part
+        of a bigger transaction. Parent folders must exist. Returns ids in the order of folders_data.
+        """
+        if not folders_data:
+            return []
+
+        return list(db.scalars(
+            insert(NotesFolder).returning(NotesFolder.id, sort_by_parameter_order=True),
+            [
+                {
+                    **data.model_dump(),
+                    'user_id': user_id,
+                    'folder_type': NotesFolderType.REGULAR,
+                    'change_seq': change_seq,
+                }
+                for data in folders_data
+            ]
+        ))
+
     @classmethod
     def update_folder(
         cls, db: Session, folder_id: int, user_id: int, update_data: NotesFolderUpdateSchema
@@ -82,33 +109,109 @@ class NotesFolderService(BaseService[NotesFolder]):
         )
         return instance
 
+    @classmethod
+    def get_subtree_folders(
+        cls, db: Session, folder_ids: list[int], user_id: int, include_deleted: bool = False
+    ) -> list[Row]:
+        """
+        Loads folders with all their subfolders using a single WITH RECURSIVE query.
+        Rows have id, parent_id, folder_type, name and depth, parents go before their children.
+        """
+        anchor = select(
+            NotesFolder.id, NotesFolder.parent_id, NotesFolder.folder_type, NotesFolder.name, literal(0).label('depth')
+        ).where(NotesFolder.user_id == user_id, NotesFolder.id.in_(folder_ids))
+        if not include_deleted:
+            anchor = anchor.where(NotesFolder.is_deleted.is_(False))
+        tree = anchor.cte('folders_tree', recursive=True)
+
+        subfolder = aliased(NotesFolder)
+        subfolders = select(
+            subfolder.id, subfolder.parent_id, subfolder.folder_type, subfolder.name, tree.c.depth + 1
+        ).join(tree, subfolder.parent_id == tree.c.id).where(subfolder.user_id == user_id)
+        if not include_deleted:
+            subfolders = subfolders.where(subfolder.is_deleted.is_(False))
+        tree = tree.union_all(subfolders)
+
+        return db.execute(select(tree).order_by(tree.c.depth, tree.c.id)).all()
+
+    @classmethod
+    def get_folders_tree(cls, db: Session, folder_ids: list[int], user_id: int) -> dict[int, dict]:
+        """
+        Builds nested trees of folders with their subfolders and notes metadata using two queries,
+        { <folder_id>: {'id': ..., 'name': ..., 'notes': [...], 'subfolders': [...]} }
+        """
+        folders = {}
+        for folder in cls.get_subtree_folders(db, folder_ids, user_id):
+            folders[folder.id] = {
+                'id': folder.id,
+                'parent_id': folder.parent_id,
+                'folder_type': folder.folder_type,
+                'name': folder.name,
+                'notes': [],
+                'subfolders': [],
+            }
+            if folder.depth > 0:
+                folders[folder.parent_id]['subfolders'].append(folders[folder.id])
+
+        notes = db.query(Note.id, Note.folder_id, Note.title, Note.updated_dt).filter(
+            Note.user_id == user_id,
+            Note.folder_id.in_(folders.keys()),
+            Note.is_deleted.is_(False),
+        ).order_by(Note.id)
+        for note in notes:
+            folders[note.folder_id]['notes'].append(note._asdict())
+
+        return {folder_id: folders[folder_id] for folder_id in folder_ids if folder_id in folders}
+
     @classmethod
     def get_folders(cls, db: Session, user_id: int) -> dict:
         root_folder = cls.get_root_folder(db, user_id)
         trash_folder = cls.get_trash_folder(db, user_id)
+        folders_tree = cls.get_folders_tree(db, [root_folder.id, trash_folder.id], user_id)
         return {
-            'root_folder': root_folder,
-            'trash_folder': trash_folder
+            'root_folder': folders_tree[root_folder.id],
+            'trash_folder': folders_tree[trash_folder.id]
         }
 
+    @classmethod
+    def get_folders_version(cls, db: Session, user_id: int) -> tuple:
+        """
+        Returns last update dates and counts of user folders and notes, including deleted ones, using a single query.
+        Any change of the folders tree changes the version, so it can be used for ETag without loading the tree.
+        """
+        def aggregate(model, column):
+            return select(column).where(model.user_id == user_id).scalar_subquery()
+
+        return tuple(db.execute(select(
+            aggregate(NotesFolder, func.max(NotesFolder.updated_dt)),
+            aggregate(NotesFolder, func.count(NotesFolder.id)),
+            aggregate(Note, func.max(Note.updated_dt)),
+            aggregate(Note, func.count(Note.id)),
+        )).one())
+
     @classmethod
     def empty_trash(cls, db: Session, user_id: int) -> None:
+        """ Marks all subfolders and notes in the trash as deleted with two bulk updates """
         trash_folder = cls.get_trash_folder(db, user_id)
-        
-        def mark_children_as_deleted(folder: NotesFolder):
-            """ Recursively mark subfolders and notes as deleted """
-            # Mark all notes in this folder as deleted
-            for note in folder.notes:
-                if not note.is_deleted:
-                    note.mark_as_deleted()
-            
-            # Recursively mark subfolders and their contents as deleted
-            for subfolder in folder.subfolders:
-                if not subfolder.is_deleted:
-                    subfolder.mark_as_deleted()
-                mark_children_as_deleted(subfolder)
+        folder_ids = [
+            folder.id for folder in cls.get_subtree_folders(db, [trash_folder.id], user_id, include_deleted=True)
+        ]
+        deleted_values = {
+            'is_deleted': True,
+            'deleted_dt': dt.datetime.now(dt.timezone.utc),
+            'change_seq': next_change_seq(db, user_id),
+        }
+
+        db.query(Note).filter(
+            Note.user_id == user_id,
+            Note.folder_id.in_(folder_ids),
+            Note.is_deleted.is_(False),
+        ).update(deleted_values, synchronize_session='fetch')
 
-        mark_children_as_deleted(trash_folder)
+        cls.get_base_query(db).filter(
+            NotesFolder.user_id == user_id,
+            NotesFolder.id.in_([folder_id for folder_id in folder_ids if folder_id != trash_folder.id]),
+        ).update(deleted_values, synchronize_session='fetch')
         db.commit()
 
     @classmethod
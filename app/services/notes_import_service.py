@@ -1,160 +1,352 @@
-import html
+import datetime as dt
+import hashlib
 import io
-import markdown
-import os
-import re
+import logging
 import zipfile
-from bs4 import BeautifulSoup
+from collections.abc import Iterator
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
+from typing import BinaryIO, NamedTuple
 
-from app.models.notes import Note
+from app.const.notes import IMPORT_NOTES_BATCH_SIZE, IMPORT_PATH_MAX_LENGTH, IMPORT_SIZE_LIMIT
+from app.core.db_utils import atomic_transaction, next_change_seq, TransactionRollback
+from app.models.notes import Note, NotesImportFingerprint
 from app.schemas.notes import NoteCreateSchema
 from app.schemas.notes_folders import NotesFolderCreateSchema
+from app.services.notes_parse_pool import notes_parse_pool
+from app.services.notes_parser import parse_note_file
 from app.services.notes_service import NoteService
 from app.services.notes_folders_service import NotesFolderService
 
+logger = logging.getLogger(__name__)
 
-class NotesImportService:
-    @classmethod
-    def _parse_html(cls, content: str) -> tuple[str, str]:
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # try to find a title
-        title = ''
-        if soup.title and soup.title.string:
-            title = soup.title.string.strip()
-        elif first_h1 := soup.find('h1'):
-            title = first_h1.get_text().strip()
-            first_h1.decompose() # remove the first title tag from the body to avoid duplication
-
-        # get body content as a string with HTML
-        if soup.body:
-            contents = soup.body.contents
-        else:
-            contents = soup.contents
-        body = ''.join(str(tag) for tag in contents)
-
-        return title or 'Untitled Note', body
 
-    @classmethod
-    def _parse_markdown(cls, content: str) -> tuple[str, str]:
-        lines = content.splitlines()
-        title = 'Untitled Note'
-        body_start_index = 0
-        
-        for index, line in enumerate(lines):
-            if line.startswith('# '):
-                title = line[2:].strip()
-                body_start_index = index + 1
-                break
-        
-        body_md = '\n'.join(lines[body_start_index:]).strip()
-        body_html = markdown.markdown(body_md)
-        # to avoid losing line breaks, replace \n with empty paragraph tags
-        # but not in between of lists
-        body_html = re.sub(r'\n(?=<(?!li|/ul|/ol))', '<p></p>', body_html)
-        return title, body_html
+class NotesImportResult(NamedTuple):
+    created: int
+    updated: int
+    # unchanged files of incremental imports
+    skipped: int
 
-    @classmethod
-    def _parse_txt(cls, content: str, filename: str) -> tuple[str, str]:
-        title = os.path.splitext(filename)[0]
-        body_html = f'<p>{html.escape(content)}</p>'
-        return title, body_html
 
+class ImportFingerprint(NamedTuple):
+    id: int
+    content_hash: str
+    note_id: int
+    # the note should be created again instead of being updated
+    is_stale: bool
+
+
+class NotesImportError(Exception):
+    """ Uploaded file failed to import, the whole upload is rolled back """
+    def __init__(self, filename: str):
+        super().__init__(f'Failed to import {filename}')
+        self.filename = filename
+
+
+class NotesImportService:
     @classmethod
     def import_file(
         cls, db: Session, user_id: int, filename: str, content: bytes, folder_id: int
     ) -> Note | None:
         """ Import a single file as a note. """
-        extension = os.path.splitext(filename)[1].lower()
-        
-        try:
-            text_content = content.decode('utf-8')
-        except UnicodeDecodeError:
-            # skip non utf-8 files
-            return None
-
-        # parse file content and get the body as HTML
-        if extension == '.md':
-            title, body = cls._parse_markdown(text_content)
-        elif extension in ('.html', '.htm'):
-            title, body = cls._parse_html(text_content)
-        elif extension == '.txt':
-            title, body = cls._parse_txt(text_content, filename)
-        else:
+        parsed = parse_note_file(filename, content)
+        if parsed is None:
             return None
 
+        title, body = parsed
         return NoteService.create_note(
             db,
             user_id,
             NoteCreateSchema(folder_id=folder_id, title=title, body=body)
         )
 
+    @classmethod
+    def _get_folders_map(cls, db: Session, user_id: int, folder_id: int) -> dict[str, int]:
+        """
+        Maps paths of existing subfolders of the import folder to their ids with a single query,
+        so incremental imports reuse folders of previous imports: { <path>: <folder_id> }
+        """
+        paths, folders_map = {}, {}
+        for folder in NotesFolderService.get_subtree_folders(db, [folder_id], user_id):
+            parent_path = paths.get(folder.parent_id, '')
+            path = f'{parent_path}/{folder.name}' if parent_path else folder.name
+            paths[folder.id] = path if folder.depth else ''
+            # of subfolders with the same name the first one is used
+            folders_map.setdefault(paths[folder.id], folder.id)
+        return folders_map
+
+    @classmethod
+    def _insert_folders(
+        cls, db: Session, user_id: int, folder_paths: set[str], folders_map: dict[str, int], change_seq: int
+    ) -> dict[str, int]:
+        """
+        Inserts folders of paths missing in folders_map with a single statement per nesting level, parents go first.
+        Returns folders_map updated with ids of inserted folders: { <path>: <folder_id> },
+        the empty path is the import folder.
+        """
+        folders_map = dict(folders_map)
+        paths_by_depth = {}
+        for path in folder_paths - folders_map.keys():
+            paths_by_depth.setdefault(path.count('/'), []).append(path)
+
+        for depth in sorted(paths_by_depth):
+            paths = sorted(paths_by_depth[depth])
+            folder_ids = NotesFolderService.insert_folders(db, user_id, [
+                NotesFolderCreateSchema(parent_id=folders_map[path.rpartition('/')[0]], name=path.rpartition('/')[2])
+                for path in paths
+            ], change_seq)
+            folders_map.update(zip(paths, folder_ids))
+        return folders_map
+
+    @classmethod
+    def _get_fingerprints(
+        cls, db: Session, user_id: int, folder_id: int, folders_map: dict[str, int]
+    ) -> dict[str, ImportFingerprint]:
+        """
+        Loads fingerprints of files imported into the folder: { <path>: <fingerprint> }.
+        A fingerprint is stale if its note was deleted or moved out of the live folders of folders_map,
+        e.g. to the trash, such notes are created again instead of being updated.
+        """
+        live_folder_ids = set(folders_map.values())
+        rows = db.execute(
+            select(
+                NotesImportFingerprint.id,
+                NotesImportFingerprint.path,
+                NotesImportFingerprint.content_hash,
+                NotesImportFingerprint.note_id,
+                Note.folder_id,
+                Note.is_deleted,
+            )
+            .join(Note, Note.id == NotesImportFingerprint.note_id)
+            .where(
+                NotesImportFingerprint.user_id == user_id,
+                NotesImportFingerprint.folder_id == folder_id,
+                NotesImportFingerprint.is_deleted.is_(False),
+            )
+        )
+        return {
+            row.path: ImportFingerprint(
+                id=row.id,
+                content_hash=row.content_hash,
+                note_id=row.note_id,
+                is_stale=row.is_deleted or row.folder_id not in live_folder_ids,
+            )
+            for row in rows
+        }
+
+    @classmethod
+    def _import_notes_batch(
+        cls,
+        db: Session,
+        user_id: int,
+        folder_id: int,
+        notes_batch: list[tuple[str, str | None, NoteCreateSchema]],
+        fingerprints: dict[str, ImportFingerprint] | None,
+        change_seq: int
+    ) -> tuple[int, int]:
+        """
+        Writes a batch of (<path>, <content hash>, <note>) parsed files, returns numbers of created and updated notes.
+        Without fingerprints all notes are inserted, otherwise previously imported notes are updated in place
+        and fingerprints are saved, so the next incremental import can skip unchanged files.
+        """
+        if fingerprints is None:
+            NoteService.insert_notes(db, user_id, [note for _, _, note in notes_batch], change_seq, is_clean=True)
+            return len(notes_batch), 0
+
+        # notes deleted or trashed since the previous import are created again
+        new_notes, changed_notes = [], []
+        for path, content_hash, note in notes_batch:
+            fingerprint = fingerprints.get(path)
+            if fingerprint is None or fingerprint.is_stale:
+                new_notes.append((path, content_hash, note))
+            else:
+                changed_notes.append((path, content_hash, note))
+
+        note_ids = NoteService.insert_notes(
+            db, user_id, [note for _, _, note in new_notes], change_seq, is_clean=True, return_ids=True
+        )
+        NoteService.update_notes_content(db, {
+            fingerprints[path].note_id: (note.title, note.body) for path, _, note in changed_notes
+        }, change_seq)
+
+        new_fingerprints, updated_fingerprints = [], []
+        for (path, content_hash, _), note_id in zip(new_notes, note_ids):
+            if path in fingerprints:
+                updated_fingerprints.append({
+                    'id': fingerprints[path].id,
+                    'content_hash': content_hash,
+                    'note_id': note_id,
+                    'updated_dt': dt.datetime.now(dt.timezone.utc),
+                })
+            else:
+                new_fingerprints.append({
+                    'user_id': user_id,
+                    'folder_id': folder_id,
+                    'path': path,
+                    'content_hash': content_hash,
+                    'note_id': note_id,
+                })
+        for path, content_hash, _ in changed_notes:
+            updated_fingerprints.append({
+                'id': fingerprints[path].id,
+                'content_hash': content_hash,
+                'note_id': fingerprints[path].note_id,
+                'updated_dt': dt.datetime.now(dt.timezone.utc),
+            })
+
+        if new_fingerprints:
+            db.execute(insert(NotesImportFingerprint), new_fingerprints)
+        if updated_fingerprints:
+            db.execute(update(NotesImportFingerprint), updated_fingerprints)
+        return len(new_notes), len(changed_notes)
+
     @classmethod
     def import_zip(
-        cls, db: Session, user_id: int, zip_content: bytes, folder_id: int
-    ) -> list[Note]:
-        """ Import a ZIP archive, preserving folder structure. """
-        imported_notes = []
-
-        zip_buffer = io.BytesIO(zip_content)
-        with zipfile.ZipFile(zip_buffer, 'r') as zip_ref:
-            # keep track of created folders to reuse them: { <path>: <folder_id> }
-            created_folders_map = {'': folder_id}
-            
+        cls, db: Session, user_id: int, zip_file: BinaryIO | bytes, folder_id: int, incremental: bool = False
+    ) -> NotesImportResult | None:
+        """
+        Import a ZIP archive, preserving folder structure. Returns numbers of created, updated and skipped notes.
+        Folders and notes are inserted in batches within a single transaction, so nothing is imported
+        if the archive fails, in that case None is returned.
+        """
+        try:
+            with atomic_transaction(db):
+                return cls._import_zip(db, user_id, zip_file, folder_id, incremental, next_change_seq(db, user_id))
+        except TransactionRollback as e:
+            logger.warning(f'import_zip: {str(e)}')
+            return None
+
+    @classmethod
+    def import_files(
+        cls, db: Session, user_id: int, files: list[tuple[str, BinaryIO]], folder_id: int, incremental: bool = False
+    ) -> NotesImportResult:
+        """
+        Imports uploaded (<filename>, <file>) within a single transaction: ZIP archives as with import_zip
+        and other files as notes of the folder, files which can't be notes are skipped.
+        Raises NotesImportError if a file fails, nothing of the upload is imported then.
+        """
+        created_count, updated_count, skipped_count = 0, 0, 0
+        filename = None
+        try:
+            with atomic_transaction(db):
+                change_seq = next_change_seq(db, user_id)
+                for filename, file in files:
+                    if filename.lower().endswith('.zip'):
+                        result = cls._import_zip(db, user_id, file, folder_id, incremental, change_seq)
+                        created_count += result.created
+                        updated_count += result.updated
+                        skipped_count += result.skipped
+                        continue
+
+                    parsed = parse_note_file(filename, file.read())
+                    if parsed is None:
+                        continue
+                    title, body = parsed
+                    NoteService.insert_notes(
+                        db, user_id, [NoteCreateSchema(folder_id=folder_id, title=title, body=body)], change_seq,
+                        is_clean=True
+                    )
+                    created_count += 1
+        except TransactionRollback as e:
+            logger.warning(f'import_files {filename}: {str(e)}')
+            raise NotesImportError(filename) from e
+
+        return NotesImportResult(created=created_count, updated=updated_count, skipped=skipped_count)
+
+    @classmethod
+    def _import_zip(
+        cls,
+        db: Session,
+        user_id: int,
+        zip_file: BinaryIO | bytes,
+        folder_id: int,
+        incremental: bool,
+        change_seq: int
+    ) -> NotesImportResult:
+        """
+        Imports a ZIP archive without committing, raises if the archive fails.
+        Members are read from the file lazily, parsed by notes_parse_pool and inserted in batches
+        of IMPORT_NOTES_BATCH_SIZE, so memory doesn't grow with the archive size.
+
+        Incremental imports fingerprint files by their path and content hash, so re-importing an archive
+        into the same folder reuses existing folders, skips unchanged files without parsing them
+        and updates notes of changed files in place instead of creating duplicates.
+        """
+        if isinstance(zip_file, bytes):
+            zip_file = io.BytesIO(zip_file)
+
+        created_count, updated_count, parsed_count = 0, 0, 0
+        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+            # members are listed from the central directory without reading their content,
+            # of members with the same path the last one is imported
+            members = {}
+            folder_paths = set()
             for file_info in zip_ref.infolist():
-                if file_info.is_dir():
-                    path_parts = [part for part in file_info.filename.strip('/').split('/') if part]
-                    current_path = ''
-                    current_parent_id = folder_id
-                    
-                    for part in path_parts:
-                        full_part_path = f'{current_path}/{part}'.strip('/')
-                        if full_part_path not in created_folders_map:
-                            new_folder = NotesFolderService.create_folder(
-                                db,
-                                user_id,
-                                NotesFolderCreateSchema(parent_id=current_parent_id, name=part)
-                            )
-                            created_folders_map[full_part_path] = new_folder.id
-                        
-                        current_path = full_part_path
-                        current_parent_id = created_folders_map[full_part_path]
+                path_parts = [part for part in file_info.filename.strip('/').split('/') if part]
+                folder_parts = path_parts if file_info.is_dir() else path_parts[:-1]
+                folder_paths.update('/'.join(folder_parts[:i]) for i in range(1, len(folder_parts) + 1))
+
+                # skip members which can't be notes, e.g. ZIP bombs or attachments
+                if file_info.is_dir() or not path_parts or file_info.file_size > IMPORT_SIZE_LIMIT:
+                    continue
+                path = '/'.join(path_parts)
+                if incremental and len(path) > IMPORT_PATH_MAX_LENGTH:
+                    continue
+                members[path] = (file_info, '/'.join(folder_parts), path_parts[-1])
+
+            folders_map = cls._get_folders_map(db, user_id, folder_id) if incremental else {'': folder_id}
+            fingerprints = cls._get_fingerprints(db, user_id, folder_id, folders_map) if incremental else None
+            folders_map = cls._insert_folders(db, user_id, folder_paths, folders_map, change_seq)
+
+            # files are parsed in worker processes, while notes are inserted by this thread
+            parsed_files = notes_parse_pool.parse_many(
+                ((path, folder_path, content_hash), filename, content)
+                for path, folder_path, filename, content, content_hash in cls._read_members(
+                    zip_ref, members, fingerprints
+                )
+            )
+            notes_batch = []
+            for (path, folder_path, content_hash), parsed in parsed_files:
+                parsed_count += 1
+                if parsed is None:
                     continue
-                
-                # Handle file entry
-                filename = file_info.filename
-                path_parts = filename.split('/')
-                
-                if len(path_parts) > 1:
-                    # File is in a subfolder
-                    base_filename = path_parts[-1]
-                    
-                    # Ensure all parent folders exist
-                    current_path = ''
-                    current_parent_id = folder_id
-                    for part in path_parts[:-1]:
-                        full_part_path = f'{current_path}/{part}'.strip('/')
-                        if full_part_path not in created_folders_map:
-                            new_folder = NotesFolderService.create_folder(
-                                db,
-                                user_id,
-                                NotesFolderCreateSchema(parent_id=current_parent_id, name=part)
-                            )
-                            created_folders_map[full_part_path] = new_folder.id
-                        current_path = full_part_path
-                        current_parent_id = created_folders_map[full_part_path]
-                    
-                    target_folder_id = current_parent_id
-                else:
-                    base_filename = filename
-                    target_folder_id = folder_id
-                
-                # import the file
-                with zip_ref.open(file_info) as f:
-                    content = f.read()
-                    note = cls.import_file(db, user_id, base_filename, content, target_folder_id)
-                    if note:
-                        imported_notes.append(note)
-                        
-        return imported_notes
+
+                title, body = parsed
+                notes_batch.append((
+                    path, content_hash, NoteCreateSchema(folder_id=folders_map[folder_path], title=title, body=body)
+                ))
+                if len(notes_batch) >= IMPORT_NOTES_BATCH_SIZE:
+                    created, updated = cls._import_notes_batch(
+                        db, user_id, folder_id, notes_batch, fingerprints, change_seq
+                    )
+                    created_count, updated_count = created_count + created, updated_count + updated
+                    notes_batch = []
+
+            created, updated = cls._import_notes_batch(db, user_id, folder_id, notes_batch, fingerprints, change_seq)
+            created_count, updated_count = created_count + created, updated_count + updated
+
+        # members which were not passed to the parser are unchanged
+        return NotesImportResult(created=created_count, updated=updated_count, skipped=len(members) - parsed_count)
+
+    @classmethod
+    def _read_members(
+        cls,
+        zip_ref: zipfile.ZipFile,
+        members: dict[str, tuple],
+        fingerprints: dict[str, ImportFingerprint] | None
+    ) -> Iterator[tuple[str, str, str, bytes, str | None]]:
+        """
+        Reads members and yields (<path>, <folder path>, <filename>, <content>, <content hash>) of files to import.
+        With fingerprints, files with the same content hash as the previously imported note are not yielded.
+        """
+        for path, (file_info, folder_path, filename) in members.items():
+            content = zip_ref.read(file_info)
+            if fingerprints is None:
+                yield path, folder_path, filename, content, None
+                continue
+
+            content_hash = hashlib.sha256(content).hexdigest()
+            fingerprint = fingerprints.get(path)
+            if fingerprint is not None and not fingerprint.is_stale and fingerprint.content_hash == content_hash:
+                continue
+            yield path, folder_path, filename, content, content_hash
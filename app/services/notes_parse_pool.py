@@ -0,0 +1,104 @@
+import itertools
+import logging
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from app.const.notes import IMPORT_PARSE_CHUNK_SIZE
+from app.core.config import settings
+from app.core.metrics import register_stats_provider
+from app.services.notes_parser import parse_note_file
+from app.services.process_pool import WorkerProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+def parse_note_files(files: list[tuple[str, bytes]]) -> list[tuple[str, str] | None]:
+    """ Parses a chunk of (<filename>, <content>) files. Top-level function, so it can run in worker processes. """
+    return [parse_note_file(filename, content) for filename, content in files]
+
+
+class NotesParsePool(WorkerProcessPool):
+    """
+    Parses and sanitizes imported files in worker processes, so imports of big archives use all cores,
+    while the database is written by the calling thread only. Files are sent to workers in chunks of chunk_size
+    to amortize inter-process overhead. Imports of fewer than min_chunks chunks, by default enough to keep
+    every worker busy twice, or all imports with max_workers=0, are parsed in the calling thread,
+    as starting workers takes longer than parsing them.
+    """
+    stats_keys = ('parsed', 'chunks', 'crashed')
+
+    def __init__(self, max_workers: int, chunk_size: int, min_chunks: int | None = None):
+        super().__init__(max_workers)
+        self.chunk_size = chunk_size
+        self.min_chunks = max_workers * 2 if min_chunks is None else min_chunks
+
+    def parse_many(self, files: Iterable[tuple[Any, str, bytes]]) -> Iterator[tuple[Any, tuple[str, str] | None]]:
+        """
+        Parses (<key>, <filename>, <content>) files and yields (<key>, <title and body or None>) in the same order.
+        At most 2 * max_workers chunks are submitted ahead, so memory doesn't grow with the import size.
+        Raises BrokenProcessPool if a worker crashes, so the import can be rolled back.
+        """
+        files = iter(files)
+        # chunks are read ahead to decide if starting workers pays off
+        chunks: deque[list] = deque()
+        while len(chunks) < max(self.min_chunks, 1):
+            chunk = list(itertools.islice(files, self.chunk_size))
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        if self.max_workers <= 0 or len(chunks) < self.min_chunks:
+            yield from self._parse_serial(itertools.chain(itertools.chain.from_iterable(chunks), files))
+            return
+
+        with self._worker_slot() as has_slot:
+            if not has_slot:
+                yield from self._parse_serial(itertools.chain(itertools.chain.from_iterable(chunks), files))
+                return
+
+            executor = self._start_executor()
+            try:
+                pending: deque[tuple[list, Future]] = deque()
+                while chunks:
+                    chunk = chunks.popleft()
+                    keys = [key for key, _, _ in chunk]
+                    future = executor.submit(
+                        parse_note_files, [(filename, content) for _, filename, content in chunk]
+                    )
+                    pending.append((keys, future))
+                    if len(pending) >= self.max_workers * 2:
+                        yield from self._pop_results(pending)
+                    if not chunks:
+                        chunk = list(itertools.islice(files, self.chunk_size))
+                        if chunk:
+                            chunks.append(chunk)
+
+                while pending:
+                    yield from self._pop_results(pending)
+            finally:
+                self._stop_executor(executor)
+
+    def _parse_serial(self, files: Iterable[tuple[Any, str, bytes]]) -> Iterator[tuple[Any, tuple[str, str] | None]]:
+        for key, filename, content in files:
+            yield key, parse_note_file(filename, content)
+            self._record('parsed')
+
+    def _pop_results(self, pending: deque[tuple[list, Future]]) -> Iterator[tuple[Any, tuple[str, str] | None]]:
+        keys, future = pending.popleft()
+        try:
+            results = future.result()
+        except BrokenProcessPool:
+            logger.warning('parse_note_files: Worker process crashed')
+            self._record('crashed')
+            raise
+
+        self._record('parsed', len(results))
+        self._record('chunks')
+        yield from zip(keys, results)
+
+
+notes_parse_pool = NotesParsePool(max_workers=settings.NOTES_IMPORT_WORKERS, chunk_size=IMPORT_PARSE_CHUNK_SIZE)
+register_stats_provider('notes_parse_pool', notes_parse_pool.get_stats)
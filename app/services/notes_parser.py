@@ -0,0 +1,157 @@
+import html
+import markdown
+import os
+import re
+from bs4 import BeautifulSoup
+
+from app.const.notes import HtmlParserBackend
+from app.services.notes_service import NoteService
+
+# whitespace collapsed by BeautifulSoup
+ASCII_WHITESPACE = ' \n\t\x0c\r'
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    # html.parser backend is used
+    lxml_html = None
+
+
+def _parse_html_soup(content: str) -> tuple[str, str]:
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # try to find a title, the title tag is removed as it's never a part of the body
+    title = ''
+    if soup.title and soup.title.string:
+        title = soup.title.string.strip()
+        soup.title.decompose()
+    elif first_h1 := soup.find('h1'):
+        title = first_h1.get_text().strip()
+        first_h1.decompose() # remove the first title tag from the body to avoid duplication
+
+    # get body content as a string with HTML, comments and doctype are kept as markup and stripped on sanitization
+    body = soup.body.decode_contents() if soup.body else soup.decode_contents()
+    return title or 'Untitled Note', body
+
+
+def _is_ascii_whitespace(text: str | None) -> bool:
+    return bool(text) and not text.strip(ASCII_WHITESPACE)
+
+
+def _normalize_lxml_body(body_tag) -> None:
+    """
+    Mimics html.parser tree builder of BeautifulSoup, so both backends produce the same HTML:
+    attributes are sorted and whitespace-only strings outside of pre and textarea are collapsed.
+    """
+    preserved_tags = {tag for parent in body_tag.iter('pre', 'textarea') for tag in parent.iter()}
+    for tag in body_tag.iter():
+        # skip attributes and text of comments and processing instructions
+        if isinstance(tag.tag, str):
+            if len(tag.attrib) > 1:
+                attributes = sorted(tag.attrib.items())
+                tag.attrib.clear()
+                tag.attrib.update(attributes)
+            if tag not in preserved_tags and _is_ascii_whitespace(tag.text):
+                tag.text = '\n' if '\n' in tag.text else ' '
+        if tag.getparent() not in preserved_tags and _is_ascii_whitespace(tag.tail):
+            tag.tail = '\n' if '\n' in tag.tail else ' '
+
+
+def _parse_html_lxml(content: str) -> tuple[str, str]:
+    """ Same extraction as _parse_html_soup using libxml2, which always adds html and body elements """
+    try:
+        root = lxml_html.document_fromstring(content)
+    except (etree.ParserError, ValueError):
+        # empty documents and XML documents with encoding declaration
+        return _parse_html_soup(content)
+
+    title = ''
+    title_tag = root.find('.//title')
+    if title_tag is not None and title_tag.text:
+        title = title_tag.text.strip()
+        title_tag.drop_tree()
+    elif (first_h1 := next(root.iter('h1'), None)) is not None:
+        title = first_h1.text_content().strip()
+        first_h1.drop_tree()
+
+    body_tag = root.find('body')
+    if body_tag is None:
+        # document with head elements only
+        return title or 'Untitled Note', ''
+
+    _normalize_lxml_body(body_tag)
+    body = html.escape(body_tag.text or '', quote=False) + ''.join(
+        lxml_html.tostring(tag, encoding='unicode', with_tail=True) for tag in body_tag
+    )
+    return title or 'Untitled Note', body
+
+
+HTML_PARSER_BACKENDS = {
+    HtmlParserBackend.LXML: _parse_html_lxml,
+    HtmlParserBackend.HTML_PARSER: _parse_html_soup,
+}
+
+
+def get_html_parser_backends() -> list[HtmlParserBackend]:
+    """ Returns installed backends, the fastest first """
+    return [backend for backend in HTML_PARSER_BACKENDS if backend != HtmlParserBackend.LXML or lxml_html is not None]
+
+
+def parse_html(content: str, backend: HtmlParserBackend | None = None) -> tuple[str, str]:
+    """
+    Returns title and body HTML of a document using the fastest installed backend by default.
+    Backends extract the same title and body, up to serialization differences removed by sanitization,
+    markup of broken documents, e.g. with unclosed tags, can be repaired differently.
+    """
+    return HTML_PARSER_BACKENDS[backend or get_html_parser_backends()[0]](content)
+
+
+def parse_markdown(content: str) -> tuple[str, str]:
+    lines = content.splitlines()
+    title = 'Untitled Note'
+    body_start_index = 0
+
+    for index, line in enumerate(lines):
+        if line.startswith('# '):
+            title = line[2:].strip()
+            body_start_index = index + 1
+            break
+
+    body_md = '\n'.join(lines[body_start_index:]).strip()
+    body_html = markdown.markdown(body_md)
+    # to avoid losing line breaks, replace \n with empty paragraph tags
+    # but not in between of lists
+    body_html = re.sub(r'\n(?=<(?!li|/ul|/ol))', '<p></p>', body_html)
+    return title, body_html
+
+
+def parse_txt(content: str, filename: str) -> tuple[str, str]:
+    title = os.path.splitext(filename)[0]
+    body_html = f'<p>{html.escape(content)}</p>'
+    return title, body_html
+
+
+def parse_note_file(filename: str, content: bytes) -> tuple[str, str] | None:
+    """
+    Returns title and sanitized HTML body of an imported file, or None if the file can't be imported.
+    Pure function of its arguments, so files can be parsed in worker processes.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+
+    try:
+        text_content = content.decode('utf-8')
+    except UnicodeDecodeError:
+        # skip non utf-8 files
+        return None
+
+    # parse file content and get the body as HTML
+    if extension == '.md':
+        title, body = parse_markdown(text_content)
+    elif extension in ('.html', '.htm'):
+        title, body = parse_html(text_content)
+    elif extension == '.txt':
+        title, body = parse_txt(text_content, filename)
+    else:
+        return None
+
+    return title, NoteService.clean_html(body) if body else body
@@ -1,4 +1,6 @@
+import datetime as dt
 import nh3
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from app.const.notes import NOTE_BODY_ALLOWED_ATTRIBUTES, NOTE_BODY_ALLOWED_TAGS, NOTE_BODY_ALLOWED_PROTOCOLS
@@ -21,7 +23,7 @@ class NoteService(BaseService[Note]):
         return value
 
     @classmethod
-    def _clean_html(cls, html: str) -> str:
+    def clean_html(cls, html: str) -> str:
         return nh3.clean(
             html,
             tags=NOTE_BODY_ALLOWED_TAGS,
@@ -39,7 +41,7 @@ class NoteService(BaseService[Note]):
     def create_note(cls, db: Session, user_id: int, create_data: NoteCreateSchema) -> Note:
         data = create_data.model_dump()
         if data.get('body'):
-            data['body'] = cls._clean_html(data['body'])
+            data['body'] = cls.clean_html(data['body'])
         if data.get('folder_id') is None:
             root_folder = NotesFolderService.get_root_folder(db, user_id)
             data['folder_id'] = root_folder.id
@@ -50,6 +52,60 @@ class NoteService(BaseService[Note]):
         db.refresh(db_note)
         return db_note
 
+    @classmethod
+    def insert_notes(
+        cls,
+        db: Session,
+        user_id: int,
+        notes_data: list[NoteCreateSchema],
+        change_seq: int,
+        is_clean: bool = False,
+        return_ids: bool = False
+    ) -> list[int] | None:
+        """
+        Inserts notes with a single INSERT statement without committing, so it can be a part of a bigger transaction.
+        Notes are not loaded into the session, so they don't have to be kept in memory.
+        Set is_clean if bodies are already sanitized, e.g. by parse_note_file.
+        With return_ids the statement is INSERT ... RETURNING and ids are returned in the order of notes_data.
+        """
+        if not notes_data:
+            return [] if return_ids else None
+
+        rows = [
+            {
+                **data.model_dump(),
+                'body': cls.clean_html(data.body) if data.body and not is_clean else data.body,
+                'user_id': user_id,
+                'change_seq': change_seq,
+            }
+            for data in notes_data
+        ]
+        if return_ids:
+            return list(db.scalars(insert(Note).returning(Note.id, sort_by_parameter_order=True), rows))
+
+        db.execute(insert(Note), rows)
+        return None
+
+    @classmethod
+    def update_notes_content(cls, db: Session, notes_content: dict[int, tuple[str, str]], change_seq: int) -> None:
+        """
+        Updates titles and sanitized bodies of notes { <note_id>: (<title>, <body>) } with a single bulk UPDATE
+        by primary key without committing, so it can be a part of a bigger transaction.
+        """
+        if not notes_content:
+            return
+
+        db.execute(update(Note), [
+            {
+                'id': note_id,
+                'title': title,
+                'body': body,
+                'change_seq': change_seq,
+                'updated_dt': dt.datetime.now(dt.timezone.utc),
+            }
+            for note_id, (title, body) in notes_content.items()
+        ])
+
     @classmethod
     def update_note(cls, db: Session, note_id: int, user_id: int, update_data: NoteUpdateSchema) -> Note | None:
         db_note = cls.get_note(db, note_id, user_id)
@@ -57,7 +113,7 @@ class NoteService(BaseService[Note]):
             return None
         update_data_dict = update_data.model_dump(exclude_unset=True)
         if update_data_dict.get('body'):
-            update_data_dict['body'] = cls._clean_html(update_data_dict['body'])
+            update_data_dict['body'] = cls.clean_html(update_data_dict['body'])
 
         for field, value in update_data_dict.items():
             setattr(db_note, field, value)
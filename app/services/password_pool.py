@@ -0,0 +1,97 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from app.core.config import settings
+from app.core.metrics import register_stats_provider
+
+T = TypeVar('T')
+
+
+class PasswordPoolFull(Exception):
+    """ Raised when password worker pool has no free workers and its queue is full """
+    pass
+
+
+class PasswordPool:
+    """
+    Dedicated bounded pool for bcrypt work, so bursts of logins and signups
+    can't occupy all threads which serve the rest of the API.
+    At most max_workers tasks are running and queue_size tasks are waiting,
+    any task above that is rejected immediately with PasswordPoolFull.
+    """
+    def __init__(self, max_workers: int, queue_size: int):
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._lock = threading.Lock()
+
+        self._completed = 0
+        self._rejected = 0
+        self._in_flight = 0
+        self._wait_time = 0.0
+        self._run_time = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password')
+            return self._executor
+
+    def run(self, func: Callable[..., T], *args) -> T:
+        """ Runs func in the pool and waits for its result """
+        if self.max_workers <= 0:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordPoolFull()
+
+        with self._lock:
+            self._in_flight += 1
+
+        submitted_at = time.perf_counter()
+        started_at = submitted_at
+
+        def task() -> T:
+            nonlocal started_at
+            started_at = time.perf_counter()
+            return func(*args)
+
+        try:
+            return self._get_executor().submit(task).result()
+        finally:
+            finished_at = time.perf_counter()
+            self._slots.release()
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._wait_time += started_at - submitted_at
+                self._run_time += finished_at - started_at
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'queue_size': self.queue_size,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_wait_ms': self._wait_time * 1000 / self._completed if self._completed else 0.0,
+                'avg_run_ms': self._run_time * 1000 / self._completed if self._completed else 0.0,
+            }
+
+
+password_pool = PasswordPool(max_workers=settings.PASSWORD_POOL_WORKERS, queue_size=settings.PASSWORD_POOL_QUEUE_SIZE)
+register_stats_provider('password_pool', password_pool.get_stats)
@@ -0,0 +1,273 @@
+import itertools
+import logging
+import multiprocessing
+import multiprocessing.queues
+import os
+import queue
+import signal
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, NamedTuple
+from weasyprint import HTML
+
+from app.const.notes import ExportType
+from app.core.config import settings
+from app.core.metrics import register_stats_provider
+from app.services.process_pool import WorkerProcessPool
+from app.services.render_cache import RenderCache
+
+logger = logging.getLogger(__name__)
+
+# Interval of checking whether a submitted note has started rendering
+RENDER_START_POLL_SECONDS = 0.1
+
+# Queue of (<task id>, <pid>, <start time>) set in worker processes by _init_worker
+_started_queue: multiprocessing.queues.Queue | None = None
+
+
+def render_pdf(title: str, body: str) -> bytes:
+    """ Generate PDF content from note title and body HTML. Top-level function, so it can run in worker processes. """
+    html_content = f"""
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <style>
+                body {{ font-family: Arial, sans-serif; padding: 40px; }}
+                h1 {{ font-size: 24px; margin-bottom: 16px; }}
+            </style>
+        </head>
+        <body>
+            <h1>{title}</h1>
+            {body}
+        </body>
+        </html>
+    """
+    return HTML(string=html_content).write_pdf()
+
+
+def _init_worker(started_queue: multiprocessing.queues.Queue) -> None:
+    global _started_queue
+    _started_queue = started_queue
+
+
+def _run_render(task_id: int, render: Callable[[str, str], bytes], title: str, body: str) -> bytes:
+    """ Reports the worker pid and start time, so the render timeout is counted from the start of rendering """
+    _started_queue.put((task_id, os.getpid(), time.time()))
+    return render(title, body)
+
+
+class RenderWorkers(NamedTuple):
+    """
+    Worker processes of a single render_many call, so a crashed or hung worker fails only notes of one export
+    and doesn't affect exports of other users running at the same time.
+    """
+    executor: ProcessPoolExecutor
+    started_queue: multiprocessing.queues.Queue
+    # { <task id>: (<worker pid>, <start time>) }
+    started: dict[int, tuple[int, float]]
+
+    def get_started(self, task_id: int) -> tuple[int, float] | None:
+        while True:
+            try:
+                started_task_id, pid, started_at = self.started_queue.get_nowait()
+            except (queue.Empty, ValueError):
+                # nothing was reported yet or workers were stopped
+                break
+            self.started[started_task_id] = (pid, started_at)
+        return self.started.get(task_id)
+
+    def kill(self, task_id: int) -> None:
+        """ Terminates the worker running the task, other running notes fail with BrokenProcessPool """
+        started = self.started.get(task_id)
+        if started is not None:
+            try:
+                os.kill(started[0], signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+class PendingRender(NamedTuple):
+    key: Any
+    title: str
+    body: str
+    # None for notes found in the render cache
+    workers: RenderWorkers | None
+    task_id: int | None
+    future: Future
+    cache_key: str | None = None
+
+
+class PdfRenderPool(WorkerProcessPool):
+    """
+    Renders PDFs of notes in worker processes, so exports with many notes use all cores
+    and don't hold the GIL of the API process. With max_workers=0 notes are rendered in the calling thread.
+    """
+    stats_keys = ('rendered', 'failed', 'timed_out')
+
+    def __init__(self, max_workers: int, timeout: float):
+        super().__init__(max_workers)
+        self.timeout = timeout
+
+        self._task_ids = itertools.count()
+
+    def _start_workers(self) -> RenderWorkers:
+        started_queue = self.mp_context.Queue()
+        executor = self._start_executor(initializer=_init_worker, initargs=(started_queue,))
+        return RenderWorkers(executor, started_queue, {})
+
+    def _stop_workers(self, workers: RenderWorkers, is_broken: bool = False, task_id: int | None = None) -> None:
+        if is_broken:
+            workers.kill(task_id)
+        self._stop_executor(workers.executor, wait=not is_broken)
+        workers.started_queue.close()
+
+    def _record_result(self, error: str | None, is_timeout: bool = False) -> None:
+        if error is None:
+            self._record('rendered')
+        elif is_timeout:
+            self._record('timed_out')
+        else:
+            self._record('failed')
+
+    def render_many(
+        self, notes: Iterable[tuple[Any, str, str]], cache: RenderCache | None = None
+    ) -> Iterator[tuple[Any, bytes | None, str | None]]:
+        """
+        Renders (<key>, <title>, <body>) notes and yields (<key>, <pdf>, <error>) in the same order.
+        Failed or timed out notes have pdf set to None and the error message set.
+        At most 2 * max_workers notes are submitted ahead, so memory doesn't grow with the export size.
+        Notes found in the cache are not rendered, rendered notes are put into the cache.
+        """
+        if self.max_workers <= 0:
+            yield from self._render_many_serial(notes, cache)
+            return
+
+        with self._worker_slot() as has_slot:
+            if not has_slot:
+                yield from self._render_many_serial(notes, cache)
+                return
+
+            # list with the current workers of the call, which are replaced after a crash or a timeout
+            workers: list[RenderWorkers] = []
+            pending: deque[PendingRender] = deque()
+            try:
+                for key, title, body in notes:
+                    pending.append(self._submit(workers, key, title, body, cache))
+                    if len(pending) >= self.max_workers * 2:
+                        yield self._pop_result(workers, pending, cache)
+
+                while pending:
+                    yield self._pop_result(workers, pending, cache)
+            finally:
+                for current_workers in workers:
+                    self._stop_workers(current_workers)
+
+    def _render_many_serial(
+        self, notes: Iterable[tuple[Any, str, str]], cache: RenderCache | None
+    ) -> Iterator[tuple[Any, bytes | None, str | None]]:
+        for key, title, body in notes:
+            cache_key = cache.make_key(ExportType.PDF, title, body) if cache else None
+            content = cache.get(cache_key) if cache else None
+            if content is not None:
+                yield key, content, None
+                continue
+
+            content, error = self._render_serial(title, body)
+            if cache and content is not None:
+                cache.set(cache_key, content)
+            yield key, content, error
+
+    def _render_serial(self, title: str, body: str) -> tuple[bytes | None, str | None]:
+        try:
+            content = render_pdf(title, body)
+        except Exception as e:
+            logger.warning(f'render_pdf: {str(e)}')
+            self._record_result(str(e))
+            return None, str(e)
+
+        self._record_result(None)
+        return content, None
+
+    def _submit(
+        self, workers: list[RenderWorkers], key: Any, title: str, body: str, cache: RenderCache | None = None
+    ) -> PendingRender:
+        cache_key = None
+        if cache:
+            cache_key = cache.make_key(ExportType.PDF, title, body)
+            content = cache.get(cache_key)
+            if content is not None:
+                # cached notes take a place in the pending queue to keep the order
+                future = Future()
+                future.set_result(content)
+                return PendingRender(key, title, body, None, None, future)
+
+        if not workers:
+            workers.append(self._start_workers())
+        task_id = next(self._task_ids)
+        # render_pdf is passed by reference, so workers run the function set on the module when the note is submitted
+        future = workers[0].executor.submit(_run_render, task_id, render_pdf, title, body)
+        return PendingRender(key, title, body, workers[0], task_id, future, cache_key)
+
+    @staticmethod
+    def _is_rendered(future: Future) -> bool:
+        return future.done() and not future.cancelled() and future.exception() is None
+
+    def _wait_result(self, item: PendingRender) -> bytes:
+        """ Waits for the note, raises FutureTimeoutError when it renders longer than timeout since its start """
+        while True:
+            if item.future.done():
+                return item.future.result()
+
+            started = item.workers.get_started(item.task_id)
+            if started is None:
+                # queued behind other notes of the call, which have their own timeouts
+                wait = RENDER_START_POLL_SECONDS
+            else:
+                wait = started[1] + self.timeout - time.time()
+                if wait <= 0:
+                    raise FutureTimeoutError()
+
+            try:
+                return item.future.result(timeout=wait)
+            except FutureTimeoutError:
+                continue
+
+    def _pop_result(
+        self, workers: list[RenderWorkers], pending: deque[PendingRender], cache: RenderCache | None = None
+    ) -> tuple[Any, bytes | None, str | None]:
+        item = pending.popleft()
+        try:
+            content = item.future.result() if item.workers is None else self._wait_result(item)
+        except (FutureTimeoutError, BrokenProcessPool) as e:
+            is_timeout = isinstance(e, FutureTimeoutError)
+            error = f'Timed out after {self.timeout} seconds' if is_timeout else 'Worker process crashed'
+            logger.warning(f'render_pdf: {error}')
+            self._record_result(error, is_timeout=is_timeout)
+
+            # replace workers of the call and resubmit notes which were queued to the broken ones
+            if workers and workers[0] is item.workers:
+                workers.remove(item.workers)
+                self._stop_workers(item.workers, is_broken=True, task_id=item.task_id)
+            for i, pending_item in enumerate(pending):
+                if pending_item.workers is item.workers and not self._is_rendered(pending_item.future):
+                    pending[i] = self._submit(workers, pending_item.key, pending_item.title, pending_item.body, cache)
+            return item.key, None, error
+        except Exception as e:
+            logger.warning(f'render_pdf: {str(e)}')
+            self._record_result(str(e))
+            return item.key, None, str(e)
+
+        if item.workers is None:
+            return item.key, content, None
+
+        self._record_result(None)
+        if cache and item.cache_key:
+            cache.set(item.cache_key, content)
+        return item.key, content, None
+
+
+pdf_render_pool = PdfRenderPool(max_workers=settings.EXPORT_PDF_WORKERS, timeout=settings.EXPORT_PDF_TIMEOUT_SECONDS)
+register_stats_provider('pdf_render_pool', pdf_render_pool.get_stats)
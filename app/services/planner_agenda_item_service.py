@@ -1,12 +1,18 @@
 import datetime as dt
 import logging
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.const.planner import PlannerItemState
-from app.core.db_utils import atomic_transaction, TransactionRollback
-from app.models.planner import PlannerAgendaItem
-from app.schemas.planner_agenda import PlannerAgendaItemCreateSchema, PlannerAgendaItemUpdateSchema
+from app.const.planner import PlannerBatchOperation, PlannerBatchStatus, PlannerItemState, PLANNER_ITEM_INDEX_STEP
+from app.core.db_utils import atomic_transaction, next_change_seq, TransactionRollback
+from app.models.planner import PlannerAgenda, PlannerAgendaItem
+from app.schemas.planner_agenda import (
+    AgendaItemBatchOperationSchema, PlannerAgendaItemCreateSchema, PlannerAgendaItemSchema,
+    PlannerAgendaItemUpdateSchema,
+)
 from app.services.base_service import BaseService
+from app.services.planner_agenda_service import PlannerAgendaService
+from app.services.planner_index_utils import calc_index_between, is_gap_exhausted
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +27,24 @@ class PlannerAgendaItemService(BaseService[PlannerAgendaItem]):
             PlannerAgendaItem.agenda_id == agenda_id
         )
         max_index: PlannerAgendaItem = query.order_by(PlannerAgendaItem.index.desc()).first()
-        return max_index.index + 1 if max_index else 0
+        return max_index.index + PLANNER_ITEM_INDEX_STEP if max_index else 0
+
+    @classmethod
+    def get_new_agenda_items_indexes(cls, db: Session, agenda_ids: set[int], user_id: int) -> dict[int, int]:
+        """ Returns index for a new last item of each agenda using a single query """
+        new_indexes = {agenda_id: 0 for agenda_id in agenda_ids}
+        if not new_indexes:
+            return new_indexes
+
+        rows = cls.get_base_query(db).filter(
+            PlannerAgendaItem.user_id == user_id,
+            PlannerAgendaItem.agenda_id.in_(new_indexes.keys())
+        ).group_by(PlannerAgendaItem.agenda_id).with_entities(
+            PlannerAgendaItem.agenda_id, func.max(PlannerAgendaItem.index)
+        ).all()
+        for agenda_id, max_index in rows:
+            new_indexes[agenda_id] = max_index + PLANNER_ITEM_INDEX_STEP
+        return new_indexes
 
     @classmethod
     def get_agenda_item(cls, db: Session, item_id: int, user_id: int) -> PlannerAgendaItem | None:
@@ -39,6 +62,39 @@ class PlannerAgendaItemService(BaseService[PlannerAgendaItem]):
         )
         return query.order_by(PlannerAgendaItem.index).all()
 
+    @classmethod
+    def get_items_for_agendas(
+        cls, db: Session, agenda_ids: list[int], user_id: int
+    ) -> dict[int, list[PlannerAgendaItem]]:
+        """
+        Returns items for multiple agendas using a single query.
+        Agendas that do not exist or belong to another user are not included into the result.
+        """
+        if not agenda_ids:
+            return {}
+
+        rows = db.query(PlannerAgenda.id, PlannerAgendaItem).outerjoin(
+            PlannerAgendaItem,
+            (PlannerAgendaItem.agenda_id == PlannerAgenda.id)
+            & (PlannerAgendaItem.user_id == user_id)
+            & PlannerAgendaItem.is_deleted.is_(False)
+        ).filter(
+            PlannerAgenda.user_id == user_id,
+            PlannerAgenda.id.in_(agenda_ids),
+            PlannerAgenda.is_deleted.is_(False)
+        ).order_by(PlannerAgenda.id, PlannerAgendaItem.index).all()
+
+        items_by_agendas = {}
+        for agenda_id, item in rows:
+            agenda_items = items_by_agendas.setdefault(agenda_id, [])
+            if item is not None:
+                agenda_items.append(item)
+
+        # keep the order of requested agendas
+        return {
+            agenda_id: items_by_agendas[agenda_id] for agenda_id in agenda_ids if agenda_id in items_by_agendas
+        }
+
     @classmethod
     def create_agenda_item(cls, db: Session, item: PlannerAgendaItemCreateSchema, user_id: int) -> PlannerAgendaItem:
         new_index = cls.get_new_agenda_item_index(db, item.agenda_id, user_id)
@@ -81,18 +137,75 @@ class PlannerAgendaItemService(BaseService[PlannerAgendaItem]):
     def reorder_agenda_items(cls, db: Session, ordered_item_ids: list[int], user_id: int) -> bool:
         try:
             with atomic_transaction(db):
-                new_index = 0
-                for item_id in ordered_item_ids:
-                    db_item = cls.get_agenda_item(db, item_id, user_id)
-                    if db_item:
-                        db_item.index = new_index
-                    new_index += 1
+                cls.update_indexes(db, ordered_item_ids, user_id, step=PLANNER_ITEM_INDEX_STEP)
         except TransactionRollback as e:
             logger.warning(f'reorder_items: {str(e)}')
             return False
 
         return True
 
+    @classmethod
+    def rebalance_agenda_items(cls, db: Session, agenda_id: int, user_id: int) -> None:
+        """ Spreads indexes of agenda items evenly, keeping their order, to restore gaps between them """
+        rows = cls.get_base_query(db).filter(
+            PlannerAgendaItem.user_id == user_id,
+            PlannerAgendaItem.agenda_id == agenda_id
+        ).order_by(PlannerAgendaItem.index, PlannerAgendaItem.id).with_entities(PlannerAgendaItem.id).all()
+        cls.update_indexes(db, [row.id for row in rows], user_id, step=PLANNER_ITEM_INDEX_STEP)
+
+    @classmethod
+    def change_agenda_item_position(
+        cls, db: Session, item_id: int, after_item_id: int | None, user_id: int
+    ) -> tuple[PlannerAgendaItem | None, bool]:
+        """
+        Places item right after another item of the same agenda, or first if after_item_id is None.
+        Only the moved item index is updated, unless there is no gap left between neighbours.
+        Returns the item and a flag whether agenda items should be rebalanced to restore the gaps.
+        """
+        db_item = cls.get_agenda_item(db, item_id, user_id)
+        if not db_item:
+            return None, False
+
+        siblings_query = cls.get_base_query(db).filter(
+            PlannerAgendaItem.user_id == user_id,
+            PlannerAgendaItem.agenda_id == db_item.agenda_id,
+            PlannerAgendaItem.id != db_item.id
+        )
+
+        def get_neighbours_indexes() -> tuple[int | None, int | None] | None:
+            next_items_query = siblings_query
+            prev_index = None
+            if after_item_id is not None:
+                after_item = siblings_query.filter(PlannerAgendaItem.id == after_item_id).first()
+                if not after_item:
+                    return None
+                prev_index = after_item.index
+                next_items_query = next_items_query.filter(PlannerAgendaItem.index > prev_index)
+
+            next_item = next_items_query.order_by(PlannerAgendaItem.index).first()
+            return prev_index, next_item.index if next_item else None
+
+        try:
+            with atomic_transaction(db):
+                neighbours_indexes = get_neighbours_indexes()
+                if neighbours_indexes is None:
+                    return None, False
+
+                new_index = calc_index_between(*neighbours_indexes)
+                if new_index is None:
+                    # no gap left, rebalance in place to be able to place the item
+                    cls.rebalance_agenda_items(db, db_item.agenda_id, user_id)
+                    neighbours_indexes = get_neighbours_indexes()
+                    new_index = calc_index_between(*neighbours_indexes)
+
+                db_item.index = new_index
+        except TransactionRollback as e:
+            logger.warning(f'change_agenda_item_position: {str(e)}')
+            return None, False
+
+        db.refresh(db_item)
+        return db_item, is_gap_exhausted(neighbours_indexes[0], new_index, neighbours_indexes[1])
+
 
     @classmethod
     def copy_agenda_item(cls, db: Session, item_id: int, agenda_id: int, user_id: int) -> PlannerAgendaItem | None:
@@ -153,6 +266,7 @@ class PlannerAgendaItemService(BaseService[PlannerAgendaItem]):
         ).update({
             'is_deleted': True,
             'deleted_dt': dt.datetime.now(dt.timezone.utc),
+            'change_seq': next_change_seq(db, user_id),
         }, synchronize_session=False)
         db.commit()
         return True
@@ -172,10 +286,101 @@ class PlannerAgendaItemService(BaseService[PlannerAgendaItem]):
                 dropped_items = [item for item in items if item.state == PlannerItemState.DROPPED]
                 todo_items = [item for item in items if item.state == PlannerItemState.TODO]
 
-                for index, item in enumerate(completed_items + snoozed_items + dropped_items + todo_items):
-                    item.index = index
+                for position, item in enumerate(completed_items + snoozed_items + dropped_items + todo_items):
+                    item.index = position * PLANNER_ITEM_INDEX_STEP
         except TransactionRollback as e:
             logger.warning(f'sort_items_by_state: {str(e)}')
             return False
 
         return True
+
+    @classmethod
+    def apply_agenda_items_batch(
+        cls, db: Session, operations: list[AgendaItemBatchOperationSchema], user_id: int
+    ) -> list[dict] | None:
+        """
+        Applies create, update, copy, move and delete operations in order within a single transaction.
+        Referenced agendas are checked, referenced items are loaded and indexes of new items are allocated
+        with one query each. Operations on missing items or agendas are skipped with not_found status.
+        Returns None if the transaction was rolled back.
+        """
+        item_ids = {operation.item_id for operation in operations if operation.op != PlannerBatchOperation.CREATE}
+        items = {}
+        if item_ids:
+            items = {
+                item.id: item for item in cls.get_base_query(db).filter(
+                    PlannerAgendaItem.user_id == user_id,
+                    PlannerAgendaItem.id.in_(item_ids)
+                )
+            }
+        agenda_ids = {getattr(operation, 'agenda_id', None) for operation in operations} - {None}
+        existing_agenda_ids = PlannerAgendaService.get_existing_ids(db, list(agenda_ids), user_id)
+        adding_ops = (PlannerBatchOperation.CREATE, PlannerBatchOperation.COPY, PlannerBatchOperation.MOVE)
+        new_indexes = cls.get_new_agenda_items_indexes(
+            db,
+            {
+                operation.agenda_id for operation in operations
+                if operation.op in adding_ops and operation.agenda_id in existing_agenda_ids
+            },
+            user_id
+        )
+
+        def add_item(agenda_id: int, text: str, state: PlannerItemState = PlannerItemState.TODO) -> PlannerAgendaItem:
+            new_db_item = PlannerAgendaItem(
+                user_id=user_id, agenda_id=agenda_id, text=text, state=state, index=new_indexes[agenda_id]
+            )
+            new_indexes[agenda_id] += PLANNER_ITEM_INDEX_STEP
+            db.add(new_db_item)
+            return new_db_item
+
+        applied = []
+        try:
+            with atomic_transaction(db):
+                for operation in operations:
+                    agenda_id = getattr(operation, 'agenda_id', None)
+                    if agenda_id is not None and agenda_id not in existing_agenda_ids:
+                        applied.append((operation, None))
+                        continue
+
+                    if operation.op == PlannerBatchOperation.CREATE:
+                        applied.append((operation, add_item(operation.agenda_id, operation.text)))
+                        continue
+
+                    db_item = items.get(operation.item_id)
+                    # item can be deleted or moved by one of previous operations
+                    if db_item is None or db_item.is_deleted:
+                        applied.append((operation, None))
+                        continue
+
+                    if operation.op == PlannerBatchOperation.UPDATE:
+                        update_data = operation.model_dump(exclude_unset=True, exclude={'op', 'item_id'})
+                        for field, new_value in update_data.items():
+                            setattr(db_item, field, new_value)
+                    elif operation.op == PlannerBatchOperation.COPY:
+                        db_item = add_item(operation.agenda_id, db_item.text)
+                    elif operation.op == PlannerBatchOperation.MOVE:
+                        db_item.mark_as_deleted()
+                        db_item = add_item(operation.agenda_id, db_item.text, db_item.state)
+                    else:
+                        db_item.mark_as_deleted()
+                    applied.append((operation, db_item))
+
+                # serialize before commit expires the items, to not reload them one by one
+                db.flush()
+                results = [
+                    {
+                        'op': operation.op,
+                        'item_id': getattr(operation, 'item_id', None) or (db_item.id if db_item else None),
+                        'status': PlannerBatchStatus.OK if db_item else PlannerBatchStatus.NOT_FOUND,
+                        'item': (
+                            PlannerAgendaItemSchema.model_validate(db_item, from_attributes=True)
+                            if db_item and operation.op != PlannerBatchOperation.DELETE else None
+                        ),
+                    }
+                    for operation, db_item in applied
+                ]
+        except TransactionRollback as e:
+            logger.warning(f'apply_agenda_items_batch: {str(e)}')
+            return None
+
+        return results
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from app.const.planner import (
     PlannerAgendaType, PlannerItemState, PLANNER_CUSTOM_AGENDA_INDEX_MIN, PLANNER_MONTHLY_AGENDA_INDEX,
 )
-from app.core.db_utils import atomic_transaction, TransactionRollback
+from app.core.db_utils import atomic_transaction, next_change_seq, TransactionRollback
 from app.models.planner import PlannerAgenda, PlannerAgendaItem
 from app.schemas.planner_agenda import PlannerAgendaCreateSchema, PlannerAgendaUpdateSchema
 from app.services.base_service import BaseService
@@ -159,6 +159,7 @@ class PlannerAgendaService(BaseService[PlannerAgenda]):
                 ).update({
                     'is_deleted': True,
                     'deleted_dt': dt.datetime.now(dt.timezone.utc),
+                    'change_seq': next_change_seq(db, user_id),
                 })
                 db_agenda.mark_as_deleted()
         except TransactionRollback as e:
@@ -169,15 +170,9 @@ class PlannerAgendaService(BaseService[PlannerAgenda]):
 
     @classmethod
     def reorder_agendas(cls, db: Session, ordered_agenda_ids: list[int], user_id: int) -> bool:
-        new_index = PLANNER_CUSTOM_AGENDA_INDEX_MIN
-
         try:
             with atomic_transaction(db):
-                for agenda_id in ordered_agenda_ids:
-                    db_agenda = cls.get_planner_agenda(db, agenda_id, user_id)
-                    if db_agenda:
-                        db_agenda.index = new_index
-                    new_index += 1
+                cls.update_indexes(db, ordered_agenda_ids, user_id, start_index=PLANNER_CUSTOM_AGENDA_INDEX_MIN)
         except TransactionRollback as e:
             logger.warning(f'reorder_agendas: {str(e)}')
             return False
@@ -1,13 +1,17 @@
 import datetime as dt
 import logging
 from collections import defaultdict
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.const.planner import PlannerItemState
+from app.const.planner import PlannerBatchOperation, PlannerBatchStatus, PlannerItemState, PLANNER_ITEM_INDEX_STEP
 from app.core.db_utils import atomic_transaction, TransactionRollback
 from app.models.planner import PlannerDayItem
-from app.schemas.planner_day import PlannerDayItemCreateSchema, PlannerDayItemUpdateSchema
+from app.schemas.planner_day import (
+    DayItemBatchOperationSchema, PlannerDayItemCreateSchema, PlannerDayItemSchema, PlannerDayItemUpdateSchema,
+)
 from app.services.base_service import BaseService
+from app.services.planner_index_utils import calc_index_between, is_gap_exhausted
 
 # Get logger for this module
 logger = logging.getLogger(__name__)
@@ -22,7 +26,22 @@ class PlannerDayItemService(BaseService[PlannerDayItem]):
             PlannerDayItem.day == day,
             PlannerDayItem.user_id == user_id
         ).order_by(PlannerDayItem.index.desc()).first()
-        return max_index_item.index + 1 if max_index_item else 0
+        return max_index_item.index + PLANNER_ITEM_INDEX_STEP if max_index_item else 0
+
+    @classmethod
+    def get_new_items_indexes(cls, db: Session, days: set[dt.date], user_id: int) -> dict[dt.date, int]:
+        """ Returns index for a new last item of each day using a single query """
+        new_indexes = {day: 0 for day in days}
+        if not new_indexes:
+            return new_indexes
+
+        rows = cls.get_base_query(db).filter(
+            PlannerDayItem.user_id == user_id,
+            PlannerDayItem.day.in_(new_indexes.keys())
+        ).group_by(PlannerDayItem.day).with_entities(PlannerDayItem.day, func.max(PlannerDayItem.index)).all()
+        for day, max_index in rows:
+            new_indexes[day] = max_index + PLANNER_ITEM_INDEX_STEP
+        return new_indexes
 
     @classmethod
     def get_day_item(cls, db: Session, item_id: int, user_id: int) -> PlannerDayItem | None:
@@ -58,6 +77,25 @@ class PlannerDayItemService(BaseService[PlannerDayItem]):
 
         return result
 
+    @classmethod
+    def get_items_by_days(
+        cls, db: Session, days: list[dt.date], user_id: int
+    ) -> dict[dt.date, list[PlannerDayItem]]:
+        """ Get items for arbitrary (not necessarily contiguous) days using a single query """
+        result = {day: [] for day in days}
+        if not result:
+            return result
+
+        items = cls.get_base_query(db).filter(
+            PlannerDayItem.user_id == user_id,
+            PlannerDayItem.day.in_(result.keys())
+        ).order_by(PlannerDayItem.day, PlannerDayItem.index).all()
+
+        for item in items:
+            result[item.day].append(item)
+
+        return result
+
     @classmethod
     def create_day_item(cls, db: Session, item: PlannerDayItemCreateSchema, user_id: int) -> PlannerDayItem:
         new_index = cls.get_new_item_index(db, item.day, user_id)
@@ -99,21 +137,77 @@ class PlannerDayItemService(BaseService[PlannerDayItem]):
     @classmethod
     def reorder_day_items(cls, db: Session, ordered_item_ids: list[int], user_id: int) -> bool:
         """ Update day items indexes accordingly to provided ordered list """
-        new_index = 0
-
         try:
             with atomic_transaction(db):
-                for item_id in ordered_item_ids:
-                    db_item = cls.get_day_item(db, item_id, user_id)
-                    if db_item:
-                        db_item.index = new_index
-                    new_index += 1
+                cls.update_indexes(db, ordered_item_ids, user_id, step=PLANNER_ITEM_INDEX_STEP)
         except TransactionRollback as e:
             logger.warning(f'reorder_day_items: {str(e)}')
             return False
 
         return True
 
+    @classmethod
+    def rebalance_day_items(cls, db: Session, day: dt.date, user_id: int) -> None:
+        """ Spreads indexes of day items evenly, keeping their order, to restore gaps between them """
+        rows = cls.get_base_query(db).filter(
+            PlannerDayItem.user_id == user_id,
+            PlannerDayItem.day == day
+        ).order_by(PlannerDayItem.index, PlannerDayItem.id).with_entities(PlannerDayItem.id).all()
+        cls.update_indexes(db, [row.id for row in rows], user_id, step=PLANNER_ITEM_INDEX_STEP)
+
+    @classmethod
+    def change_day_item_position(
+        cls, db: Session, item_id: int, after_item_id: int | None, user_id: int
+    ) -> tuple[PlannerDayItem | None, bool]:
+        """
+        Places item right after another item of the same day, or first if after_item_id is None.
+        Only the moved item index is updated, unless there is no gap left between neighbours.
+        Returns the item and a flag whether day items should be rebalanced to restore the gaps.
+        """
+        db_item = cls.get_day_item(db, item_id, user_id)
+        if not db_item:
+            return None, False
+
+        siblings_query = cls.get_base_query(db).filter(
+            PlannerDayItem.user_id == user_id,
+            PlannerDayItem.day == db_item.day,
+            PlannerDayItem.id != db_item.id
+        )
+
+        def get_neighbours_indexes() -> tuple[int | None, int | None] | None:
+            next_items_query = siblings_query
+            prev_index = None
+            if after_item_id is not None:
+                after_item = siblings_query.filter(PlannerDayItem.id == after_item_id).first()
+                if not after_item:
+                    return None
+                prev_index = after_item.index
+                next_items_query = next_items_query.filter(PlannerDayItem.index > prev_index)
+
+            next_item = next_items_query.order_by(PlannerDayItem.index).first()
+            return prev_index, next_item.index if next_item else None
+
+        try:
+            with atomic_transaction(db):
+                neighbours_indexes = get_neighbours_indexes()
+                if neighbours_indexes is None:
+                    return None, False
+
+                new_index = calc_index_between(*neighbours_indexes)
+                if new_index is None:
+                    # no gap left, rebalance in place to be able to place the item
+                    cls.rebalance_day_items(db, db_item.day, user_id)
+                    neighbours_indexes = get_neighbours_indexes()
+                    new_index = calc_index_between(*neighbours_indexes)
+
+                db_item.index = new_index
+        except TransactionRollback as e:
+            logger.warning(f'change_day_item_position: {str(e)}')
+            return None, False
+
+        db.refresh(db_item)
+        return db_item, is_gap_exhausted(neighbours_indexes[0], new_index, neighbours_indexes[1])
+
     @classmethod
     def copy_day_item(cls, db: Session, item_id: int, day: dt.date, user_id: int) -> PlannerDayItem | None:
         """ Create new item on specified date """
@@ -157,3 +251,73 @@ class PlannerDayItemService(BaseService[PlannerDayItem]):
             return None
 
         return new_db_item
+
+    @classmethod
+    def apply_day_items_batch(
+        cls, db: Session, operations: list[DayItemBatchOperationSchema], user_id: int
+    ) -> list[dict] | None:
+        """
+        Applies create, update and delete operations in order within a single transaction.
+        Referenced items are loaded and indexes of new items are allocated with one query each,
+        operations on missing items are skipped and reported with not_found status.
+        Returns None if the transaction was rolled back.
+        """
+        item_ids = {operation.item_id for operation in operations if operation.op != PlannerBatchOperation.CREATE}
+        items = {}
+        if item_ids:
+            items = {
+                item.id: item for item in cls.get_base_query(db).filter(
+                    PlannerDayItem.user_id == user_id,
+                    PlannerDayItem.id.in_(item_ids)
+                )
+            }
+        new_indexes = cls.get_new_items_indexes(
+            db, {operation.day for operation in operations if operation.op == PlannerBatchOperation.CREATE}, user_id
+        )
+
+        applied = []
+        try:
+            with atomic_transaction(db):
+                for operation in operations:
+                    if operation.op == PlannerBatchOperation.CREATE:
+                        db_item = PlannerDayItem(
+                            day=operation.day, text=operation.text, index=new_indexes[operation.day], user_id=user_id
+                        )
+                        new_indexes[operation.day] += PLANNER_ITEM_INDEX_STEP
+                        db.add(db_item)
+                        applied.append((operation, db_item))
+                        continue
+
+                    db_item = items.get(operation.item_id)
+                    # item can be deleted by one of previous operations
+                    if db_item is None or db_item.is_deleted:
+                        applied.append((operation, None))
+                        continue
+
+                    if operation.op == PlannerBatchOperation.UPDATE:
+                        update_data = operation.model_dump(exclude_unset=True, exclude={'op', 'item_id'})
+                        for field, new_value in update_data.items():
+                            setattr(db_item, field, new_value)
+                    else:
+                        db_item.mark_as_deleted()
+                    applied.append((operation, db_item))
+
+                # serialize before commit expires the items, to not reload them one by one
+                db.flush()
+                results = [
+                    {
+                        'op': operation.op,
+                        'item_id': db_item.id if db_item else getattr(operation, 'item_id', None),
+                        'status': PlannerBatchStatus.OK if db_item else PlannerBatchStatus.NOT_FOUND,
+                        'item': (
+                            PlannerDayItemSchema.model_validate(db_item, from_attributes=True)
+                            if db_item and operation.op != PlannerBatchOperation.DELETE else None
+                        ),
+                    }
+                    for operation, db_item in applied
+                ]
+        except TransactionRollback as e:
+            logger.warning(f'apply_day_items_batch: {str(e)}')
+            return None
+
+        return results
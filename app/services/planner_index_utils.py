@@ -0,0 +1,26 @@
+from app.const.planner import PLANNER_ITEM_INDEX_STEP
+
+
+def calc_index_between(prev_index: int | None, next_index: int | None) -> int | None:
+    """
+    Calculates index for an item placed between two neighbours.
+    None neighbour means the item is placed first or last.
+    Returns None if there is no gap left between neighbours indexes.
+    """
+    if prev_index is None and next_index is None:
+        return 0
+    if prev_index is None:
+        return next_index - PLANNER_ITEM_INDEX_STEP
+    if next_index is None:
+        return prev_index + PLANNER_ITEM_INDEX_STEP
+    if next_index - prev_index < 2:
+        return None
+    return (prev_index + next_index) // 2
+
+
+def is_gap_exhausted(prev_index: int | None, new_index: int, next_index: int | None) -> bool:
+    """ Checks whether another item can't be placed next to the new index anymore """
+    return (
+        (prev_index is not None and new_index - prev_index < 2)
+        or (next_index is not None and next_index - new_index < 2)
+    )
@@ -0,0 +1,87 @@
+import multiprocessing
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing.context import BaseContext
+
+from app.core.config import settings
+
+# Modules imported once by the forkserver, so worker processes started for each call don't import them again
+FORKSERVER_PRELOAD_MODULES = ['app.services.notes_parse_pool', 'app.services.pdf_render_pool']
+
+# Shared by all pools, so concurrent imports and exports don't start an unbounded number of worker processes
+_worker_slots = threading.BoundedSemaphore(settings.WORKER_POOLS_MAX_CALLS)
+
+
+def get_mp_context() -> BaseContext:
+    """
+    Worker processes are started by a forkserver, or spawned where it's not available, instead of being forked
+    from the multi-threaded API process, which can copy locks held by other threads and deadlock.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(FORKSERVER_PRELOAD_MODULES)
+    return context
+
+
+class WorkerProcessPool:
+    """
+    Base of pools running CPU-bound work in worker processes.
+    Each call starts its own executor, so a crashed or killed worker fails only the call which used it.
+    At most WORKER_POOLS_MAX_CALLS calls of all pools use worker processes at once, calls above that
+    run in the calling thread and are counted as throttled.
+    Subclasses count their stats with _record, stats listed in stats_keys are exposed by get_stats.
+    """
+    stats_keys: tuple[str, ...] = ()
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.mp_context = get_mp_context()
+
+        self._lock = threading.Lock()
+        self._executors: set[ProcessPoolExecutor] = set()
+        self._stats = dict.fromkeys((*self.stats_keys, 'throttled'), 0)
+
+    @contextmanager
+    def _worker_slot(self) -> Iterator[bool]:
+        """ Yields True if the call can start worker processes, False if it has to run in the calling thread """
+        if not _worker_slots.acquire(blocking=False):
+            self._record('throttled')
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            _worker_slots.release()
+
+    def _start_executor(self, initializer: Callable | None = None, initargs: tuple = ()) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=self.mp_context, initializer=initializer, initargs=initargs
+        )
+        with self._lock:
+            self._executors.add(executor)
+        return executor
+
+    def _stop_executor(self, executor: ProcessPoolExecutor, wait: bool = True) -> None:
+        with self._lock:
+            self._executors.discard(executor)
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _record(self, key: str, count: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += count
+
+    def shutdown(self) -> None:
+        """ Stops executors of calls which are still running """
+        with self._lock:
+            executors, self._executors = self._executors, set()
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'max_workers': self.max_workers, **self._stats}
@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+
+from app.core.config import settings
+from app.core.file_utils import PRIVATE_DIR_MODE, ensure_private_dir, open_private_file
+from app.core.metrics import register_stats_provider
+
+logger = logging.getLogger(__name__)
+
+# Bump to drop entries rendered with previous templates
+RENDER_CACHE_VERSION = 1
+
+
+class RenderCache:
+    """
+    Content-addressed disk cache of rendered notes, keyed by a hash of the export type, title and body,
+    so unchanged notes are not rendered again and changed notes never get stale content.
+    Reads touch file mtime, when the total size exceeds max_size the least recently used files are evicted.
+    """
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        # total size of cached files, calculated on first write
+        self._size: int | None = None
+        # cache directory checked to be private on first write
+        self._checked_directory: str | None = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(export_type: str, title: str, body: str) -> str:
+        key_hash = hashlib.sha256()
+        for part in (str(RENDER_CACHE_VERSION), export_type, title, body):
+            key_hash.update(part.encode('utf-8'))
+            key_hash.update(b'\0')
+        return key_hash.hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> bytes | None:
+        if not self.is_enabled:
+            return None
+
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as file:
+                content = file.read()
+            os.utime(path)
+        except OSError:
+            # missing or evicted by another process
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            self._hits += 1
+        return content
+
+    def set(self, key: str, content: bytes) -> None:
+        if not self.is_enabled:
+            return
+
+        path = self._get_path(key)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        try:
+            if self._checked_directory != self.directory:
+                ensure_private_dir(self.directory)
+                self._checked_directory = self.directory
+            os.makedirs(os.path.dirname(path), mode=PRIVATE_DIR_MODE, exist_ok=True)
+            with open_private_file(tmp_path) as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f'RenderCache.set: {str(e)}')
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._calc_size()
+            else:
+                self._size += len(content)
+
+            if self._size > self.max_size:
+                self._evict()
+
+    def _iter_files(self):
+        try:
+            subdirs = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    yield entry
+
+    def _calc_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._iter_files())
+
+    def _evict(self) -> None:
+        """ Removes least recently used files until the cache takes 90% of max_size, called under the lock """
+        files = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._iter_files()),
+            key=lambda file: file[0],
+        )
+        self._size = sum(size for _, size, _ in files)
+
+        target_size = self.max_size * 0.9
+        for _, size, path in files:
+            if self._size <= target_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            self._evictions += 1
+
+    def clear(self) -> None:
+        """ Removes all cached files and resets stats """
+        with self._lock:
+            for entry in self._iter_files():
+                os.remove(entry.path)
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size_bytes': self._size or 0,
+                'max_size_bytes': self.max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+            }
+
+
+render_cache = RenderCache(
+    directory=settings.EXPORT_RENDER_CACHE_DIR, max_size=settings.EXPORT_RENDER_CACHE_MAX_SIZE_MB * 1024 * 1024
+)
+register_stats_provider('render_cache', render_cache.get_stats)
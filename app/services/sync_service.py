@@ -0,0 +1,43 @@
+from sqlalchemy.orm import Session
+
+from app.models.notes import Note, NotesFolder
+from app.models.planner import PlannerAgenda, PlannerAgendaItem, PlannerDayItem
+from app.models.user import User
+
+# { <response key>: <change tracked model> }
+SYNC_MODELS = {
+    'planner_day_items': PlannerDayItem,
+    'planner_agendas': PlannerAgenda,
+    'planner_agenda_items': PlannerAgendaItem,
+    'notes_folders': NotesFolder,
+    'notes': Note,
+}
+
+
+class SyncService:
+    @classmethod
+    def get_change_seq(cls, db: Session, user_id: int) -> int:
+        return db.query(User.change_seq).filter(User.id == user_id).scalar() or 0
+
+    @classmethod
+    def get_changes(cls, db: Session, user_id: int, since: int = 0) -> dict:
+        """
+        Returns rows created, updated or deleted after the since change sequence,
+        using one (user_id, change_seq) index range scan per table.
+        With since=0, or since ahead of the user sequence (e.g. a restored database), returns all not deleted rows
+        and is_full=True, so the client replaces its data.
+        """
+        change_seq = cls.get_change_seq(db, user_id)
+        is_full = since <= 0 or since > change_seq
+
+        changes = {'change_seq': change_seq, 'is_full': is_full}
+        for key, model in SYNC_MODELS.items():
+            # rows of transactions committed after the user sequence was read are returned next time
+            query = db.query(model).filter(model.user_id == user_id, model.change_seq <= change_seq)
+            if is_full:
+                query = query.filter(model.is_deleted.is_(False))
+            else:
+                query = query.filter(model.change_seq > since)
+            changes[key] = query.order_by(model.change_seq, model.id).all()
+
+        return changes
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.core.metrics import register_stats_provider
+from app.schemas.user import UserSchema
+
+
+class UserCache:
+    """
+    Per-process bounded cache of authenticated users keyed by user id.
+    Entries expire after ttl_seconds, least recently used entries are evicted when max_size is reached.
+    Users are stored as UserSchema snapshots, so cached values are not bound to any db session.
+    """
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        # { <user_id>: (<expire_at>, <user>) }
+        self._items: OrderedDict[int, tuple[float, UserSchema]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._hits_time = 0.0
+        self._misses_time = 0.0
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: int) -> UserSchema | None:
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+
+            expire_at, user = item
+            if expire_at <= time.monotonic():
+                del self._items[user_id]
+                return None
+
+            self._items.move_to_end(user_id)
+            return user
+
+    def set(self, user: UserSchema) -> None:
+        if not self.is_enabled:
+            return
+
+        with self._lock:
+            self._items[user.id] = (time.monotonic() + self.ttl_seconds, user)
+            self._items.move_to_end(user.id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            if self._items.pop(user_id, None) is not None:
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        """ Drops all entries and resets stats """
+        with self._lock:
+            self._items.clear()
+            self._reset_stats()
+
+    def record_lookup(self, is_hit: bool, duration: float) -> None:
+        """ Records a current user lookup and its duration in seconds """
+        with self._lock:
+            if is_hit:
+                self._hits += 1
+                self._hits_time += duration
+            else:
+                self._misses += 1
+                self._misses_time += duration
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._items),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'avg_hit_ms': self._hits_time * 1000 / self._hits if self._hits else 0.0,
+                'avg_miss_ms': self._misses_time * 1000 / self._misses if self._misses else 0.0,
+            }
+
+
+user_cache = UserCache(max_size=settings.USER_CACHE_MAX_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+register_stats_provider('user_cache', user_cache.get_stats)
@@ -1,9 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.schemas.user import UserCreateSchema, UserUpdateSchema
 from app.services.base_service import BaseService
 from app.services.auth_utils import generate_password_hash, validate_password
+from app.services.user_cache import user_cache
 
 
 class UserService(BaseService[User]):
@@ -21,6 +23,10 @@ class UserService(BaseService[User]):
     def get_user_by_id(cls, db: Session, user_id: int) -> User | None:
         return cls.get_base_query(db).filter(User.id == user_id).first()
 
+    @classmethod
+    async def async_get_user_by_id(cls, db: AsyncSession, user_id: int) -> User | None:
+        return (await db.scalars(cls.get_base_select().where(User.id == user_id))).first()
+
     @classmethod
     def create_user(cls, db: Session, create_data: UserCreateSchema) -> User:
         # Check if user with this email or username already exists
@@ -54,6 +60,7 @@ class UserService(BaseService[User]):
         for field, new_value in update_data.items():
             setattr(db_user, field, new_value)
         db.commit()
+        user_cache.invalidate(user_id)
 
         db.refresh(db_user)
         return db_user
@@ -72,6 +79,7 @@ class UserService(BaseService[User]):
         # Update to new password
         user.hashed_password = generate_password_hash(new_password)
         db.commit()
+        user_cache.invalidate(user_id)
 
         db.refresh(user)
         return user
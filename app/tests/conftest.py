@@ -4,9 +4,15 @@ import os
 # Set required environment variables for testing before importing app
 os.environ["SECRET_KEY"] = 'test-secret-key'
 os.environ["CORS_ORIGINS"] = json.dumps(['http://localhost:5173', 'http://localhost:3000'])
+# Minimal bcrypt cost to keep tests fast
+os.environ["BCRYPT_ROUNDS"] = '4'
+# Tests use their own database, jobs of the app engine are not recovered or maintained
+os.environ["EXPORT_JOBS_RECOVER_ON_STARTUP"] = '0'
+os.environ["EXPORT_JOBS_MAINTENANCE_SECONDS"] = '0'
 
 
 pytest_plugins = [
     'app.tests.fixtures.auth',
     'app.tests.fixtures.database',
+    'app.tests.fixtures.notes_export',
 ]
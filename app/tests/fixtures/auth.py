@@ -2,9 +2,18 @@ import pytest
 
 from app.models.user import User
 from app.services.auth_utils import generate_password_hash, create_access_token
+from app.services.user_cache import user_cache
 from app.tests.const import TEST_USERNAME, TEST_EMAIL, TEST_PASSWORD
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_user_cache():
+    """ Users cache is per process, so clear it to not leak users between tests """
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
 @pytest.fixture(scope="function")
 def test_user(test_db):
     """Create a test user for authentication tests"""
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -9,6 +10,7 @@ from app.main import app
 
 # Use an in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = 'sqlite:///:memory:'
+SQLALCHEMY_ASYNC_DATABASE_URL = 'sqlite+aiosqlite:///:memory:'
 
 @pytest.fixture(scope='function')
 def test_engine():
@@ -43,6 +45,90 @@ def test_db(test_db_factory):
         db.close()
 
 
+@pytest.fixture(scope='function')
+async def test_async_db():
+    """ Async session on a separate in-memory database, tests using it should be marked with anyio """
+    engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)() as db:
+        yield db
+
+    await engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def query_counter(test_engine):
+    """ Collects SQL statements executed on the test engine, use len(query_counter) to get their count """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(test_engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture(scope="function")
+def query_plans(test_engine):
+    """
+    Collects query plans of SELECT statements executed on the test engine as (statement, plan) tuples.
+    Plans are obtained by running EXPLAIN with the same parameters on a separate cursor.
+    """
+    plans = []
+    explain_prefix = 'EXPLAIN QUERY PLAN ' if test_engine.dialect.name == 'sqlite' else 'EXPLAIN '
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith('SELECT'):
+            return
+
+        explain_cursor = conn.connection.cursor()
+        try:
+            explain_cursor.execute(explain_prefix + statement, parameters)
+            plan = '\n'.join(str(row[-1]) for row in explain_cursor.fetchall())
+        finally:
+            explain_cursor.close()
+        plans.append((statement, plan))
+
+    event.listen(test_engine, 'before_cursor_execute', before_cursor_execute)
+    yield plans
+    event.remove(test_engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _get_rows_size(rows: list[tuple]) -> int:
+    """ Size of result values as sent by PostgreSQL text protocol """
+    return sum(
+        len(value) if isinstance(value, bytes) else len(str(value).encode('utf-8'))
+        for row in rows for value in row if value is not None
+    )
+
+
+@pytest.fixture(scope="function")
+def fetched_bytes(test_engine):
+    """
+    Collects sizes of results of SELECT statements executed on the test engine as (statement, size) tuples.
+    Results are fetched again by running the statement with the same parameters on a separate cursor.
+    """
+    sizes = []
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return
+
+        size_cursor = conn.connection.cursor()
+        try:
+            size_cursor.execute(statement, parameters)
+            sizes.append((statement, _get_rows_size(size_cursor.fetchall())))
+        finally:
+            size_cursor.close()
+
+    event.listen(test_engine, 'after_cursor_execute', after_cursor_execute)
+    yield sizes
+    event.remove(test_engine, 'after_cursor_execute', after_cursor_execute)
+
+
 @pytest.fixture(scope="function")
 def client(test_db):
     def override_get_db():
@@ -0,0 +1,46 @@
+import time
+import pytest
+
+from app.core.config import settings
+from app.services.notes_export_job_service import NotesExportJobService
+from app.services.render_cache import render_cache
+
+
+def fake_render_pdf(title: str, body: str) -> bytes:
+    """ Module-level, so it can be pickled to worker processes """
+    if title == 'Bad':
+        raise ValueError('Invalid HTML')
+    if title == 'Slow':
+        time.sleep(10)
+    if title.startswith('Wait'):
+        time.sleep(0.1)
+    return f'%PDF {title}'.encode()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def render_cache_dir(tmp_path, monkeypatch):
+    """ Keeps rendered notes of each test in its own directory """
+    cache_dir = tmp_path / 'render_cache'
+    monkeypatch.setattr(render_cache, 'directory', str(cache_dir))
+    render_cache.clear()
+    return cache_dir
+
+
+@pytest.fixture(scope="function")
+def export_jobs_dir(tmp_path, monkeypatch):
+    """ Stores export job archives in a temporary directory """
+    monkeypatch.setattr(settings, 'EXPORT_JOBS_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture(scope="function")
+def sync_export_jobs(export_jobs_dir, monkeypatch):
+    """
+    Runs export jobs right in the request instead of the worker thread,
+    so the worker doesn't use the shared test db connection concurrently with the test.
+    """
+    def submit_job(bind, job_id):
+        NotesExportJobService.run_job(bind, job_id)
+
+    monkeypatch.setattr(NotesExportJobService, 'submit_job', submit_job)
+    return export_jobs_dir
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+class TestMetrics:
+    def test_metrics_disabled(self, client: TestClient, monkeypatch):
+        monkeypatch.setattr(settings, 'METRICS_TOKEN', None)
+        response = client.get('/metrics/', headers={'Authorization': 'Bearer '})
+        assert response.status_code == 404
+
+    def test_metrics_token(self, client: TestClient, auth_headers: dict, monkeypatch):
+        monkeypatch.setattr(settings, 'METRICS_TOKEN', 'metrics-token')
+
+        assert client.get('/metrics/').status_code == 401
+        # user access tokens are not accepted
+        assert client.get('/metrics/', headers=auth_headers).status_code == 401
+
+        response = client.get('/metrics/', headers={'Authorization': 'Bearer metrics-token'})
+        assert response.status_code == 200
+        assert 'user_cache' in response.json()
@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.notes import NoteCreateSchema, NoteUpdateSchema
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_service import NoteService
+
+
+class TestNotesAPI:
+    def test_get_note_etag(self, client: TestClient, test_db: Session, test_user, auth_headers):
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        note = NoteService.create_note(
+            test_db,
+            user_id=test_user.id,
+            create_data=NoteCreateSchema(title='Note', body='<p>Body</p>', folder_id=root_folder.id)
+        )
+        url = f'{settings.API_V1_STR}/notes/{note.id}/'
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()['body'] == '<p>Body</p>'
+        etag = response.headers['ETag']
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.content == b''
+
+        # strong form of the same tag and lists of tags match too
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': f'"other", {etag.removeprefix("W/")}'})
+        assert response.status_code == 304
+
+        NoteService.update_note(
+            test_db, note_id=note.id, user_id=test_user.id, update_data=NoteUpdateSchema(body='<p>Changed</p>')
+        )
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json()['body'] == '<p>Changed</p>'
+        assert response.headers['ETag'] != etag
+
+    def test_get_note_not_found(self, client: TestClient, test_user, auth_headers):
+        response = client.get(f'{settings.API_V1_STR}/notes/0/', headers={**auth_headers, 'If-None-Match': '*'})
+        assert response.status_code == 404
@@ -1,11 +1,14 @@
+import datetime as dt
 import io
+import os
 import zipfile
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from app.const.notes import ExportType, ExportTarget
+from app.const.notes import ExportJobStatus, ExportType, ExportTarget
 from app.core.config import settings
 from app.schemas.notes import NoteCreateSchema
+from app.models.notes import NotesExportJob
 from app.schemas.notes_folders import NotesFolderCreateSchema
 from app.services.notes_service import NoteService
 from app.services.notes_folders_service import NotesFolderService
@@ -150,6 +153,17 @@ class TestNotesExportAPI:
             assert f'{root_note.title}.html' in filenames
             assert f'{sub_note.title}.html' in filenames
 
+    def test_export_all_notes_empty(self, client: TestClient, test_user, auth_headers):
+        response = client.get(
+            f'{settings.API_V1_STR}/notes/export/',
+            params={
+                'export_type': ExportType.HTML.value,
+                'export_target': ExportTarget.ALL_NOTES.value,
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == 404
+
     def test_export_not_found(self, client: TestClient, test_user, auth_headers):
         response = client.get(
             f'{settings.API_V1_STR}/notes/export/',
@@ -264,3 +278,128 @@ class TestNotesExportAPI:
             note_filename = f'{note.title}.pdf'
             assert note_filename in filenames
             assert zf.read(note_filename).startswith(b'%PDF')
+
+    def test_export_job_all_notes(
+        self, client: TestClient, test_db: Session, test_user, auth_headers, sync_export_jobs
+    ):
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        for title in ('Note 1', 'Note 2'):
+            NoteService.create_note(
+                test_db,
+                user_id=test_user.id,
+                create_data=NoteCreateSchema(title=title, body=self.TEST_NOTE_BODY, folder_id=root_folder.id)
+            )
+
+        response = client.post(
+            f'{settings.API_V1_STR}/notes/export/jobs/',
+            json={'export_type': ExportType.HTML.value, 'export_target': ExportTarget.ALL_NOTES.value},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        job_id = response.json()['id']
+
+        response = client.get(f'{settings.API_V1_STR}/notes/export/jobs/{job_id}/', headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == ExportJobStatus.COMPLETED.value
+        assert data['notes_total'] == 2
+        assert data['notes_done'] == 2
+        assert data['filename'] == 'all_notes.zip'
+        assert data['expires_dt'] is not None
+
+        response = client.get(f'{settings.API_V1_STR}/notes/export/jobs/{job_id}/download/', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers['content-length'] == str(data['file_size'])
+        assert 'filename="all_notes.zip"' in response.headers['content-disposition']
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            assert sorted(zf.namelist()) == ['Note 1.html', 'Note 2.html']
+
+        # resume download from the middle of the archive
+        response = client.get(
+            f'{settings.API_V1_STR}/notes/export/jobs/{job_id}/download/',
+            headers={**auth_headers, 'Range': 'bytes=10-19'}
+        )
+        assert response.status_code == 206
+        assert response.headers['content-range'] == f"bytes 10-19/{data['file_size']}"
+        assert len(response.content) == 10
+
+    def test_export_job_folder(self, client: TestClient, test_db: Session, test_user, auth_headers, sync_export_jobs):
+        folder = NotesFolderService.create_folder(
+            test_db, user_id=test_user.id, create_data=NotesFolderCreateSchema(name='Folder')
+        )
+        NoteService.create_note(
+            test_db, user_id=test_user.id, create_data=NoteCreateSchema(title='Note', body='', folder_id=folder.id)
+        )
+
+        response = client.post(
+            f'{settings.API_V1_STR}/notes/export/jobs/',
+            json={
+                'export_type': ExportType.MARKDOWN.value,
+                'export_target': ExportTarget.FOLDER_NOTES.value,
+                'export_target_id': folder.id,
+            },
+            headers=auth_headers
+        )
+        job_id = response.json()['id']
+
+        response = client.get(f'{settings.API_V1_STR}/notes/export/jobs/{job_id}/download/', headers=auth_headers)
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            assert zf.namelist() == ['Note.md']
+
+    def test_export_job_invalid_target(self, client: TestClient, test_user, auth_headers, sync_export_jobs):
+        response = client.post(
+            f'{settings.API_V1_STR}/notes/export/jobs/',
+            json={
+                'export_type': ExportType.HTML.value,
+                'export_target': ExportTarget.FOLDER_NOTES.value,
+                'export_target_id': 456,
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == 404
+
+        response = client.post(
+            f'{settings.API_V1_STR}/notes/export/jobs/',
+            json={
+                'export_type': ExportType.HTML.value,
+                'export_target': ExportTarget.SINGLE_NOTE.value,
+                'export_target_id': 456,
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == 400
+
+        response = client.get(f'{settings.API_V1_STR}/notes/export/jobs/456/', headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_export_job_expired(self, client: TestClient, test_db: Session, test_user, auth_headers, sync_export_jobs):
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        NoteService.create_note(
+            test_db, user_id=test_user.id, create_data=NoteCreateSchema(title='Note', body='', folder_id=root_folder.id)
+        )
+        response = client.post(
+            f'{settings.API_V1_STR}/notes/export/jobs/',
+            json={'export_type': ExportType.HTML.value, 'export_target': ExportTarget.ALL_NOTES.value},
+            headers=auth_headers
+        )
+        job_id = response.json()['id']
+
+        job = test_db.get(NotesExportJob, job_id)
+        test_db.refresh(job)
+        file_path = job.file_path
+        job.expires_dt = dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=1)
+        test_db.commit()
+
+        response = client.get(f'{settings.API_V1_STR}/notes/export/jobs/{job_id}/download/', headers=auth_headers)
+        assert response.status_code == 404
+
+        # expired archives are removed when the next job is created
+        client.post(
+            f'{settings.API_V1_STR}/notes/export/jobs/',
+            json={'export_type': ExportType.HTML.value, 'export_target': ExportTarget.ALL_NOTES.value},
+            headers=auth_headers
+        )
+        response = client.get(f'{settings.API_V1_STR}/notes/export/jobs/{job_id}/', headers=auth_headers)
+        assert response.json()['status'] == ExportJobStatus.EXPIRED.value
+        assert not os.path.exists(file_path)
@@ -2,7 +2,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.schemas.notes import NoteCreateSchema
+from app.schemas.notes import NoteCreateSchema, NoteUpdateSchema
 from app.schemas.notes_folders import NotesFolderCreateSchema
 from app.services.notes_folders_service import NotesFolderService
 from app.services.notes_service import NoteService
@@ -73,3 +73,77 @@ class TestNotesFolderAPI:
         assert len(notes) == 2
         assert notes[0]['id'] == new_note.id
         assert notes[1]['id'] == old_note.id
+
+    def test_get_folders_queries_count(
+        self, client: TestClient, test_db: Session, test_user, auth_headers, query_counter
+    ):
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        NotesFolderService.get_trash_folder(test_db, user_id=test_user.id)
+        parent_id = root_folder.id
+        for depth in range(10):
+            folder = NotesFolderService.create_folder(
+                test_db,
+                user_id=test_user.id,
+                create_data=NotesFolderCreateSchema(name=f'Level {depth}', parent_id=parent_id)
+            )
+            NoteService.create_note(
+                test_db,
+                user_id=test_user.id,
+                create_data=NoteCreateSchema(title=f'Note {depth}', folder_id=folder.id)
+            )
+            parent_id = folder.id
+
+        query_counter.clear()
+        response = client.get(f'{settings.API_V1_STR}/notes/folders/', headers=auth_headers)
+        assert response.status_code == 200
+
+        # user, version, root and trash folders, folders tree and notes, whatever the tree depth
+        assert len(query_counter) == 6
+
+        folder = response.json()['root_folder']
+        for depth in range(10):
+            folder = folder['subfolders'][0]
+            assert folder['notes'][0]['title'] == f'Note {depth}'
+
+    def test_get_folders_etag(
+        self, client: TestClient, test_db: Session, test_user, auth_headers, query_counter
+    ):
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        NotesFolderService.get_trash_folder(test_db, user_id=test_user.id)
+        note = NoteService.create_note(
+            test_db,
+            user_id=test_user.id,
+            create_data=NoteCreateSchema(title='Note', folder_id=root_folder.id)
+        )
+        url = f'{settings.API_V1_STR}/notes/folders/'
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert etag.startswith('W/"')
+
+        # unchanged tree is not loaded again
+        query_counter.clear()
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response.headers['ETag'] == etag
+        assert not any('WITH RECURSIVE' in statement for statement in query_counter)
+
+        # any change of notes or folders changes the ETag
+        previous_etags = {etag}
+        for change in (
+            lambda: NoteService.update_note(
+                test_db, note_id=note.id, user_id=test_user.id, update_data=NoteUpdateSchema(title='Renamed')
+            ),
+            lambda: NotesFolderService.create_folder(
+                test_db, user_id=test_user.id, create_data=NotesFolderCreateSchema(name='Folder')
+            ),
+            lambda: NoteService.delete_note(test_db, note_id=note.id, user_id=test_user.id),
+        ):
+            change()
+            response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+            assert response.status_code == 200
+            etag = response.headers['ETag']
+            assert etag not in previous_etags
+            previous_etags.add(etag)
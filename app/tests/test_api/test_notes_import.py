@@ -70,6 +70,17 @@ class TestNotesImport:
         assert data['imported_count'] == 1
 
 
+    def test_import_invalid_zip(self, client: TestClient, auth_headers: dict, test_db: Session):
+        files = [
+            ('files', ('notes.txt', b'Imported before the archive')),
+            ('files', ('archive.zip', b'not a zip archive')),
+        ]
+        response = client.post(f'{settings.API_V1_STR}/notes/import/', files=files, headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()['detail'] == 'Failed to import archive.zip'
+        # files of the same upload are rolled back with the failed archive
+        assert test_db.query(Note).count() == 0
+
     def test_import_invalid_file(self, client: TestClient, auth_headers: dict):
         files = [
             ('files', ('image.png', b'not a text file')),
@@ -110,6 +121,28 @@ class TestNotesImport:
         assert note.title == 'test'
 
 
+    def test_import_zip_incremental(self, client: TestClient, auth_headers: dict, test_db: Session, test_user):
+        def import_zip(files: dict[str, str]) -> dict:
+            zip_buffer = io.BytesIO()
+            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                for path, content in files.items():
+                    zip_file.writestr(path, content)
+            response = client.post(
+                f'{settings.API_V1_STR}/notes/import/?incremental=true',
+                files=[('files', ('vault.zip', zip_buffer.getvalue(), 'application/zip'))],
+                headers=auth_headers
+            )
+            assert response.status_code == 200
+            return response.json()
+
+        vault = {'note 1.txt': 'Content 1', 'folder/note 2.txt': 'Content 2'}
+        assert import_zip(vault) == {'imported_count': 2, 'created_count': 2, 'updated_count': 0, 'skipped_count': 0}
+        assert import_zip(vault) == {'imported_count': 0, 'created_count': 0, 'updated_count': 0, 'skipped_count': 2}
+
+        vault['folder/note 2.txt'] = 'Changed'
+        assert import_zip(vault) == {'imported_count': 1, 'created_count': 0, 'updated_count': 1, 'skipped_count': 1}
+        assert test_db.query(Note).filter_by(user_id=test_user.id).count() == 2
+
     def test_import_with_invalid_folder_id(self, client: TestClient, auth_headers: dict):
         files = [
             ('files', ('test.txt', b'Hello')),
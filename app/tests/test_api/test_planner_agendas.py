@@ -1,7 +1,8 @@
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from app.const.planner import PlannerAgendaType, PlannerItemState
+from app.const.planner import PlannerAgendaType, PlannerItemState, PLANNER_BATCH_OPERATIONS_LIMIT
 from app.core.config import settings
 from app.models.planner import PlannerAgenda, PlannerAgendaItem
 
@@ -64,3 +65,116 @@ class TestPlannerAgendaAPI:
         assert data['name'] == 'New API Agenda'
         assert data['todo_items_cnt'] == 0
         assert data['completed_items_cnt'] == 0
+
+    def test_get_items_by_agendas(
+        self, client: TestClient, test_db: Session, test_user, auth_headers, query_counter
+    ):
+        agendas = [
+            PlannerAgenda(name=f'Agenda {i}', agenda_type=PlannerAgendaType.CUSTOM, user_id=test_user.id, index=i)
+            for i in range(10)
+        ]
+        test_db.add_all(agendas)
+        test_db.commit()
+
+        items = [
+            PlannerAgendaItem(text=f'Item {agenda.id}', agenda_id=agenda.id, user_id=test_user.id)
+            for agenda in agendas
+        ]
+        test_db.add_all(items)
+        test_db.commit()
+        agenda_ids = [agenda.id for agenda in agendas]
+
+        query_counter.clear()
+        response = client.get(
+            f'{settings.API_V1_STR}/planner/agendas/items/',
+            params={'agenda_ids': agenda_ids},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 10
+        assert data[str(agenda_ids[0])][0]['text'] == f'Item {agenda_ids[0]}'
+        # One query to get the current user and one query to get items of all agendas
+        assert len(query_counter) == 2
+
+    def test_reorder_agendas(self, client: TestClient, test_db: Session, test_user, auth_headers, query_counter):
+        agendas = [
+            PlannerAgenda(name=f'Agenda {i}', agenda_type=PlannerAgendaType.CUSTOM, user_id=test_user.id, index=i + 1)
+            for i in range(5)
+        ]
+        test_db.add_all(agendas)
+        test_db.commit()
+        reversed_ids = [agenda.id for agenda in reversed(agendas)]
+
+        query_counter.clear()
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/agendas/reorder/',
+            json={'ordered_agenda_ids': reversed_ids},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        # current user, agendas ownership, change sequence and indexes update
+        assert len(query_counter) == 4
+
+        indexes = {agenda.id: agenda.index for agenda in test_db.query(PlannerAgenda).all()}
+        assert [indexes[agenda_id] for agenda_id in reversed_ids] == [1, 2, 3, 4, 5]
+
+    def test_reorder_agenda_items_not_found(self, client: TestClient, test_db: Session, test_user, auth_headers):
+        agenda = PlannerAgenda(name='Agenda', agenda_type=PlannerAgendaType.CUSTOM, user_id=test_user.id, index=1)
+        test_db.add(agenda)
+        test_db.commit()
+
+        item = PlannerAgendaItem(text='Item', index=0, agenda_id=agenda.id, user_id=test_user.id)
+        test_db.add(item)
+        test_db.commit()
+
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/agendas/items/reorder/',
+            json={'ordered_item_ids': [item.id, 777]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 404
+        assert response.json()['detail'] == 'Planner agenda item with id 777 not found'
+
+    def test_apply_agenda_items_batch(self, client: TestClient, test_db: Session, test_user, auth_headers):
+        agenda = PlannerAgenda(name='Source', agenda_type=PlannerAgendaType.CUSTOM, user_id=test_user.id, index=0)
+        target_agenda = PlannerAgenda(
+            name='Target', agenda_type=PlannerAgendaType.CUSTOM, user_id=test_user.id, index=1
+        )
+        test_db.add_all([agenda, target_agenda])
+        test_db.commit()
+        item = PlannerAgendaItem(text='Item', state=PlannerItemState.TODO, agenda_id=agenda.id, user_id=test_user.id)
+        test_db.add(item)
+        test_db.commit()
+        url = f'{settings.API_V1_STR}/planner/agendas/items/batch/'
+
+        response = client.post(url, json={'operations': [
+            {'op': 'create', 'agenda_id': agenda.id, 'text': 'New'},
+            {'op': 'move', 'item_id': item.id, 'agenda_id': target_agenda.id},
+            {'op': 'delete', 'item_id': item.id},
+        ]}, headers=auth_headers)
+
+        assert response.status_code == 200
+        results = response.json()
+        assert results[0]['status'] == 'ok'
+        assert results[0]['item']['text'] == 'New'
+        assert results[1]['item_id'] == item.id
+        assert results[1]['item']['agenda_id'] == target_agenda.id
+        assert results[1]['item']['text'] == 'Item'
+        # item was moved by the previous operation
+        assert results[2] == {'op': 'delete', 'item_id': item.id, 'status': 'not_found', 'item': None}
+
+    @pytest.mark.parametrize('operations', [
+        [{'op': 'copy', 'item_id': 1}],
+        [{'op': 'move', 'agenda_id': 1}],
+        [{'op': 'archive', 'item_id': 1}],
+        [{'op': 'delete', 'item_id': i} for i in range(PLANNER_BATCH_OPERATIONS_LIMIT + 1)],
+    ])
+    def test_apply_agenda_items_batch_invalid(self, client: TestClient, auth_headers, operations):
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/agendas/items/batch/', json={'operations': operations}, headers=auth_headers
+        )
+        assert response.status_code == 422
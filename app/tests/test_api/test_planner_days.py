@@ -1,7 +1,10 @@
 import datetime as dt
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app.const.planner import PLANNER_BATCH_OPERATIONS_LIMIT, PLANNER_DAYS_REQUEST_LIMIT, PLANNER_ITEM_INDEX_STEP
+from app.models.planner import PlannerDayItem
 from app.core.config import settings
 from app.schemas.planner_day import PlannerDayItemCreateSchema
 from app.services.planner_day_service import PlannerDayItemService
@@ -34,3 +37,178 @@ class TestPlannerDayAPI:
         
         assert len(data['2026-02-02']) == 1
         assert data['2026-02-02'][0]['text'] == 'Item for 2026-02-02'
+
+    def test_get_items_by_days(self, client: TestClient, test_db: Session, test_user, auth_headers):
+        for date in (dt.date(2026, 2, 2), dt.date(2026, 2, 9)):
+            PlannerDayItemService.create_day_item(
+                test_db,
+                item=PlannerDayItemCreateSchema(day=date, text=f'Item for {date}'),
+                user_id=test_user.id
+            )
+
+        response = client.get(
+            f'{settings.API_V1_STR}/planner/days/items/',
+            params={'days': ['2026-02-02', '2026-02-05', '2026-02-09']},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data.keys()) == ['2026-02-02', '2026-02-05', '2026-02-09']
+        assert data['2026-02-02'][0]['text'] == 'Item for 2026-02-02'
+        assert data['2026-02-05'] == []
+        assert data['2026-02-09'][0]['text'] == 'Item for 2026-02-09'
+
+    @pytest.mark.parametrize('days_count', [1, 14, PLANNER_DAYS_REQUEST_LIMIT])
+    def test_get_items_by_days_query_count(
+        self, client: TestClient, test_db: Session, test_user, auth_headers, query_counter, days_count
+    ):
+        start_date = dt.date(2026, 2, 2)
+        # Request every other day, so days are not contiguous
+        days = [start_date + dt.timedelta(days=2 * i) for i in range(days_count)]
+        for date in days:
+            PlannerDayItemService.create_day_item(
+                test_db,
+                item=PlannerDayItemCreateSchema(day=date, text=f'Item for {date}'),
+                user_id=test_user.id
+            )
+
+        query_counter.clear()
+        response = client.get(
+            f'{settings.API_V1_STR}/planner/days/items/',
+            params={'days': [day.isoformat() for day in days]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()) == days_count
+        # One query to get the current user and one query to get the items, regardless of days count
+        assert len(query_counter) == 2
+
+    def test_get_items_by_days_limit(self, client: TestClient, test_user, auth_headers):
+        start_date = dt.date(2026, 2, 2)
+        days = [start_date + dt.timedelta(days=i) for i in range(PLANNER_DAYS_REQUEST_LIMIT + 1)]
+
+        response = client.get(
+            f'{settings.API_V1_STR}/planner/days/items/',
+            params={'days': [day.isoformat() for day in days]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('items_count', [10, 100])
+    def test_reorder_day_items(
+        self, client: TestClient, test_db: Session, test_user, auth_headers, query_counter, items_count
+    ):
+        day = dt.date(2026, 2, 2)
+        items = [PlannerDayItem(text=f'Item {i}', index=i, day=day, user_id=test_user.id) for i in range(items_count)]
+        test_db.add_all(items)
+        test_db.commit()
+        reversed_ids = [item.id for item in reversed(items)]
+
+        query_counter.clear()
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/days/items/reorder/',
+            json={'ordered_item_ids': reversed_ids},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        # Get the current user, validate items ownership, increment change sequence and update indexes,
+        # regardless of items count
+        assert len(query_counter) == 4
+
+        ordered_items = PlannerDayItemService.get_items_by_day(test_db, day, test_user.id)
+        assert [item.id for item in ordered_items] == reversed_ids
+
+    def test_reorder_day_items_not_found(self, client: TestClient, test_db: Session, test_user, auth_headers):
+        day = dt.date(2026, 2, 2)
+        item = PlannerDayItem(text='Item', index=0, day=day, user_id=test_user.id)
+        other_user_item = PlannerDayItem(text='Other Item', index=0, day=day, user_id=7)
+        test_db.add_all([item, other_user_item])
+        test_db.commit()
+
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/days/items/reorder/',
+            json={'ordered_item_ids': [other_user_item.id, item.id]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 404
+        test_db.refresh(item)
+        test_db.refresh(other_user_item)
+        assert item.index == 0
+        assert other_user_item.index == 0
+
+    def test_change_day_item_position_rebalances_in_background(
+        self, client: TestClient, test_db: Session, test_user, auth_headers
+    ):
+        day = dt.date(2026, 2, 2)
+        items = [PlannerDayItem(text=f'Item {i}', index=i * 2, day=day, user_id=test_user.id) for i in range(3)]
+        test_db.add_all(items)
+        test_db.commit()
+        item_ids = [item.id for item in items]
+        user_id = test_user.id
+
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/days/items/{item_ids[2]}/position/',
+            json={'after_item_id': item_ids[0]},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        # The gap is exhausted, so items are rebalanced by a background task after the response
+        test_db.expire_all()
+        ordered_items = PlannerDayItemService.get_items_by_day(test_db, day, user_id)
+        assert [item.id for item in ordered_items] == [item_ids[0], item_ids[2], item_ids[1]]
+        assert [item.index for item in ordered_items] == [0, PLANNER_ITEM_INDEX_STEP, 2 * PLANNER_ITEM_INDEX_STEP]
+
+    def test_change_day_item_position_not_found(self, client: TestClient, test_db: Session, test_user, auth_headers):
+        item = PlannerDayItem(text='Item', index=0, day=dt.date(2026, 2, 2), user_id=test_user.id)
+        test_db.add(item)
+        test_db.commit()
+
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/days/items/{item.id}/position/',
+            json={'after_item_id': 777},
+            headers=auth_headers
+        )
+        assert response.status_code == 404
+
+    def test_apply_day_items_batch(self, client: TestClient, test_db: Session, test_user, auth_headers):
+        day = dt.date(2026, 2, 2)
+        item = PlannerDayItem(text='Item', index=0, day=day, user_id=test_user.id)
+        test_db.add(item)
+        test_db.commit()
+        url = f'{settings.API_V1_STR}/planner/days/items/batch/'
+
+        response = client.post(url, json={'operations': [
+            {'op': 'create', 'day': day.isoformat(), 'text': f'Pasted {i}'} for i in range(10)
+        ] + [
+            {'op': 'update', 'item_id': item.id, 'state': 'completed'},
+            {'op': 'delete', 'item_id': 777},
+        ]}, headers=auth_headers)
+
+        assert response.status_code == 200
+        results = response.json()
+        assert len(results) == 12
+        assert [result['item']['text'] for result in results[:10]] == [f'Pasted {i}' for i in range(10)]
+        assert results[10] == {
+            'op': 'update',
+            'item_id': item.id,
+            'status': 'ok',
+            'item': {'id': item.id, 'day': day.isoformat(), 'text': 'Item', 'state': 'completed'},
+        }
+        assert results[11] == {'op': 'delete', 'item_id': 777, 'status': 'not_found', 'item': None}
+
+    @pytest.mark.parametrize('operations', [
+        [{'op': 'move', 'item_id': 1}],
+        [{'op': 'update', 'state': 'completed'}],
+        [{'op': 'delete', 'item_id': i} for i in range(PLANNER_BATCH_OPERATIONS_LIMIT + 1)],
+    ])
+    def test_apply_day_items_batch_invalid(self, client: TestClient, auth_headers, operations):
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/days/items/batch/', json={'operations': operations}, headers=auth_headers
+        )
+        assert response.status_code == 422
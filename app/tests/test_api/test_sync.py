@@ -0,0 +1,62 @@
+import datetime as dt
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.change_events import change_events
+from app.models.planner import PlannerDayItem
+
+
+class TestSyncAPI:
+    def test_get_changes(self, client: TestClient, test_db: Session, test_user, auth_headers, query_counter):
+        day = dt.date(2026, 2, 2)
+        test_db.add_all([PlannerDayItem(text=f'Item {i}', index=i, day=day, user_id=test_user.id) for i in range(50)])
+        test_db.commit()
+        url = f'{settings.API_V1_STR}/sync/changes/'
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data['is_full'] is True
+        assert len(data['planner_day_items']) == 50
+
+        response = client.post(
+            f'{settings.API_V1_STR}/planner/days/items/',
+            json={'day': day.isoformat(), 'text': 'New item'},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        new_item_id = response.json()['id']
+
+        query_counter.clear()
+        response = client.get(url, params={'since': data['change_seq']}, headers=auth_headers)
+        assert response.status_code == 200
+        # user sequence and one query per table, whatever the dataset size
+        assert len(query_counter) <= 7
+
+        changes = response.json()
+        assert changes['is_full'] is False
+        assert changes['change_seq'] > data['change_seq']
+        assert [item['id'] for item in changes['planner_day_items']] == [new_item_id]
+        assert changes['planner_day_items'][0]['is_deleted'] is False
+
+    def test_get_changes_invalid_since(self, client: TestClient, auth_headers):
+        response = client.get(f'{settings.API_V1_STR}/sync/changes/', params={'since': -1}, headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_get_change_events(self, client: TestClient, test_db: Session, test_user, auth_headers, monkeypatch):
+        monkeypatch.setattr(settings, 'SYNC_EVENTS_KEEPALIVE_SECONDS', 0.05)
+        monkeypatch.setattr(settings, 'SYNC_EVENTS_MAX_SECONDS', 0.2)
+        test_db.add(PlannerDayItem(text='Item', index=0, day=dt.date(2026, 2, 2), user_id=test_user.id))
+        test_db.commit()
+        test_db.refresh(test_user)
+
+        with client.stream('GET', f'{settings.API_V1_STR}/sync/events/', headers=auth_headers) as response:
+            assert response.status_code == 200
+            assert response.headers['content-type'].startswith('text/event-stream')
+            body = response.read().decode()
+
+        # current change_seq first, so the client can catch up, and keepalive comments after
+        assert body.startswith(f'event: changes\ndata: {{"change_seq": {test_user.change_seq}}}\n\n')
+        assert ': keepalive\n\n' in body
+        assert change_events.get_stats()['subscribers'] == 0
@@ -1,9 +1,11 @@
 import pytest
 from sqlalchemy.orm import Session
 
-from app.const.planner import PlannerItemState, PlannerAgendaType
+from app.const.planner import PlannerBatchStatus, PlannerItemState, PlannerAgendaType, PLANNER_ITEM_INDEX_STEP
 from app.models.planner import PlannerAgenda, PlannerAgendaItem
-from app.schemas.planner_agenda import PlannerAgendaItemCreateSchema, PlannerAgendaItemUpdateSchema
+from app.schemas.planner_agenda import (
+    AgendaItemsBatchSchema, PlannerAgendaItemCreateSchema, PlannerAgendaItemUpdateSchema,
+)
 from app.services.planner_agenda_item_service import PlannerAgendaItemService
 
 
@@ -41,13 +43,13 @@ class TestPlannerAgendaItemService:
         test_db.add(item)
         test_db.commit()
 
-        # Now new index should be 1
+        # Now new index should be placed after the existing one leaving a gap
         index = PlannerAgendaItemService.get_new_agenda_item_index(
             test_db,
             test_agenda.id,
             test_user.id
         )
-        assert index == 1
+        assert index == PLANNER_ITEM_INDEX_STEP
 
     def test_get_agenda_item(self, test_db: Session, test_user, test_agenda):
         # Create an item
@@ -128,6 +130,52 @@ class TestPlannerAgendaItemService:
         assert len(items) == 1
         assert items[0].id == item3.id
 
+    def test_get_items_for_agendas(self, test_db: Session, test_user, test_agenda, query_counter):
+        agenda2 = PlannerAgenda(
+            name='Test Agenda 2',
+            index=1,
+            agenda_type=PlannerAgendaType.CUSTOM,
+            user_id=test_user.id
+        )
+        empty_agenda = PlannerAgenda(
+            name='Empty Agenda',
+            index=2,
+            agenda_type=PlannerAgendaType.CUSTOM,
+            user_id=test_user.id
+        )
+        other_user_agenda = PlannerAgenda(
+            name='Other User Agenda',
+            index=0,
+            agenda_type=PlannerAgendaType.CUSTOM,
+            user_id=7
+        )
+        test_db.add_all([agenda2, empty_agenda, other_user_agenda])
+        test_db.commit()
+
+        item1 = PlannerAgendaItem(text='Item 1', index=1, user_id=test_user.id, agenda_id=test_agenda.id)
+        item2 = PlannerAgendaItem(text='Item 2', index=0, user_id=test_user.id, agenda_id=test_agenda.id)
+        item3 = PlannerAgendaItem(text='Item 3', index=0, user_id=test_user.id, agenda_id=agenda2.id)
+        deleted_item = PlannerAgendaItem(
+            text='Deleted Item', index=1, user_id=test_user.id, agenda_id=agenda2.id, is_deleted=True
+        )
+        other_user_item = PlannerAgendaItem(text='Other Item', index=0, user_id=7, agenda_id=other_user_agenda.id)
+        test_db.add_all([item1, item2, item3, deleted_item, other_user_item])
+        test_db.commit()
+
+        agenda_ids = [agenda2.id, test_agenda.id, empty_agenda.id, other_user_agenda.id, 777]
+        user_id = test_user.id
+        query_counter.clear()
+        items_by_agendas = PlannerAgendaItemService.get_items_for_agendas(test_db, agenda_ids, user_id)
+
+        # All agendas are loaded with a single query
+        assert len(query_counter) == 1
+
+        # Not existing and other users agendas are skipped, requested order is kept
+        assert list(items_by_agendas.keys()) == [agenda2.id, test_agenda.id, empty_agenda.id]
+        assert [item.id for item in items_by_agendas[test_agenda.id]] == [item2.id, item1.id]
+        assert [item.id for item in items_by_agendas[agenda2.id]] == [item3.id]
+        assert items_by_agendas[empty_agenda.id] == []
+
     def test_create_agenda_item(self, test_db: Session, test_user, test_agenda):
         # Create an item
         item_create = PlannerAgendaItemCreateSchema(
@@ -250,8 +298,34 @@ class TestPlannerAgendaItemService:
         db_item2 = test_db.query(PlannerAgendaItem).filter(PlannerAgendaItem.id == item2.id).first()
         db_item3 = test_db.query(PlannerAgendaItem).filter(PlannerAgendaItem.id == item3.id).first()
         assert db_item3.index == 0
-        assert db_item1.index == 1
-        assert db_item2.index == 2
+        assert db_item1.index == PLANNER_ITEM_INDEX_STEP
+        assert db_item2.index == 2 * PLANNER_ITEM_INDEX_STEP
+
+    def test_change_agenda_item_position(self, test_db: Session, test_user, test_agenda):
+        items = [
+            PlannerAgendaItem(
+                text=f'Item {i}', index=i * PLANNER_ITEM_INDEX_STEP, user_id=test_user.id, agenda_id=test_agenda.id
+            )
+            for i in range(3)
+        ]
+        test_db.add_all(items)
+        test_db.commit()
+        item_ids = [item.id for item in items]
+        user_id = test_user.id
+
+        # Move the first item to the end
+        db_item, needs_rebalance = PlannerAgendaItemService.change_agenda_item_position(
+            test_db, item_ids[0], item_ids[2], user_id
+        )
+        assert db_item.index == 3 * PLANNER_ITEM_INDEX_STEP
+        assert needs_rebalance is False
+
+        ordered_items = PlannerAgendaItemService.get_items_by_agendas(test_db, test_agenda.id, user_id)
+        assert [item.id for item in ordered_items] == [item_ids[1], item_ids[2], item_ids[0]]
+
+        # Not existing target item
+        db_item, _ = PlannerAgendaItemService.change_agenda_item_position(test_db, item_ids[0], 777, user_id)
+        assert db_item is None
 
     def test_delete_finished_agenda_items(self, test_db: Session, test_user, test_agenda):
         items = [
@@ -357,3 +431,56 @@ class TestPlannerAgendaItemService:
         texts_by_index = [ordered_item.text for ordered_item in ordered_items]
         assert texts_by_index == ['B', 'E', 'D', 'F', 'A', 'C']
         assert ordered_items[0].text == 'B' and ordered_items[1].text == 'E'
+
+    def test_apply_agenda_items_batch(self, test_db: Session, test_user, test_agenda, query_counter):
+        target_agenda = PlannerAgenda(
+            name='Target Agenda', index=1, agenda_type=PlannerAgendaType.CUSTOM, user_id=test_user.id
+        )
+        other_user_agenda = PlannerAgenda(name='Other', index=0, agenda_type=PlannerAgendaType.CUSTOM, user_id=7)
+        test_db.add_all([target_agenda, other_user_agenda])
+        test_db.commit()
+        items = [
+            PlannerAgendaItem(
+                text=f'Item {i}', index=i * PLANNER_ITEM_INDEX_STEP, agenda_id=test_agenda.id, user_id=test_user.id,
+                state=PlannerItemState.COMPLETED if i == 0 else PlannerItemState.TODO,
+            )
+            for i in range(30)
+        ]
+        test_db.add_all(items)
+        test_db.commit()
+        item_ids, user_id = [item.id for item in items], test_user.id
+        agenda_id, target_agenda_id, other_user_agenda_id = test_agenda.id, target_agenda.id, other_user_agenda.id
+
+        batch = AgendaItemsBatchSchema.model_validate({'operations': [
+            {'op': 'move', 'item_id': item_id, 'agenda_id': target_agenda_id} for item_id in item_ids[:25]
+        ] + [
+            {'op': 'copy', 'item_id': item_ids[25], 'agenda_id': target_agenda_id},
+            {'op': 'update', 'item_id': item_ids[26], 'text': 'Updated'},
+            {'op': 'delete', 'item_id': item_ids[27]},
+            {'op': 'create', 'agenda_id': agenda_id, 'text': 'New'},
+            {'op': 'move', 'item_id': item_ids[0], 'agenda_id': target_agenda_id},
+            {'op': 'create', 'agenda_id': other_user_agenda_id, 'text': 'Foreign'},
+            {'op': 'move', 'item_id': item_ids[28], 'agenda_id': other_user_agenda_id},
+        ]})
+
+        query_counter.clear()
+        results = PlannerAgendaItemService.apply_agenda_items_batch(test_db, batch.operations, user_id)
+
+        # items, agendas and new indexes, whatever the batch size, and one change sequence for the batch
+        assert len([statement for statement in query_counter if statement.startswith('SELECT')]) == 3
+        assert len([statement for statement in query_counter if statement.startswith('UPDATE users')]) == 1
+        assert [result['status'] for result in results] == (
+            [PlannerBatchStatus.OK] * 29 + [PlannerBatchStatus.NOT_FOUND] * 3
+        )
+        # moved item keeps its state and source id is reported
+        assert results[0]['item_id'] == item_ids[0]
+        assert results[0]['item'].agenda_id == target_agenda_id
+        assert results[0]['item'].state == PlannerItemState.COMPLETED
+        assert results[28]['item_id'] == results[28]['item'].id
+
+        target_items = PlannerAgendaItemService.get_items_for_agendas(test_db, [target_agenda_id], user_id)
+        target_items = target_items[target_agenda_id]
+        assert [item.text for item in target_items] == [f'Item {i}' for i in range(26)]
+        assert [item.index for item in target_items] == [i * PLANNER_ITEM_INDEX_STEP for i in range(26)]
+        source_items = PlannerAgendaItemService.get_items_for_agendas(test_db, [agenda_id], user_id)[agenda_id]
+        assert [item.text for item in source_items] == ['Item 25', 'Updated', 'Item 28', 'Item 29', 'New']
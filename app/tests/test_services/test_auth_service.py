@@ -6,7 +6,12 @@ from app.const.auth import SIGNING_ALGORITHM, TokenType
 from app.core.config import settings
 from app.models.user import User
 from app.services.auth_service import AuthService
+from app.schemas.auth import TokenUserSchema
+from app.schemas.user import UserSchema
+from app.services import user_cache as user_cache_module
 from app.services.auth_utils import create_access_token, create_refresh_token, generate_password_hash
+from app.services.user_cache import user_cache
+from app.services.user_service import UserService
 from app.tests.const import TEST_USERNAME, TEST_EMAIL, TEST_PASSWORD
 
 
@@ -173,3 +178,109 @@ class TestAuthService:
         # Check that the exception is an HTTPException with status code 401
         assert excinfo.value.status_code == 401
         assert 'Could not validate credentials' in excinfo.value.detail
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_async_get_current_user(self, test_async_db):
+        user = User(
+            username=TEST_USERNAME,
+            email=TEST_EMAIL,
+            hashed_password=generate_password_hash(TEST_PASSWORD),
+            is_active=True,
+        )
+        test_async_db.add(user)
+        await test_async_db.commit()
+
+        current_user = await AuthService.async_get_current_user(
+            create_access_token({'sub': user.id}), test_async_db
+        )
+        assert current_user.id == user.id
+
+        # Soft deleted users are not authenticated once the cache entry is gone
+        user.mark_as_deleted()
+        await test_async_db.commit()
+        user_cache.invalidate(user.id)
+        with pytest.raises(Exception) as excinfo:
+            await AuthService.async_get_current_user(create_access_token({'sub': user.id}), test_async_db)
+        assert excinfo.value.status_code == 401
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_get_current_user_cached(self, test_db, test_user, query_counter):
+        token = create_access_token({'sub': str(test_user.id)})
+        user_id = test_user.id
+
+        user = await AuthService.get_current_user(token, test_db)
+        assert isinstance(user, UserSchema)
+        assert user.id == user_id
+
+        # Second lookup is served from the cache without touching the db
+        query_counter.clear()
+        assert (await AuthService.get_current_user(token, test_db)).id == user_id
+        assert len(query_counter) == 0
+
+        stats = user_cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_get_current_user_cache_ttl(self, test_db, test_user, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(user_cache_module.time, 'monotonic', lambda: now)
+        token = create_access_token({'sub': str(test_user.id)})
+        await AuthService.get_current_user(token, test_db)
+
+        # Deactivated user is still served from the cache until the entry expires
+        test_user.is_active = False
+        test_db.commit()
+        assert (await AuthService.get_current_user(token, test_db)).id == test_user.id
+
+        now += settings.USER_CACHE_TTL_SECONDS
+        with pytest.raises(Exception) as excinfo:
+            await AuthService.get_current_user(token, test_db)
+        assert excinfo.value.status_code == 401
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_get_current_user_cache_deleted_user(self, test_db, test_user, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(user_cache_module.time, 'monotonic', lambda: now)
+        token = create_access_token({'sub': str(test_user.id)})
+        await AuthService.get_current_user(token, test_db)
+
+        test_user.mark_as_deleted()
+        test_db.commit()
+
+        now += settings.USER_CACHE_TTL_SECONDS
+        with pytest.raises(Exception) as excinfo:
+            await AuthService.get_current_user(token, test_db)
+        assert excinfo.value.status_code == 401
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_get_current_user_cache_invalidated_on_update(self, test_db, test_user):
+        token = create_access_token({'sub': str(test_user.id)})
+        await AuthService.get_current_user(token, test_db)
+
+        UserService.change_password(test_db, test_user.id, TEST_PASSWORD, 'new_password')
+        assert user_cache.get(test_user.id) is None
+
+        await AuthService.get_current_user(token, test_db)
+        assert user_cache.get(test_user.id) is not None
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_get_current_user_readonly_stateless(self, test_db, test_user, query_counter, monkeypatch):
+        token = create_access_token({'sub': str(test_user.id)})
+        user_id = test_user.id
+
+        user = await AuthService.get_current_user_readonly(token, test_db)
+        assert isinstance(user, UserSchema)
+
+        monkeypatch.setattr(settings, 'AUTH_STATELESS_READS', True)
+        user_cache.clear()
+        query_counter.clear()
+        user = await AuthService.get_current_user_readonly(token, test_db)
+        assert user == TokenUserSchema(id=user_id)
+        assert len(query_counter) == 0
@@ -1,7 +1,12 @@
+import datetime as dt
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.models.planner import PlannerDayItem
 from app.models.user import User
 from app.services.base_service import BaseService
+from app.services.planner_day_service import PlannerDayItemService
 from app.tests.const import TEST_USERNAME, TEST_EMAIL
 
 
@@ -49,3 +54,36 @@ class TestBaseServiceFunctionality:
         assert created
         assert result.username == username
         assert result.email == email
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_async_get_or_create(self, test_async_db: AsyncSession):
+        username = 'new_user'
+        email = 'new@example.com'
+
+        result, created = await UserTestService.async_get_or_create(
+            test_async_db,
+            username=username,
+            defaults={'email': email, 'hashed_password': 'hashed'}
+        )
+        assert created
+        assert result.username == username
+
+        existing, created = await UserTestService.async_get_or_create(test_async_db, username=username)
+        assert not created
+        assert existing.id == result.id
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_async_get_existing_ids(self, test_async_db: AsyncSession):
+        day = dt.date(2026, 2, 2)
+        item = PlannerDayItem(text='Item', index=0, day=day, user_id=1)
+        deleted_item = PlannerDayItem(text='Deleted', index=0, day=day, user_id=1, is_deleted=True)
+        other_user_item = PlannerDayItem(text='Other', index=0, day=day, user_id=2)
+        test_async_db.add_all([item, deleted_item, other_user_item])
+        await test_async_db.commit()
+
+        existing_ids = await PlannerDayItemService.async_get_existing_ids(
+            test_async_db, [item.id, deleted_item.id, other_user_item.id, 777], user_id=1
+        )
+        assert existing_ids == {item.id}
@@ -0,0 +1,174 @@
+import asyncio
+import datetime as dt
+import json
+import socket
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.schemas.planner_day import PlannerDayItemCreateSchema
+from app.services.change_events import (
+    CHANGE_EVENTS_CHANNEL, ChangeEventsBroker, PostgresNotifyBackend, change_events,
+)
+from app.services.planner_day_service import PlannerDayItemService
+
+
+class FakeNotifyConnection:
+    """ Local stand-in for a psycopg2 connection, notify() makes the socket readable like a NOTIFY does """
+    def __init__(self, server: 'FakeNotifyServer'):
+        self.server = server
+        self.autocommit = False
+        self.closed = 0
+        self.notifies = []
+        self._reader, self._writer = socket.socketpair()
+
+    def fileno(self) -> int:
+        return self._reader.fileno()
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def execute(self, statement, params=None):
+                if statement.startswith('LISTEN'):
+                    connection.server.listeners.append(connection)
+
+        return Cursor()
+
+    def notify(self, channel: str, payload: str) -> None:
+        self.notifies.append(SimpleNamespace(channel=channel, payload=payload))
+        self._writer.send(b'\0')
+
+    def poll(self) -> None:
+        self._reader.recv(1024)
+
+    def close(self) -> None:
+        self.closed = 1
+        self._reader.close()
+        self._writer.close()
+
+
+class FakeNotifyServer:
+    def __init__(self):
+        self.listeners: list[FakeNotifyConnection] = []
+
+    def connect(self) -> FakeNotifyConnection:
+        return FakeNotifyConnection(self)
+
+    def notify(self, channel: str, payload: str) -> None:
+        for listener in self.listeners:
+            listener.notify(channel, payload)
+
+
+class TestChangeEvents:
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_publish_from_thread(self, anyio_backend):
+        broker = ChangeEventsBroker(queue_size=4)
+        queue = broker.subscribe(1)
+        other_queue = broker.subscribe(2)
+
+        thread = threading.Thread(target=broker.publish, args=(1, {'change_seq': 5}))
+        thread.start()
+        thread.join()
+
+        assert await asyncio.wait_for(queue.get(), timeout=1) == {'change_seq': 5}
+        assert other_queue.empty()
+        assert broker.get_stats()['delivered'] == 1
+
+        broker.unsubscribe(1, queue)
+        broker.publish(1, {'change_seq': 6})
+        assert broker.get_stats()['subscribers'] == 1
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_full_queue_drops_oldest_event(self, anyio_backend):
+        broker = ChangeEventsBroker(queue_size=2)
+        queue = broker.subscribe(1)
+        for change_seq in range(1, 5):
+            broker.publish(1, {'change_seq': change_seq})
+        await asyncio.sleep(0)
+
+        assert [queue.get_nowait()['change_seq'] for _ in range(queue.qsize())] == [3, 4]
+        assert broker.get_stats()['dropped'] == 2
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_iter_events(self, anyio_backend):
+        broker = ChangeEventsBroker(queue_size=4)
+        queue = broker.subscribe(1)
+        broker.publish(1, {'change_seq': 2})
+
+        events = [
+            event async for event in broker.iter_events(
+                1, queue, first_event={'change_seq': 1}, keepalive=0.05, max_seconds=0.12
+            )
+        ]
+        assert events[:2] == [
+            'event: changes\ndata: {"change_seq": 1}\n\n',
+            'event: changes\ndata: {"change_seq": 2}\n\n',
+        ]
+        assert events[2:] and all(event == ': keepalive\n\n' for event in events[2:])
+        assert broker.get_stats()['subscribers'] == 0
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_published_on_commit(self, anyio_backend, test_db: Session, test_user):
+        user_id = test_user.id
+        queue = change_events.subscribe(user_id)
+        try:
+            item = PlannerDayItemService.create_day_item(
+                test_db, PlannerDayItemCreateSchema(day=dt.date(2026, 2, 2), text='Item'), user_id=user_id
+            )
+            event = await asyncio.wait_for(queue.get(), timeout=1)
+            assert event == {'change_seq': item.change_seq}
+
+            # nothing is published for rolled back changes
+            item.text = 'Rolled back'
+            test_db.flush()
+            test_db.rollback()
+            await asyncio.sleep(0)
+            assert queue.empty()
+        finally:
+            change_events.unsubscribe(user_id, queue)
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize('anyio_backend', ['asyncio'])
+    async def test_postgres_notify_backend(
+        self, anyio_backend, test_db: Session, test_user, query_counter, monkeypatch
+    ):
+        server = FakeNotifyServer()
+        backend = PostgresNotifyBackend(connect=server.connect, deliver=change_events.deliver, poll_timeout=0.05)
+        monkeypatch.setattr(change_events, 'backend', backend)
+        # SQLite stand-in for pg_notify, called on the session connection like on Postgres
+        test_db.connection().connection.driver_connection.create_function('pg_notify', 2, server.notify)
+        user_id = test_user.id
+        queue = change_events.subscribe(user_id)
+        try:
+            while not server.listeners:
+                await asyncio.sleep(0.01)
+
+            # events are published within the transaction of the change, so subscribers of other workers get them
+            query_counter.clear()
+            item = PlannerDayItemService.create_day_item(
+                test_db, PlannerDayItemCreateSchema(day=dt.date(2026, 2, 2), text='Item'), user_id=user_id
+            )
+            assert any('pg_notify' in statement for statement in query_counter)
+            assert await asyncio.wait_for(queue.get(), timeout=1) == {'change_seq': item.change_seq}
+
+            server.notify(CHANGE_EVENTS_CHANNEL, json.dumps({'user_id': user_id + 1, 'change_seq': 8}))
+            server.notify(CHANGE_EVENTS_CHANNEL, 'not json')
+            server.notify(CHANGE_EVENTS_CHANNEL, json.dumps({'user_id': user_id, 'change_seq': 9}))
+            assert await asyncio.wait_for(queue.get(), timeout=1) == {'change_seq': 9}
+            assert queue.empty()
+        finally:
+            change_events.unsubscribe(user_id, queue)
+            backend.stop()
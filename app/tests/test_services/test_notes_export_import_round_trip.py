@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 
 from app.const.notes import ExportType
+from app.models.notes import Note
 from app.schemas.notes import NoteCreateSchema
 from app.schemas.notes_folders import NotesFolderCreateSchema
 from app.services.notes_export_service import NotesExportService
@@ -41,7 +42,7 @@ class TestNotesExportImportRoundTrip:
         assert imported_note is not None
         assert imported_note.title == title
         # ExportService adds <h1>Title</h1> to the body for HTML.
-        # ImportService._parse_html extracts <h1> and REMOVES it from the body IF there is no <title> tag.
+        # parse_html extracts <h1> and REMOVES it from the body IF there is no <title> tag.
         # NotesExportService.export_single_note doesn't add <title> or <body> tags, it just concatenates.
         assert imported_note.body.strip() == body.strip()
 
@@ -255,17 +256,20 @@ class TestNotesExportImportRoundTrip:
         )
 
         # 2. Export the parent folder to HTML ZIP
-        zip_buffer, filename = NotesExportService.export_folder(
+        zip_chunks, filename = NotesExportService.export_folder(
             test_db, user_id=test_user.id, folder_id=parent.id, export_type=ExportType.HTML
         )
         
         # 3. Import the ZIP back
         import_root = NotesFolderService.get_root_folder(test_db, test_user.id)
-        imported_notes = NotesImportService.import_zip(
-            test_db, test_user.id, zip_buffer.getvalue(), import_root.id
+        exported_notes_ids = {note.id for note in test_db.query(Note)}
+        result = NotesImportService.import_zip(
+            test_db, test_user.id, b''.join(zip_chunks), import_root.id
         )
 
         # 4. Verify structure
+        assert result.created == 2
+        imported_notes = test_db.query(Note).filter(Note.id.not_in(exported_notes_ids)).all()
         assert len(imported_notes) == 2
         
         # Find imported notes
@@ -295,13 +299,16 @@ class TestNotesExportImportRoundTrip:
         )
 
         # 2. Export folder to HTML ZIP
-        zip_buffer, _ = NotesExportService.export_folder(test_db, test_user.id, folder.id, ExportType.HTML)
+        zip_chunks, _ = NotesExportService.export_folder(test_db, test_user.id, folder.id, ExportType.HTML)
 
         # 3. Import back
         import_root = NotesFolderService.get_root_folder(test_db, test_user.id)
-        imported_notes = NotesImportService.import_zip(test_db, test_user.id, zip_buffer.getvalue(), import_root.id)
+        exported_notes_ids = {note.id for note in test_db.query(Note)}
+        result = NotesImportService.import_zip(test_db, test_user.id, b''.join(zip_chunks), import_root.id)
 
         # 4. Verify
+        assert result.created == 2
+        imported_notes = test_db.query(Note).filter(Note.id.not_in(exported_notes_ids)).all()
         assert len(imported_notes) == 2
         # Both will be "Duplicate" because ImportService extracts title from <h1> in the body,
         # which is the original title. ZIP filename is only used as fallback.
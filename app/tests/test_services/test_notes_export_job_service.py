@@ -0,0 +1,190 @@
+import datetime as dt
+import os
+import stat
+import zipfile
+from sqlalchemy.orm import Session
+
+from app.const.notes import ExportJobStatus, ExportTarget, ExportType
+from app.core.config import settings
+from app.core.db_utils import run_in_new_session
+from app.models.notes import NotesExportJob
+from app.schemas.notes import NoteCreateSchema
+from app.schemas.notes_export import NotesExportJobCreateSchema
+from app.schemas.notes_folders import NotesFolderCreateSchema
+from app.services import notes_export_job_service
+from app.services.notes_export_job_service import NotesExportJobService
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_service import NoteService
+
+
+class TestNotesExportJobService:
+    def test_submit_job(self, test_db: Session, test_user, export_jobs_dir, monkeypatch):
+        monkeypatch.setattr(notes_export_job_service, 'EXPORT_JOB_PROGRESS_STEP', 2)
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        for i in range(5):
+            NoteService.create_note(
+                test_db,
+                user_id=test_user.id,
+                create_data=NoteCreateSchema(title=f'Note {i}', body='Body', folder_id=root_folder.id)
+            )
+        job = NotesExportJobService.create_job(
+            test_db,
+            user_id=test_user.id,
+            create_data=NotesExportJobCreateSchema(export_type=ExportType.HTML, export_target=ExportTarget.ALL_NOTES)
+        )
+        assert job.status == ExportJobStatus.PENDING
+
+        # worker thread builds the archive on disk
+        NotesExportJobService.submit_job(test_db.get_bind(), job.id).result(timeout=10)
+
+        test_db.refresh(job)
+        assert job.status == ExportJobStatus.COMPLETED
+        assert job.notes_total == 5
+        assert job.notes_done == 5
+        assert job.file_path.startswith(str(export_jobs_dir))
+        # archives are readable only by the app user
+        assert stat.S_IMODE(os.stat(job.file_path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(export_jobs_dir).st_mode) == 0o700
+        with zipfile.ZipFile(job.file_path) as zf:
+            assert len(zf.namelist()) == 5
+
+        # already finished jobs are not run again
+        NotesExportJobService.run_job(test_db.get_bind(), job.id)
+        test_db.refresh(job)
+        assert job.status == ExportJobStatus.COMPLETED
+
+    def test_run_job_failed(self, test_db: Session, test_user, export_jobs_dir):
+        folder = NotesFolderService.create_folder(
+            test_db, user_id=test_user.id, create_data=NotesFolderCreateSchema(name='Folder')
+        )
+        job = NotesExportJobService.create_job(
+            test_db,
+            user_id=test_user.id,
+            create_data=NotesExportJobCreateSchema(
+                export_type=ExportType.HTML, export_target=ExportTarget.FOLDER_NOTES, export_target_id=folder.id
+            )
+        )
+        # folder is deleted before the worker picks the job
+        NotesFolderService.delete_folder(test_db, folder_id=folder.id, user_id=test_user.id)
+
+        NotesExportJobService.run_job(test_db.get_bind(), job.id)
+
+        test_db.refresh(job)
+        assert job.status == ExportJobStatus.FAILED
+        assert job.error
+        assert job.file_path is None
+        assert list(export_jobs_dir.iterdir()) == []
+
+    def test_cleanup_expired_jobs(self, test_db: Session, test_user, export_jobs_dir):
+        file_path = export_jobs_dir / 'archive.zip'
+        with zipfile.ZipFile(file_path, 'w') as zf:
+            zf.writestr('note.html', 'Note')
+        job = NotesExportJob(
+            user_id=test_user.id,
+            export_type=ExportType.HTML,
+            export_target=ExportTarget.ALL_NOTES,
+            status=ExportJobStatus.COMPLETED,
+            file_path=str(file_path),
+            expires_dt=dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=1),
+        )
+        test_db.add(job)
+        test_db.commit()
+
+        assert NotesExportJobService.cleanup_expired_jobs(test_db) == 1
+        test_db.refresh(job)
+        assert job.status == ExportJobStatus.EXPIRED
+        assert job.file_path is None
+        assert not file_path.exists()
+
+    def test_maintain_jobs(self, test_db: Session, test_user, export_jobs_dir):
+        file_path = export_jobs_dir / 'archive.zip'
+        file_path.write_bytes(b'archive')
+        expired_job, stale_job = [
+            NotesExportJob(
+                user_id=test_user.id,
+                export_type=ExportType.HTML,
+                export_target=ExportTarget.ALL_NOTES,
+                status=status,
+                **fields,
+            )
+            for status, fields in (
+                (ExportJobStatus.COMPLETED, {
+                    'file_path': str(file_path),
+                    'expires_dt': dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=1),
+                }),
+                (ExportJobStatus.RUNNING, {
+                    'updated_dt': dt.datetime.now(dt.timezone.utc) - dt.timedelta(
+                        minutes=settings.EXPORT_JOB_STALE_MINUTES + 1
+                    ),
+                }),
+            )
+        ]
+        test_db.add_all([expired_job, stale_job])
+        test_db.commit()
+
+        run_in_new_session(test_db.get_bind(), NotesExportJobService.maintain_jobs)
+        test_db.refresh(expired_job)
+        test_db.refresh(stale_job)
+        assert (expired_job.status, stale_job.status) == (ExportJobStatus.EXPIRED, ExportJobStatus.FAILED)
+        assert not file_path.exists()
+
+    def test_fail_stale_jobs(self, test_db: Session, test_user):
+        jobs = [
+            NotesExportJob(
+                user_id=test_user.id,
+                export_type=ExportType.HTML,
+                export_target=ExportTarget.ALL_NOTES,
+                status=ExportJobStatus.RUNNING,
+                updated_dt=dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=updated_minutes_ago),
+            )
+            for updated_minutes_ago in (settings.EXPORT_JOB_STALE_MINUTES + 1, 1)
+        ]
+        test_db.add_all(jobs)
+        test_db.commit()
+
+        # called periodically, so jobs interrupted after startup don't stay running
+        assert NotesExportJobService.fail_stale_jobs(test_db) == 1
+        test_db.commit()
+        for job in jobs:
+            test_db.refresh(job)
+        assert [job.status for job in jobs] == [ExportJobStatus.FAILED, ExportJobStatus.RUNNING]
+
+    def test_resume_jobs(self, test_db: Session, test_user, export_jobs_dir):
+        def add_job(status: ExportJobStatus, updated_minutes_ago: int) -> NotesExportJob:
+            job = NotesExportJob(
+                user_id=test_user.id,
+                export_type=ExportType.HTML,
+                export_target=ExportTarget.ALL_NOTES,
+                status=status,
+                updated_dt=dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=updated_minutes_ago),
+            )
+            test_db.add(job)
+            test_db.commit()
+            return job
+
+        stale_job = add_job(ExportJobStatus.RUNNING, settings.EXPORT_JOB_STALE_MINUTES + 1)
+        running_job = add_job(ExportJobStatus.RUNNING, 1)
+        pending_job = add_job(ExportJobStatus.PENDING, settings.EXPORT_JOB_STALE_MINUTES + 1)
+        NoteService.create_note(
+            test_db,
+            user_id=test_user.id,
+            create_data=NoteCreateSchema(
+                title='Note', body='Body', folder_id=NotesFolderService.get_root_folder(test_db, test_user.id).id
+            )
+        )
+
+        for future in NotesExportJobService.resume_jobs(test_db.get_bind()):
+            future.result(timeout=10)
+
+        for job in (stale_job, running_job, pending_job):
+            test_db.refresh(job)
+        assert stale_job.status == ExportJobStatus.FAILED
+        assert stale_job.error
+        # jobs with recent progress can be run by another API worker
+        assert running_job.status == ExportJobStatus.RUNNING
+        assert pending_job.status == ExportJobStatus.COMPLETED
+
+        # resubmitted job which was already claimed is not run again
+        NotesExportJobService.run_job(test_db.get_bind(), pending_job.id)
+        test_db.refresh(pending_job)
+        assert pending_job.status == ExportJobStatus.COMPLETED
@@ -1,3 +1,6 @@
+import io
+import secrets
+import tracemalloc
 import zipfile
 from sqlalchemy.orm import Session
 
@@ -53,13 +56,13 @@ class TestNotesExportService:
             test_db, user_id=test_user.id, create_data=NoteCreateSchema(title='Note 1', body='B1', folder_id=folder.id)
         )
         
-        zip_buffer, filename = NotesExportService.export_folder(
+        zip_chunks, filename = NotesExportService.export_folder(
             test_db, user_id=test_user.id, folder_id=folder.id, export_type=ExportType.HTML
         )
-        assert zip_buffer is not None
+        assert zip_chunks is not None
         assert filename == 'notes_folder_Folder.zip'
         
-        with zipfile.ZipFile(zip_buffer) as zf:
+        with zipfile.ZipFile(io.BytesIO(b''.join(zip_chunks))) as zf:
             assert 'Note 1.html' in zf.namelist()
 
     def test_export_all_notes(self, test_db: Session, test_user):
@@ -70,13 +73,13 @@ class TestNotesExportService:
             create_data=NoteCreateSchema(title='Note 1', body='B1', folder_id=root_folder.id)
         )
         
-        zip_buffer, filename = NotesExportService.export_all_notes(
+        zip_chunks, filename = NotesExportService.export_all_notes(
             test_db, user_id=test_user.id, export_type=ExportType.HTML
         )
-        assert zip_buffer is not None
+        assert zip_chunks is not None
         assert filename == 'all_notes.zip'
         
-        with zipfile.ZipFile(zip_buffer) as zf:
+        with zipfile.ZipFile(io.BytesIO(b''.join(zip_chunks))) as zf:
             assert 'Note 1.html' in zf.namelist()
 
     def test_export_folder_recursive(self, test_db: Session, test_user):
@@ -108,11 +111,11 @@ class TestNotesExportService:
         deleted_note.is_deleted = True
         test_db.commit()
 
-        zip_buffer, filename = NotesExportService.export_folder(
+        zip_chunks, filename = NotesExportService.export_folder(
             test_db, user_id=test_user.id, folder_id=folder.id, export_type=ExportType.HTML
         )
-        assert zip_buffer is not None
-        with zipfile.ZipFile(zip_buffer) as zf:
+        assert zip_chunks is not None
+        with zipfile.ZipFile(io.BytesIO(b''.join(zip_chunks))) as zf:
             filenames = zf.namelist()
             assert 'Note 1.html' in filenames
             assert 'Child/Note 2.html' in filenames
@@ -141,15 +144,46 @@ class TestNotesExportService:
         subfolder.is_deleted = True
         test_db.commit()
 
-        zip_buffer, filename = NotesExportService.export_folder(
+        zip_chunks, filename = NotesExportService.export_folder(
             test_db, user_id=test_user.id, folder_id=folder.id, export_type=ExportType.HTML
         )
-        assert zip_buffer is not None
-        with zipfile.ZipFile(zip_buffer) as zf:
+        assert zip_chunks is not None
+        with zipfile.ZipFile(io.BytesIO(b''.join(zip_chunks))) as zf:
             filenames = zf.namelist()
             assert 'Note 1.html' in filenames
             assert 'Deleted Child/Note 2.html' not in filenames
 
+    def test_export_folder_deep_tree_queries(self, test_db: Session, test_user, query_counter):
+        parent_id = None
+        folder_ids = []
+        for depth in range(5):
+            folder = NotesFolderService.create_folder(
+                test_db,
+                user_id=test_user.id,
+                create_data=NotesFolderCreateSchema(name=f'Level {depth}', parent_id=parent_id)
+            )
+            NoteService.create_note(
+                test_db,
+                user_id=test_user.id,
+                create_data=NoteCreateSchema(title=f'Note {depth}', body='Body', folder_id=folder.id)
+            )
+            parent_id = folder.id
+            folder_ids.append(folder.id)
+        user_id = test_user.id
+
+        query_counter.clear()
+        zip_chunks, _ = NotesExportService.export_folder(
+            test_db, user_id=user_id, folder_id=folder_ids[0], export_type=ExportType.HTML
+        )
+        with zipfile.ZipFile(io.BytesIO(b''.join(zip_chunks))) as zf:
+            assert 'Level 1/Level 2/Level 3/Level 4/Note 4.html' in zf.namelist()
+
+        # folder, folders tree and notes, whatever the tree depth
+        assert len(query_counter) == 3
+        notes_query = query_counter[-1]
+        assert 'notes.body' in notes_query
+        assert 'notes.created_dt' not in notes_query
+
     def test_export_zip_duplicate_filenames(self, test_db: Session, test_user):
         folder = NotesFolderService.create_folder(
             test_db, user_id=test_user.id, create_data=NotesFolderCreateSchema(name='Duplicates')
@@ -166,10 +200,10 @@ class TestNotesExportService:
             create_data=NoteCreateSchema(title='Duplicate', body='B2', folder_id=folder.id)
         )
 
-        zip_buffer, filename = NotesExportService.export_folder(
+        zip_chunks, filename = NotesExportService.export_folder(
             test_db, user_id=test_user.id, folder_id=folder.id, export_type=ExportType.HTML
         )
-        with zipfile.ZipFile(zip_buffer) as zf:
+        with zipfile.ZipFile(io.BytesIO(b''.join(zip_chunks))) as zf:
             filenames = zf.namelist()
             assert 'Duplicate.html' in filenames
             assert 'Duplicate_1.html' in filenames
@@ -194,3 +228,27 @@ class TestNotesExportService:
         assert isinstance(content, bytes)
         assert content.startswith(b'%PDF')
         assert filename == 'Test PDF.pdf'
+
+    def test_create_zip_archive_memory(self):
+        notes_count = 10000
+
+        def generate_notes():
+            for i in range(notes_count):
+                # random bodies are poorly compressible, so the archive is much larger than a single note
+                yield Note(id=i, title=f'Note {i}', body=f'<p>{secrets.token_hex(4096)}</p>')
+
+        archive_size = 0
+        chunks_count = 0
+        tracemalloc.start()
+        try:
+            for chunk in NotesExportService._create_zip_archive(generate_notes(), ExportType.HTML):
+                archive_size += len(chunk)
+                chunks_count += 1
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert chunks_count > notes_count
+        assert archive_size > 40 * 1024 * 1024
+        # only ZIP central directory entries are kept until the end, not the notes content
+        assert peak_memory < archive_size / 4
@@ -41,12 +41,11 @@ class TestNotesFolderService:
         assert 'root_folder' in data
         assert 'trash_folder' in data
         
-        assert data['root_folder'].folder_type == NotesFolderType.ROOT
-        assert data['trash_folder'].folder_type == NotesFolderType.TRASH
+        assert data['root_folder']['folder_type'] == NotesFolderType.ROOT
+        assert data['trash_folder']['folder_type'] == NotesFolderType.TRASH
         
-        test_db.refresh(data['root_folder'])
-        assert len(data['root_folder'].subfolders) == 1
-        assert data['root_folder'].subfolders[0].name == regular_folder.name
+        assert len(data['root_folder']['subfolders']) == 1
+        assert data['root_folder']['subfolders'][0]['name'] == regular_folder.name
 
     def test_empty_trash(self, test_db: Session, test_user):
         trash_folder = NotesFolderService.get_trash_folder(test_db, user_id=test_user.id)
@@ -68,6 +67,108 @@ class TestNotesFolderService:
         assert folder.is_deleted
         assert note.is_deleted
 
+    def test_get_folders_tree(self, test_db: Session, test_user, query_counter):
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        parent_id = root_folder.id
+        for depth in range(5):
+            folder = NotesFolderService.create_folder(
+                test_db,
+                user_id=test_user.id,
+                create_data=NotesFolderCreateSchema(name=f'Level {depth}', parent_id=parent_id)
+            )
+            NoteService.create_note(
+                test_db,
+                user_id=test_user.id,
+                create_data=NoteCreateSchema(title=f'Note {depth}', body='Body', folder_id=folder.id)
+            )
+            parent_id = folder.id
+
+        deleted_folder = NotesFolderService.create_folder(
+            test_db,
+            user_id=test_user.id,
+            create_data=NotesFolderCreateSchema(name='Deleted', parent_id=root_folder.id)
+        )
+        NotesFolderService.delete_folder(test_db, folder_id=deleted_folder.id, user_id=test_user.id)
+        deleted_note = NoteService.create_note(
+            test_db,
+            user_id=test_user.id,
+            create_data=NoteCreateSchema(title='Deleted', body='Body', folder_id=root_folder.id)
+        )
+        NoteService.delete_note(test_db, note_id=deleted_note.id, user_id=test_user.id)
+        root_folder_id, user_id = root_folder.id, test_user.id
+
+        query_counter.clear()
+        tree = NotesFolderService.get_folders_tree(test_db, [root_folder_id], user_id)
+
+        # folders and notes, whatever the tree depth
+        assert len(query_counter) == 2
+        assert 'WITH RECURSIVE' in query_counter[0]
+
+        folder = tree[root_folder_id]
+        assert folder['notes'] == []
+        for depth in range(5):
+            assert [subfolder['name'] for subfolder in folder['subfolders']] == [f'Level {depth}']
+            folder = folder['subfolders'][0]
+            assert [note['title'] for note in folder['notes']] == [f'Note {depth}']
+        assert folder['subfolders'] == []
+
+    def test_get_folders_skips_note_bodies(self, test_db: Session, test_user, query_counter, fetched_bytes):
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        NotesFolderService.get_trash_folder(test_db, user_id=test_user.id)
+        body = '<p>Body</p>' * 10_000
+        for i in range(10):
+            NoteService.create_note(
+                test_db,
+                user_id=test_user.id,
+                create_data=NoteCreateSchema(title=f'Note {i}', body=body, folder_id=root_folder.id)
+            )
+        user_id = test_user.id
+
+        query_counter.clear()
+        fetched_bytes.clear()
+        folders = NotesFolderService.get_folders(test_db, user_id=user_id)
+
+        assert len(folders['root_folder']['notes']) == 10
+        assert 'body' not in folders['root_folder']['notes'][0]
+        assert not any('notes.body' in statement for statement in query_counter)
+        # ids, titles and dates only, bodies alone take 10 * 110KB
+        assert sum(size for _, size in fetched_bytes) < 2048
+
+    def test_empty_trash_nested(self, test_db: Session, test_user, query_counter):
+        trash_folder = NotesFolderService.get_trash_folder(test_db, user_id=test_user.id)
+        parent_id = trash_folder.id
+        folders, notes = [], []
+        for depth in range(3):
+            folder = NotesFolderService.create_folder(
+                test_db,
+                user_id=test_user.id,
+                create_data=NotesFolderCreateSchema(name=f'Level {depth}', parent_id=parent_id)
+            )
+            notes.append(NoteService.create_note(
+                test_db,
+                user_id=test_user.id,
+                create_data=NoteCreateSchema(title=f'Note {depth}', body='Body', folder_id=folder.id)
+            ))
+            folders.append(folder)
+            parent_id = folder.id
+        trash_note = NoteService.create_note(
+            test_db,
+            user_id=test_user.id,
+            create_data=NoteCreateSchema(title='Trash note', body='Body', folder_id=trash_folder.id)
+        )
+        user_id = test_user.id
+
+        query_counter.clear()
+        NotesFolderService.empty_trash(test_db, user_id=user_id)
+        # trash folder, subtree, change sequence and a bulk update of notes and folders, whatever the tree depth
+        assert len(query_counter) == 5
+
+        for item in folders + notes + [trash_note]:
+            test_db.refresh(item)
+            assert item.is_deleted
+        test_db.refresh(trash_folder)
+        assert not trash_folder.is_deleted
+
     def test_is_subfolder_of(self, test_db: Session, test_user):
         # Create folder A
         folder_a = NotesFolderService.create_folder(
@@ -1,46 +1,61 @@
 import io
+import secrets
+import tempfile
+import tracemalloc
 import zipfile
 from sqlalchemy.orm import Session
 
+from app.const.notes import IMPORT_NOTES_BATCH_SIZE, IMPORT_PATH_MAX_LENGTH
+from app.models.notes import Note, NotesFolder, NotesImportFingerprint
+from app.schemas.notes_folders import NotesFolderUpdateSchema
 from app.services.notes_folders_service import NotesFolderService
 from app.services.notes_import_service import NotesImportService
+from app.services.notes_parser import parse_html, parse_markdown, parse_txt
+
+
+def make_zip(files: dict[str, str]) -> bytes:
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for path, content in files.items():
+            zip_file.writestr(path, content)
+    return zip_buffer.getvalue()
 
 
 class TestNotesImportService:
     def test_parse_txt(self):
-        title, body = NotesImportService._parse_txt('Hello World', 'test.txt')
+        title, body = parse_txt('Hello World', 'test.txt')
         assert title == 'test'
         assert body == '<p>Hello World</p>'
 
     def test_parse_markdown(self):
         content = '# My Title\n\nThis is a test note.'
-        title, body = NotesImportService._parse_markdown(content)
+        title, body = parse_markdown(content)
         assert title == 'My Title'
         assert body == '<p>This is a test note.</p>'
 
     def test_parse_markdown_no_h1(self):
         content = 'This is a test note without H1.'
-        title, body = NotesImportService._parse_markdown(content)
+        title, body = parse_markdown(content)
         assert title == 'Untitled Note'
         assert body == '<p>This is a test note without H1.</p>'
 
     def test_parse_html_with_title(self):
         content = '<html><head><title>Page Title</title></head><body><h1>H1 Title</h1><p>Content</p></body></html>'
-        title, body = NotesImportService._parse_html(content)
+        title, body = parse_html(content)
         assert title == 'Page Title'
         assert '<h1>H1 Title</h1>' in body
         assert '<p>Content</p>' in body
 
     def test_parse_html_no_title_with_h1(self):
         content = '<html><body><h1>H1 Only</h1><p>Content</p></body></html>'
-        title, body = NotesImportService._parse_html(content)
+        title, body = parse_html(content)
         assert title == 'H1 Only'
         assert '<h1>H1 Only</h1>' not in body
         assert '<p>Content</p>' in body
 
     def test_parse_html_with_title_and_h1(self):
         content = '<html><head><title>Page Title</title></head><body><h1>H1 Title</h1><p>Content</p></body></html>'
-        title, body = NotesImportService._parse_html(content)
+        title, body = parse_html(content)
         assert title == 'Page Title'
         assert '<h1>H1 Title</h1>' in body
         assert '<p>Content</p>' in body
@@ -67,7 +82,9 @@ class TestNotesImportService:
 
         zip_content = zip_buffer.getvalue()
         root_folder = NotesFolderService.get_root_folder(test_db, test_user.id)
-        notes = NotesImportService.import_zip(test_db, test_user.id, zip_content, root_folder.id)
+        result = NotesImportService.import_zip(test_db, test_user.id, zip_content, root_folder.id)
+        assert result.created == 3
+        notes = test_db.query(Note).filter_by(user_id=test_user.id).all()
         assert len(notes) == 3
         
         # Check note 1 (root)
@@ -90,3 +107,146 @@ class TestNotesImportService:
         assert subfolder is not None
         assert note3.folder_id == subfolder.id
         assert subfolder.parent_id == folder1.id
+
+    def test_import_zip_batches(self, test_db: Session, test_user, query_counter):
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr('empty/', '')
+            for i in range(IMPORT_NOTES_BATCH_SIZE * 2):
+                zip_file.writestr(f'folder {i % 5}/subfolder {i % 2}/note {i}.md', f'# Note {i}\nBody {i}')
+        root_folder_id, user_id = NotesFolderService.get_root_folder(test_db, test_user.id).id, test_user.id
+
+        query_counter.clear()
+        result = NotesImportService.import_zip(test_db, user_id, zip_buffer.getvalue(), root_folder_id)
+
+        assert result.created == IMPORT_NOTES_BATCH_SIZE * 2
+        # one change sequence and a notes insert per batch, nothing is reloaded after inserts
+        # (folders are inserted with a statement per nesting level, on SQLite RETURNING inserts run row by row)
+        assert len([statement for statement in query_counter if statement.startswith('UPDATE users')]) == 1
+        assert len([statement for statement in query_counter if statement.startswith('INSERT INTO notes ')]) == 2
+        assert not [statement for statement in query_counter if statement.startswith('SELECT')]
+        # root, empty folder, folders and their subfolders
+        assert test_db.query(NotesFolder).filter_by(user_id=user_id).count() == 1 + 1 + 5 + 10
+
+        subfolder = test_db.query(NotesFolder).filter_by(user_id=user_id, name='subfolder 1').first()
+        note = test_db.query(Note).filter_by(title='Note 1').one()
+        assert note.body == '<p>Body 1</p>'
+        assert note.folder.name == 'subfolder 1'
+        assert note.folder.parent.name == 'folder 1'
+        assert note.folder.parent.parent_id == root_folder_id
+        assert note.change_seq == subfolder.change_seq > 0
+
+    def test_import_zip_rollback(self, test_db: Session, test_user):
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zip_file:
+            zip_file.writestr('folder/note 1.txt', 'Content 1')
+            zip_file.writestr('folder/note 2.txt', 'Content 2')
+        # corrupt content of the last member, so the import fails after the first note is parsed
+        zip_content = zip_buffer.getvalue().replace(b'Content 2', b'Content X')
+        root_folder_id, user_id = NotesFolderService.get_root_folder(test_db, test_user.id).id, test_user.id
+
+        assert NotesImportService.import_zip(test_db, user_id, zip_content, root_folder_id) is None
+        assert NotesImportService.import_zip(test_db, user_id, b'not a zip', root_folder_id) is None
+        assert test_db.query(Note).count() == 0
+        assert test_db.query(NotesFolder).filter_by(name='folder').count() == 0
+
+    def test_import_zip_incremental(self, test_db: Session, test_user, query_counter):
+        vault = {f'folder {i % 3}/note {i}.md': f'# Note {i}\nBody {i}' for i in range(IMPORT_NOTES_BATCH_SIZE + 10)}
+        vault['image.png'] = 'not a note'
+        root_folder_id, user_id = NotesFolderService.get_root_folder(test_db, test_user.id).id, test_user.id
+
+        result = NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id, incremental=True)
+        assert result == (IMPORT_NOTES_BATCH_SIZE + 10, 0, 0)
+        assert test_db.query(NotesImportFingerprint).count() == IMPORT_NOTES_BATCH_SIZE + 10
+        deleted_note = test_db.query(Note).filter_by(title='Note 2').one()
+        deleted_note.mark_as_deleted()
+        test_db.commit()
+        note_id = test_db.query(Note).filter_by(title='Note 0').one().id
+
+        # unchanged files are not parsed or written, the image is parsed again but can't be imported
+        query_counter.clear()
+        result = NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id, incremental=True)
+        assert result == (1, 0, IMPORT_NOTES_BATCH_SIZE + 9)
+        assert not [statement for statement in query_counter if statement.startswith('UPDATE notes ')]
+        assert not [statement for statement in query_counter if statement.startswith('INSERT INTO notes_folders')]
+
+        vault['folder 0/note 0.md'] = '# Note 0 changed\nNew body'
+        vault['folder 3/new note.md'] = '# New note\nBody'
+        result = NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id, incremental=True)
+        assert result == (1, 1, IMPORT_NOTES_BATCH_SIZE + 9)
+
+        # changed note is updated in place and existing folders are reused
+        note = test_db.query(Note).filter_by(id=note_id).one()
+        assert (note.title, note.body) == ('Note 0 changed', '<p>New body</p>')
+        assert note.change_seq == test_db.query(Note).filter_by(title='New note').one().change_seq
+        notes = test_db.query(Note).filter_by(user_id=user_id, is_deleted=False).all()
+        assert len(notes) == IMPORT_NOTES_BATCH_SIZE + 11
+        assert test_db.query(NotesFolder).filter_by(user_id=user_id, name='folder 0').count() == 1
+
+        # plain imports still create new notes
+        result = NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id)
+        assert result == (IMPORT_NOTES_BATCH_SIZE + 11, 0, 0)
+
+    def test_import_zip_incremental_trashed(self, test_db: Session, test_user):
+        vault = {'sub/a.md': '# A\nBody', 'sub/b.md': '# B\nBody'}
+        root_folder_id, user_id = NotesFolderService.get_root_folder(test_db, test_user.id).id, test_user.id
+        NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id, incremental=True)
+
+        sub_folder = test_db.query(NotesFolder).filter_by(user_id=user_id, name='sub').one()
+        trash_folder_id = NotesFolderService.get_trash_folder(test_db, user_id).id
+        NotesFolderService.update_folder(
+            test_db, sub_folder.id, user_id, NotesFolderUpdateSchema(parent_id=trash_folder_id)
+        )
+
+        # notes in the trash are not updated or skipped, both are created again in a new folder
+        vault['sub/b.md'] = '# B changed\nBody'
+        result = NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id, incremental=True)
+        assert result == (2, 0, 0)
+
+        new_sub_folder = test_db.query(NotesFolder).filter_by(parent_id=root_folder_id, name='sub').one()
+        notes = test_db.query(Note).filter_by(folder_id=new_sub_folder.id).order_by(Note.title).all()
+        assert [note.title for note in notes] == ['A', 'B changed']
+        assert {note.title for note in test_db.query(Note).filter_by(folder_id=sub_folder.id)} == {'A', 'B'}
+
+        result = NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id, incremental=True)
+        assert result == (0, 0, 2)
+
+    def test_import_zip_incremental_long_path(self, test_db: Session, test_user):
+        long_path = f'{"folder/" * (IMPORT_PATH_MAX_LENGTH // 7)}note.md'
+        vault = {'note.md': '# Note\nBody', long_path: '# Long\nBody'}
+        root_folder_id, user_id = NotesFolderService.get_root_folder(test_db, test_user.id).id, test_user.id
+
+        # files which can't be fingerprinted are skipped by incremental imports only
+        result = NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id, incremental=True)
+        assert result == (1, 0, 0)
+        assert [fingerprint.path for fingerprint in test_db.query(NotesImportFingerprint)] == ['note.md']
+        result = NotesImportService.import_zip(test_db, user_id, make_zip(vault), root_folder_id)
+        assert result == (2, 0, 0)
+
+    def test_import_zip_memory(self, test_db: Session, test_user):
+        root_folder_id, user_id = NotesFolderService.get_root_folder(test_db, test_user.id).id, test_user.id
+
+        def import_archive(notes_count: int) -> int:
+            with tempfile.TemporaryFile() as zip_file:
+                with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+                    for i in range(notes_count):
+                        # random bodies are poorly compressible, so the archive is much larger than a single note
+                        zip_ref.writestr(f'folder {i % 10}/note {i}.txt', secrets.token_hex(8192))
+                zip_file.seek(0)
+
+                tracemalloc.start()
+                try:
+                    result = NotesImportService.import_zip(test_db, user_id, zip_file, root_folder_id)
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+            assert result.created == notes_count
+            return peak_memory
+
+        small_peak_memory = import_archive(IMPORT_NOTES_BATCH_SIZE * 2)
+        large_peak_memory = import_archive(IMPORT_NOTES_BATCH_SIZE * 20)
+
+        # a batch of notes and files submitted to parse workers are kept in memory, not the whole archive
+        assert large_peak_memory < small_peak_memory * 1.5
+        assert large_peak_memory < IMPORT_NOTES_BATCH_SIZE * 20 * 16384 / 3
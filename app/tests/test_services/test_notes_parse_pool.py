@@ -0,0 +1,93 @@
+import os
+import threading
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services import notes_parse_pool as notes_parse_pool_module, process_pool
+from app.services.notes_parse_pool import NotesParsePool
+from app.services.notes_parser import parse_note_file
+
+
+def crashing_parse_note_files(files: list[tuple[str, bytes]]) -> list[tuple[str, str] | None]:
+    """ Module-level, so workers started by the forkserver can import it """
+    if any(filename == 'crash.txt' for filename, _ in files):
+        os._exit(1)
+    return [parse_note_file(filename, content) for filename, content in files]
+
+
+@pytest.fixture
+def parse_pool(request):
+    pool = NotesParsePool(max_workers=request.param, chunk_size=3)
+    yield pool
+    pool.shutdown()
+
+
+class TestNotesParsePool:
+    def test_parse_note_file(self):
+        assert parse_note_file('note.html', b'<h1>Title</h1><p>Body</p><script>alert(1)</script>') == (
+            'Title', '<p>Body</p>'
+        )
+        assert parse_note_file('note.txt', b'Line') == ('note', '<p>Line</p>')
+        assert parse_note_file('image.png', b'Line') is None
+        assert parse_note_file('note.txt', b'\xff\xfe') is None
+
+    @pytest.mark.parametrize('parse_pool', [0, 2], indirect=True)
+    def test_parse_many_order(self, parse_pool):
+        files = [(i, f'note {i}.txt', f'Body {i}'.encode()) for i in range(13)] + [(13, 'image.png', b'')]
+        results = list(parse_pool.parse_many(files))
+
+        assert [key for key, _ in results] == list(range(14))
+        assert [parsed for _, parsed in results[:13]] == [(f'note {i}', f'<p>Body {i}</p>') for i in range(13)]
+        assert results[13] == (13, None)
+        assert parse_pool.get_stats()['parsed'] == 14
+        assert parse_pool.get_stats()['chunks'] == (5 if parse_pool.max_workers else 0)
+        # workers are not forked from the multi-threaded API process
+        assert parse_pool.mp_context.get_start_method() in ('forkserver', 'spawn')
+
+    @pytest.mark.parametrize('parse_pool', [2], indirect=True)
+    def test_parse_many_few_chunks(self, parse_pool, monkeypatch):
+        def start_executor():
+            raise AssertionError('Workers are started')
+
+        # imports of fewer than 2 * max_workers chunks are parsed in the calling thread without starting workers
+        monkeypatch.setattr(parse_pool, '_start_executor', start_executor)
+        files = [(i, f'note {i}.txt', b'Body') for i in range(9)]
+        results = list(parse_pool.parse_many(files))
+
+        assert results == [(i, (f'note {i}', '<p>Body</p>')) for i in range(9)]
+        assert parse_pool.get_stats()['chunks'] == 0
+
+    @pytest.mark.parametrize('parse_pool', [2], indirect=True)
+    def test_parse_many_throttled(self, parse_pool, monkeypatch):
+        monkeypatch.setattr(process_pool, '_worker_slots', threading.BoundedSemaphore(1))
+        files = [(i, f'note {i}.txt', b'Body') for i in range(12)]
+
+        # the only slot is taken by a running import, so another one is parsed in the calling thread
+        running_import = parse_pool.parse_many(files)
+        next(running_import)
+        chunks_count = parse_pool.get_stats()['chunks']
+        assert len(list(parse_pool.parse_many(files))) == 12
+        assert parse_pool.get_stats()['throttled'] == 1
+        assert parse_pool.get_stats()['chunks'] == chunks_count
+
+        # the slot is released when the import is finished
+        assert len(list(running_import)) == 11
+        assert len(list(parse_pool.parse_many(files))) == 12
+        assert parse_pool.get_stats()['throttled'] == 1
+        assert parse_pool.get_stats()['chunks'] == 8
+
+    @pytest.mark.parametrize('parse_pool', [2], indirect=True)
+    def test_parse_many_crash(self, parse_pool, monkeypatch):
+        monkeypatch.setattr(notes_parse_pool_module, 'parse_note_files', crashing_parse_note_files)
+        files = [(i, f'note {i}.txt', b'Body') for i in range(11)] + [(11, 'crash.txt', b'')]
+
+        with pytest.raises(BrokenProcessPool):
+            list(parse_pool.parse_many(files))
+        assert parse_pool.get_stats()['crashed'] == 1
+
+        # next import starts a new pool
+        monkeypatch.undo()
+        files[11] = (11, 'note 11.txt', b'Body')
+        chunks_count = parse_pool.get_stats()['chunks']
+        assert len(list(parse_pool.parse_many(files))) == 12
+        assert parse_pool.get_stats()['chunks'] == chunks_count + 4
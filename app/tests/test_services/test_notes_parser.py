@@ -0,0 +1,33 @@
+import json
+import os
+import pytest
+
+from app.const.notes import HtmlParserBackend
+from app.services.notes_parser import get_html_parser_backends, parse_html
+from app.services.notes_service import NoteService
+
+# HTML documents with expected title and sanitized body in .json files of the same name
+GOLDEN_FILES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'notes_parser')
+GOLDEN_FILES = sorted(name[:-len('.html')] for name in os.listdir(GOLDEN_FILES_DIR) if name.endswith('.html'))
+
+
+class TestNotesParser:
+    def test_html_parser_backends(self):
+        backends = get_html_parser_backends()
+        # html.parser is always available as a fallback
+        assert backends[-1] == HtmlParserBackend.HTML_PARSER
+
+    @pytest.mark.parametrize('backend', list(HtmlParserBackend))
+    @pytest.mark.parametrize('name', GOLDEN_FILES)
+    def test_parse_html_golden_files(self, backend, name):
+        if backend not in get_html_parser_backends():
+            pytest.skip(f'{backend.value} is not installed')
+
+        with open(os.path.join(GOLDEN_FILES_DIR, f'{name}.html'), encoding='utf-8') as file:
+            content = file.read()
+        with open(os.path.join(GOLDEN_FILES_DIR, f'{name}.json'), encoding='utf-8') as file:
+            expected = json.load(file)
+
+        title, body = parse_html(content, backend)
+        # backends serialize HTML differently, e.g. void tags, notes are stored sanitized
+        assert {'title': title, 'body': NoteService.clean_html(body) if body else body} == expected
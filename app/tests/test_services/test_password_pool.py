@@ -0,0 +1,78 @@
+import threading
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services import password_pool as password_pool_module
+from app.services.password_pool import PasswordPool, PasswordPoolFull
+from app.tests.const import TEST_USERNAME, TEST_PASSWORD
+
+
+class TestPasswordPool:
+    def test_run(self):
+        pool = PasswordPool(max_workers=2, queue_size=2)
+        try:
+            assert pool.run(lambda a, b: a + b, 1, 2) == 3
+            assert pool.get_stats()['completed'] == 1
+            assert pool.get_stats()['in_flight'] == 0
+        finally:
+            pool.shutdown()
+
+    def test_run_without_workers(self):
+        pool = PasswordPool(max_workers=0, queue_size=0)
+        assert pool.run(threading.current_thread) is threading.current_thread()
+
+    def test_run_reraises_errors(self):
+        pool = PasswordPool(max_workers=1, queue_size=0)
+
+        def fail():
+            raise ValueError('Invalid salt')
+
+        try:
+            with pytest.raises(ValueError):
+                pool.run(fail)
+            # Slot is released after a failed task
+            assert pool.run(lambda: 1) == 1
+        finally:
+            pool.shutdown()
+
+    def test_run_rejects_when_full(self):
+        pool = PasswordPool(max_workers=1, queue_size=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_task():
+            started.set()
+            release.wait(5)
+
+        # One task is running and one is waiting in the queue
+        threads = [threading.Thread(target=pool.run, args=(blocking_task,)) for _ in range(2)]
+        try:
+            for thread in threads:
+                thread.start()
+            started.wait(5)
+            while pool.get_stats()['in_flight'] < 2:
+                pass
+
+            with pytest.raises(PasswordPoolFull):
+                pool.run(lambda: None)
+            assert pool.get_stats()['rejected'] == 1
+        finally:
+            release.set()
+            for thread in threads:
+                thread.join()
+            pool.shutdown()
+
+        assert pool.get_stats()['completed'] == 2
+
+    def test_access_token_rejected_when_full(self, client: TestClient, test_user, monkeypatch):
+        def run(func, *args):
+            raise PasswordPoolFull()
+
+        monkeypatch.setattr(password_pool_module.password_pool, 'run', run)
+        response = client.post(
+            f'{settings.API_V1_STR}/auth/access_token_json/',
+            json={'username': TEST_USERNAME, 'password': TEST_PASSWORD},
+        )
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == str(settings.PASSWORD_POOL_RETRY_AFTER_SECONDS)
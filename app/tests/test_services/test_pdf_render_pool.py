@@ -0,0 +1,101 @@
+import io
+import threading
+import zipfile
+import pytest
+from sqlalchemy.orm import Session
+
+from app.const.notes import ExportType, EXPORT_ERRORS_FILENAME
+from app.schemas.notes import NoteCreateSchema
+from app.schemas.notes_folders import NotesFolderCreateSchema
+from app.services import notes_export_service, pdf_render_pool as pdf_render_pool_module, process_pool
+from app.services.notes_export_service import NotesExportService
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_service import NoteService
+from app.services.pdf_render_pool import PdfRenderPool
+from app.tests.fixtures.notes_export import fake_render_pdf
+
+
+@pytest.fixture
+def render_pool(request, monkeypatch):
+    monkeypatch.setattr(pdf_render_pool_module, 'render_pdf', fake_render_pdf)
+    pool = PdfRenderPool(max_workers=request.param, timeout=1)
+    yield pool
+    pool.shutdown()
+
+
+class TestPdfRenderPool:
+    @pytest.mark.parametrize('render_pool', [0, 2], indirect=True)
+    def test_render_many_order(self, render_pool):
+        notes = [(i, f'Note {i}', '') for i in range(10)]
+        results = list(render_pool.render_many(notes))
+
+        assert [key for key, _, _ in results] == list(range(10))
+        assert [content for _, content, _ in results] == [f'%PDF Note {i}'.encode() for i in range(10)]
+        assert render_pool.get_stats()['rendered'] == 10
+
+    @pytest.mark.parametrize('render_pool', [0, 2], indirect=True)
+    def test_render_many_error(self, render_pool):
+        results = list(render_pool.render_many([(1, 'Note 1', ''), (2, 'Bad', ''), (3, 'Note 3', '')]))
+
+        assert results[0] == (1, b'%PDF Note 1', None)
+        assert results[1] == (2, None, 'Invalid HTML')
+        assert results[2] == (3, b'%PDF Note 3', None)
+        assert render_pool.get_stats()['failed'] == 1
+
+    @pytest.mark.parametrize('render_pool', [2], indirect=True)
+    def test_render_many_throttled(self, render_pool, monkeypatch):
+        def start_executor(*args, **kwargs):
+            raise AssertionError('Workers are started')
+
+        # all slots are taken by other imports and exports, so notes are rendered in the calling thread
+        monkeypatch.setattr(process_pool, '_worker_slots', threading.BoundedSemaphore(1))
+        process_pool._worker_slots.acquire()
+        monkeypatch.setattr(render_pool, '_start_executor', start_executor)
+        results = list(render_pool.render_many([(1, 'Note 1', ''), (2, 'Bad', '')]))
+
+        assert results == [(1, b'%PDF Note 1', None), (2, None, 'Invalid HTML')]
+        assert render_pool.get_stats()['throttled'] == 1
+
+    @pytest.mark.parametrize('render_pool', [2], indirect=True)
+    def test_render_many_timeout(self, render_pool):
+        notes = [(1, 'Slow', ''), (2, 'Note 2', ''), (3, 'Note 3', ''), (4, 'Note 4', '')]
+        results = list(render_pool.render_many(notes))
+
+        assert results[0][1] is None
+        assert 'Timed out' in results[0][2]
+        # notes queued to the replaced pool are still rendered
+        assert [content for _, content, _ in results[1:]] == [b'%PDF Note 2', b'%PDF Note 3', b'%PDF Note 4']
+        assert render_pool.get_stats()['timed_out'] == 1
+
+    @pytest.mark.parametrize('render_pool', [2], indirect=True)
+    def test_render_many_isolated(self, render_pool):
+        # another export renders while workers of the timed out one are terminated
+        other_notes = [(i, f'Wait {i}', '') for i in range(30)]
+        other_results = []
+        other_export = threading.Thread(target=lambda: other_results.extend(render_pool.render_many(other_notes)))
+        other_export.start()
+        results = list(render_pool.render_many([(1, 'Slow', ''), (2, 'Note 2', '')]))
+        other_export.join()
+
+        assert 'Timed out' in results[0][2]
+        assert results[1] == (2, b'%PDF Note 2', None)
+        assert [error for _, _, error in other_results] == [None] * 30
+        assert render_pool.get_stats()['timed_out'] == 1
+
+    @pytest.mark.parametrize('render_pool', [2], indirect=True)
+    def test_export_folder_pdf_with_errors(self, render_pool, test_db: Session, test_user, monkeypatch):
+        monkeypatch.setattr(notes_export_service, 'pdf_render_pool', render_pool)
+        folder = NotesFolderService.create_folder(
+            test_db, user_id=test_user.id, create_data=NotesFolderCreateSchema(name='Folder')
+        )
+        for title in ('Note 1', 'Bad', 'Note 2'):
+            NoteService.create_note(
+                test_db, user_id=test_user.id, create_data=NoteCreateSchema(title=title, body='', folder_id=folder.id)
+            )
+
+        zip_chunks, _ = NotesExportService.export_folder(
+            test_db, user_id=test_user.id, folder_id=folder.id, export_type=ExportType.PDF
+        )
+        with zipfile.ZipFile(io.BytesIO(b''.join(zip_chunks))) as zf:
+            assert sorted(zf.namelist()) == sorted(['Note 1.pdf', 'Note 2.pdf', EXPORT_ERRORS_FILENAME])
+            assert zf.read(EXPORT_ERRORS_FILENAME).decode() == 'Bad.pdf: Invalid HTML\n'
@@ -2,9 +2,9 @@ import datetime as dt
 import pytest
 from sqlalchemy.orm import Session
 
-from app.const.planner import PlannerItemState
+from app.const.planner import PlannerBatchStatus, PlannerItemState, PLANNER_ITEM_INDEX_STEP
 from app.models.planner import PlannerDayItem
-from app.schemas.planner_day import PlannerDayItemCreateSchema, PlannerDayItemUpdateSchema
+from app.schemas.planner_day import DayItemsBatchSchema, PlannerDayItemCreateSchema, PlannerDayItemUpdateSchema
 from app.services.planner_day_service import PlannerDayItemService
 
 
@@ -29,9 +29,9 @@ class TestPlannerDayItemService:
         test_db.add(item)
         test_db.commit()
 
-        # Now new index should be 1
+        # Now new index should be placed after the existing one leaving a gap
         index = PlannerDayItemService.get_new_item_index(test_db, test_day, test_user.id)
-        assert index == 1
+        assert index == PLANNER_ITEM_INDEX_STEP
 
     def test_get_day_item(self, test_db: Session, test_user, test_day):
         # Create an item
@@ -229,8 +229,87 @@ class TestPlannerDayItemService:
         db_item2 = test_db.query(PlannerDayItem).filter(PlannerDayItem.id == item2.id).first()
         db_item3 = test_db.query(PlannerDayItem).filter(PlannerDayItem.id == item3.id).first()
         assert db_item3.index == 0
-        assert db_item1.index == 1
-        assert db_item2.index == 2
+        assert db_item1.index == PLANNER_ITEM_INDEX_STEP
+        assert db_item2.index == 2 * PLANNER_ITEM_INDEX_STEP
+
+    def test_change_day_item_position(self, test_db: Session, test_user, test_day, query_counter):
+        items = [
+            PlannerDayItem(text=f'Item {i}', index=i * PLANNER_ITEM_INDEX_STEP, user_id=test_user.id, day=test_day)
+            for i in range(4)
+        ]
+        test_db.add_all(items)
+        test_db.commit()
+        item_ids = [item.id for item in items]
+        user_id = test_user.id
+
+        # Move the last item between the first and the second ones
+        query_counter.clear()
+        db_item, needs_rebalance = PlannerDayItemService.change_day_item_position(
+            test_db, item_ids[3], item_ids[0], user_id
+        )
+        assert db_item.index == PLANNER_ITEM_INDEX_STEP // 2
+        assert needs_rebalance is False
+        # Only the moved item is updated, besides the user change sequence
+        assert len([statement for statement in query_counter if statement.startswith('UPDATE planner_')]) == 1
+
+        # Move the second item to the top
+        db_item, needs_rebalance = PlannerDayItemService.change_day_item_position(test_db, item_ids[1], None, user_id)
+        assert db_item.index == -PLANNER_ITEM_INDEX_STEP
+
+        ordered_items = PlannerDayItemService.get_items_by_day(test_db, test_day, user_id)
+        assert [item.id for item in ordered_items] == [item_ids[1], item_ids[0], item_ids[3], item_ids[2]]
+
+        # Items of other days can not be used as a target
+        other_day_item = PlannerDayItem(
+            text='Other day', index=0, user_id=user_id, day=test_day + dt.timedelta(days=1)
+        )
+        test_db.add(other_day_item)
+        test_db.commit()
+        db_item, _ = PlannerDayItemService.change_day_item_position(test_db, item_ids[0], other_day_item.id, user_id)
+        assert db_item is None
+
+    def test_change_day_item_position_without_gap(self, test_db: Session, test_user, test_day):
+        # Dense indexes, so there is no gap between the items
+        items = [
+            PlannerDayItem(text=f'Item {i}', index=i, user_id=test_user.id, day=test_day) for i in range(3)
+        ]
+        test_db.add_all(items)
+        test_db.commit()
+        item_ids = [item.id for item in items]
+        user_id = test_user.id
+
+        db_item, needs_rebalance = PlannerDayItemService.change_day_item_position(
+            test_db, item_ids[2], item_ids[0], user_id
+        )
+
+        # Items are rebalanced in place, so the item gets a sparse index
+        assert db_item.index == PLANNER_ITEM_INDEX_STEP // 2
+        assert needs_rebalance is False
+        ordered_items = PlannerDayItemService.get_items_by_day(test_db, test_day, user_id)
+        assert [item.id for item in ordered_items] == [item_ids[0], item_ids[2], item_ids[1]]
+
+    def test_change_day_item_position_gap_exhausted(self, test_db: Session, test_user, test_day):
+        items = [
+            PlannerDayItem(text=f'Item {i}', index=i * 2, user_id=test_user.id, day=test_day) for i in range(3)
+        ]
+        test_db.add_all(items)
+        test_db.commit()
+        item_ids = [item.id for item in items]
+        user_id = test_user.id
+
+        # The last free index between two items is taken
+        db_item, needs_rebalance = PlannerDayItemService.change_day_item_position(
+            test_db, item_ids[2], item_ids[0], user_id
+        )
+        assert db_item.index == 1
+        assert needs_rebalance is True
+
+        PlannerDayItemService.rebalance_day_items(test_db, test_day, user_id)
+        test_db.commit()
+
+        ordered_items = PlannerDayItemService.get_items_by_day(test_db, test_day, user_id)
+        assert [item.id for item in ordered_items] == [item_ids[0], item_ids[2], item_ids[1]]
+        assert [item.index for item in ordered_items] == [0, PLANNER_ITEM_INDEX_STEP, 2 * PLANNER_ITEM_INDEX_STEP]
 
     def test_copy_day_item(self, test_db: Session, test_user, test_day):
         # Create an item
@@ -292,6 +371,29 @@ class TestPlannerDayItemService:
         assert items_by_day[test_day + dt.timedelta(days=1)][0].text == 'Item 1'
         assert items_by_day[test_day + dt.timedelta(days=2)][0].text == 'Item 2'
 
+    def test_get_items_by_days(self, test_db: Session, test_user, test_day):
+        # Create items for scattered days, and one item for a day that is not requested
+        days = [test_day, test_day + dt.timedelta(days=3), test_day + dt.timedelta(days=10)]
+        for i, day in enumerate(days + [test_day + dt.timedelta(days=1)]):
+            PlannerDayItemService.create_day_item(
+                test_db,
+                item=PlannerDayItemCreateSchema(day=day, text=f'Item {i}'),
+                user_id=test_user.id
+            )
+        empty_day = test_day + dt.timedelta(days=20)
+
+        items_by_day = PlannerDayItemService.get_items_by_days(test_db, days + [empty_day], test_user.id)
+
+        assert list(items_by_day.keys()) == days + [empty_day]
+        assert [item.text for item in items_by_day[days[0]]] == ['Item 0']
+        assert [item.text for item in items_by_day[days[1]]] == ['Item 1']
+        assert [item.text for item in items_by_day[days[2]]] == ['Item 2']
+        assert items_by_day[empty_day] == []
+
+        # Items of other users are not returned
+        items_by_day = PlannerDayItemService.get_items_by_days(test_db, days, 7)
+        assert all(items == [] for items in items_by_day.values())
+
     def test_snooze_day_item(self, test_db: Session, test_user, test_day):
         # Create an item
         item = PlannerDayItem(
@@ -328,3 +430,44 @@ class TestPlannerDayItemService:
         # Try to snooze an item with a different user_id
         snoozed_item = PlannerDayItemService.snooze_day_item(test_db, item.id, tomorrow, 7)
         assert snoozed_item is None
+
+    def test_apply_day_items_batch(self, test_db: Session, test_user, test_day, query_counter):
+        tomorrow = test_day + dt.timedelta(days=1)
+        items = [
+            PlannerDayItem(text=f'Item {i}', index=i * PLANNER_ITEM_INDEX_STEP, day=test_day, user_id=test_user.id)
+            for i in range(3)
+        ]
+        other_user_item = PlannerDayItem(text='Other Item', index=0, day=test_day, user_id=7)
+        test_db.add_all(items + [other_user_item])
+        test_db.commit()
+        item_ids, other_user_item_id, user_id = [item.id for item in items], other_user_item.id, test_user.id
+
+        batch = DayItemsBatchSchema.model_validate({'operations': [
+            {'op': 'create', 'day': test_day, 'text': 'New 1'},
+            {'op': 'create', 'day': test_day, 'text': 'New 2'},
+            {'op': 'create', 'day': tomorrow, 'text': 'Tomorrow'},
+            {'op': 'update', 'item_id': item_ids[0], 'state': 'completed'},
+            {'op': 'delete', 'item_id': item_ids[1]},
+            {'op': 'update', 'item_id': item_ids[1], 'text': 'Deleted above'},
+            {'op': 'delete', 'item_id': other_user_item_id},
+        ]})
+
+        query_counter.clear()
+        results = PlannerDayItemService.apply_day_items_batch(test_db, batch.operations, user_id)
+
+        # one query for items and one for new indexes, no reloads after commit, one change sequence for the batch
+        assert len([statement for statement in query_counter if statement.startswith('SELECT')]) == 2
+        assert len([statement for statement in query_counter if statement.startswith('UPDATE users')]) == 1
+        assert [result['status'] for result in results] == (
+            [PlannerBatchStatus.OK] * 5 + [PlannerBatchStatus.NOT_FOUND] * 2
+        )
+        assert [result['item'].text for result in results[:3]] == ['New 1', 'New 2', 'Tomorrow']
+        assert results[3]['item'].state == PlannerItemState.COMPLETED
+        assert results[4]['item'] is None and results[4]['item_id'] == item_ids[1]
+
+        # new items are placed last, one after another
+        day_items = PlannerDayItemService.get_items_by_day(test_db, test_day, user_id)
+        assert [item.text for item in day_items] == ['Item 0', 'Item 2', 'New 1', 'New 2']
+        assert day_items[-1].index - day_items[-2].index == PLANNER_ITEM_INDEX_STEP
+        assert [item.index for item in PlannerDayItemService.get_items_by_day(test_db, tomorrow, user_id)] == [0]
+        assert PlannerDayItemService.get_day_item(test_db, other_user_item_id, 7) is not None
@@ -0,0 +1,24 @@
+from app.const.planner import PLANNER_ITEM_INDEX_STEP
+from app.services.planner_index_utils import calc_index_between, is_gap_exhausted
+
+
+class TestPlannerIndexUtils:
+    def test_calc_index_between(self):
+        # The only item
+        assert calc_index_between(None, None) == 0
+        # First and last items
+        assert calc_index_between(None, 0) == -PLANNER_ITEM_INDEX_STEP
+        assert calc_index_between(PLANNER_ITEM_INDEX_STEP, None) == 2 * PLANNER_ITEM_INDEX_STEP
+        # Between two items
+        assert calc_index_between(0, PLANNER_ITEM_INDEX_STEP) == PLANNER_ITEM_INDEX_STEP // 2
+        assert calc_index_between(0, 2) == 1
+        # No gap left
+        assert calc_index_between(0, 1) is None
+        assert calc_index_between(1, 1) is None
+
+    def test_is_gap_exhausted(self):
+        assert is_gap_exhausted(None, 0, None) is False
+        assert is_gap_exhausted(0, PLANNER_ITEM_INDEX_STEP // 2, PLANNER_ITEM_INDEX_STEP) is False
+        assert is_gap_exhausted(0, 1, 2) is True
+        assert is_gap_exhausted(None, 0, 1) is True
+        assert is_gap_exhausted(0, 1, None) is True
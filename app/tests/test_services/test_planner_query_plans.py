@@ -0,0 +1,85 @@
+import datetime as dt
+import pytest
+from sqlalchemy.orm import Session
+
+from app.const.planner import PlannerAgendaType
+from app.models.planner import PlannerAgenda, PlannerAgendaItem, PlannerDayItem
+from app.services.planner_agenda_item_service import PlannerAgendaItemService
+from app.services.planner_agenda_service import PlannerAgendaService
+from app.services.planner_day_service import PlannerDayItemService
+
+
+class TestPlannerQueryPlans:
+    """ Checks that planner hot queries are served by composite partial indexes """
+
+    @pytest.fixture
+    def test_day(self):
+        return dt.date(2026, 2, 2)
+
+    @pytest.fixture
+    def test_agenda(self, test_db: Session, test_user, test_day):
+        agenda = PlannerAgenda(name='Agenda', agenda_type=PlannerAgendaType.CUSTOM, user_id=test_user.id, index=1)
+        test_db.add(agenda)
+        test_db.commit()
+
+        test_db.add_all([
+            PlannerDayItem(text='Day item', index=0, day=test_day, user_id=test_user.id),
+            PlannerAgendaItem(text='Agenda item', index=0, agenda_id=agenda.id, user_id=test_user.id),
+        ])
+        test_db.commit()
+        test_db.refresh(agenda)
+        return agenda
+
+    @staticmethod
+    def get_plan(query_plans: list[tuple[str, str]], table_name: str) -> str:
+        plans = [plan for statement, plan in query_plans if f'FROM {table_name}' in statement]
+        assert len(plans) == 1
+        return plans[0]
+
+    def test_get_items_by_range(self, test_db: Session, test_user, test_agenda, test_day, query_plans):
+        user_id = test_user.id
+        query_plans.clear()
+
+        PlannerDayItemService.get_items_by_range(test_db, test_day, 7, user_id)
+
+        plan = self.get_plan(query_plans, 'planner_day_items')
+        assert 'USING INDEX idx_planner_day_items_user_day_index' in plan
+        assert 'TEMP B-TREE' not in plan
+
+    def test_get_items_by_days(self, test_db: Session, test_user, test_agenda, test_day, query_plans):
+        user_id = test_user.id
+        query_plans.clear()
+
+        PlannerDayItemService.get_items_by_days(test_db, [test_day, test_day + dt.timedelta(days=7)], user_id)
+
+        plan = self.get_plan(query_plans, 'planner_day_items')
+        assert 'USING INDEX idx_planner_day_items_user_day_index' in plan
+
+    def test_get_items_by_agendas(self, test_db: Session, test_user, test_agenda, query_plans):
+        user_id, agenda_id = test_user.id, test_agenda.id
+        query_plans.clear()
+
+        PlannerAgendaItemService.get_items_by_agendas(test_db, agenda_id, user_id)
+
+        plan = self.get_plan(query_plans, 'planner_agenda_items')
+        assert 'USING INDEX idx_planner_agenda_items_agenda_index' in plan
+        assert 'TEMP B-TREE' not in plan
+
+    def test_get_items_for_agendas(self, test_db: Session, test_user, test_agenda, query_plans):
+        user_id, agenda_id = test_user.id, test_agenda.id
+        query_plans.clear()
+
+        PlannerAgendaItemService.get_items_for_agendas(test_db, [agenda_id], user_id)
+
+        plan = self.get_plan(query_plans, 'planner_agendas')
+        assert 'USING INDEX idx_planner_agenda_items_agenda_index' in plan
+
+    def test_get_custom_agendas(self, test_db: Session, test_user, test_agenda, query_plans):
+        user_id = test_user.id
+        query_plans.clear()
+
+        PlannerAgendaService.get_agendas(test_db, user_id, [PlannerAgendaType.CUSTOM])
+
+        plan = self.get_plan(query_plans, 'planner_agendas')
+        assert 'USING INDEX idx_planner_agendas_user_type_index' in plan
+        assert 'TEMP B-TREE' not in plan
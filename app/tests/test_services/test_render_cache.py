@@ -0,0 +1,126 @@
+import io
+import os
+import stat
+import zipfile
+from sqlalchemy.orm import Session
+
+from app.const.notes import ExportType
+from app.schemas.notes import NoteCreateSchema, NoteUpdateSchema
+from app.schemas.notes_folders import NotesFolderCreateSchema
+from app.services import pdf_render_pool as pdf_render_pool_module
+from app.services.notes_export_service import NotesExportService
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_service import NoteService
+from app.services.pdf_render_pool import PdfRenderPool
+from app.services.render_cache import RenderCache, render_cache
+from app.tests.fixtures.notes_export import fake_render_pdf
+
+
+class TestRenderCache:
+    def test_get_set(self, tmp_path):
+        cache = RenderCache(directory=str(tmp_path), max_size=1024)
+        key = cache.make_key(ExportType.PDF, 'Title', 'Body')
+        assert cache.get(key) is None
+
+        cache.set(key, b'%PDF')
+        assert cache.get(key) == b'%PDF'
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['size_bytes'] == 4
+
+        # cached notes are readable only by the app user
+        assert stat.S_IMODE(os.stat(tmp_path).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(cache._get_path(key)).st_mode) == 0o600
+
+    def test_shared_directory(self, tmp_path):
+        # predictable cache path replaced by a symlink to another directory isn't used
+        os.symlink(tmp_path / 'target', tmp_path / 'cache')
+        (tmp_path / 'target').mkdir()
+        cache = RenderCache(directory=str(tmp_path / 'cache'), max_size=1024)
+        key = cache.make_key(ExportType.PDF, 'Title', 'Body')
+
+        cache.set(key, b'%PDF')
+        assert cache.get(key) is None
+        assert list((tmp_path / 'target').iterdir()) == []
+
+    def test_make_key(self):
+        key = RenderCache.make_key(ExportType.PDF, 'Title', 'Body')
+        assert key == RenderCache.make_key(ExportType.PDF, 'Title', 'Body')
+        assert key != RenderCache.make_key(ExportType.PDF, 'Title', 'Changed body')
+        assert key != RenderCache.make_key(ExportType.MARKDOWN, 'Title', 'Body')
+        # parts are separated, so moving text between title and body changes the key
+        assert key != RenderCache.make_key(ExportType.PDF, 'TitleB', 'ody')
+
+    def test_lru_eviction(self, tmp_path):
+        cache = RenderCache(directory=str(tmp_path), max_size=250)
+        keys = [cache.make_key(ExportType.PDF, f'Note {i}', '') for i in range(3)]
+        for i, key in enumerate(keys[:2]):
+            cache.set(key, b'x' * 100)
+            os.utime(cache._get_path(key), (i, i))
+
+        # reading the first note makes the second one least recently used
+        cache.get(keys[0])
+        cache.set(keys[2], b'x' * 100)
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
+        assert cache.get_stats()['evictions'] == 1
+        assert cache.get_stats()['size_bytes'] == 200
+
+    def test_disabled(self, tmp_path):
+        cache = RenderCache(directory=str(tmp_path), max_size=0)
+        key = cache.make_key(ExportType.PDF, 'Title', 'Body')
+        cache.set(key, b'%PDF')
+        assert cache.get(key) is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_render_many_cached(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(pdf_render_pool_module, 'render_pdf', fake_render_pdf)
+        cache = RenderCache(directory=str(tmp_path), max_size=1024 * 1024)
+        pool = PdfRenderPool(max_workers=2, timeout=5)
+        try:
+            list(pool.render_many([(1, 'Note 1', ''), (2, 'Note 2', '')], cache=cache))
+            notes = [(1, 'Note 1', ''), (3, 'Note 3', ''), (2, 'Note 2', '')]
+            results = list(pool.render_many(notes, cache=cache))
+        finally:
+            pool.shutdown()
+
+        assert results == [(1, b'%PDF Note 1', None), (3, b'%PDF Note 3', None), (2, b'%PDF Note 2', None)]
+        assert pool.get_stats()['rendered'] == 3
+        assert cache.get_stats()['hits'] == 2
+
+    def test_export_folder_twice(self, test_db: Session, test_user):
+        folder = NotesFolderService.create_folder(
+            test_db, user_id=test_user.id, create_data=NotesFolderCreateSchema(name='Folder')
+        )
+        notes = [
+            NoteService.create_note(
+                test_db,
+                user_id=test_user.id,
+                create_data=NoteCreateSchema(title=f'Note {i}', body=f'<p>Body {i}</p>', folder_id=folder.id)
+            )
+            for i in range(3)
+        ]
+
+        def export_folder() -> dict[str, bytes]:
+            zip_chunks, _ = NotesExportService.export_folder(
+                test_db, user_id=test_user.id, folder_id=folder.id, export_type=ExportType.MARKDOWN
+            )
+            with zipfile.ZipFile(io.BytesIO(b''.join(zip_chunks))) as zf:
+                return {name: zf.read(name) for name in zf.namelist()}
+
+        first_export = export_folder()
+        assert render_cache.get_stats()['misses'] == 3
+
+        # only the changed note is rendered again
+        NoteService.update_note(test_db, notes[0].id, test_user.id, NoteUpdateSchema(body='<p>Changed</p>'))
+        second_export = export_folder()
+
+        stats = render_cache.get_stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 4
+        assert second_export['Note 1.md'] == first_export['Note 1.md']
+        assert b'Changed' in second_export['Note 0.md']
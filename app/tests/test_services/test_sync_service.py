@@ -0,0 +1,102 @@
+import datetime as dt
+from sqlalchemy.orm import Session
+
+from app.const.planner import PlannerAgendaType
+from app.models.planner import PlannerAgenda
+from app.schemas.notes import NoteCreateSchema, NoteUpdateSchema
+from app.schemas.notes_folders import NotesFolderCreateSchema
+from app.schemas.planner_agenda import PlannerAgendaItemCreateSchema
+from app.schemas.planner_day import PlannerDayItemCreateSchema, PlannerDayItemUpdateSchema
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_service import NoteService
+from app.services.planner_agenda_item_service import PlannerAgendaItemService
+from app.services.planner_day_service import PlannerDayItemService
+from app.services.sync_service import SYNC_MODELS, SyncService
+
+
+class TestSyncService:
+    def test_change_seq_stamped_on_writes(self, test_db: Session, test_user):
+        day = dt.date(2026, 2, 2)
+        item = PlannerDayItemService.create_day_item(
+            test_db, PlannerDayItemCreateSchema(day=day, text='Item'), user_id=test_user.id
+        )
+        first_seq = item.change_seq
+        assert first_seq > 0
+        assert SyncService.get_change_seq(test_db, test_user.id) == first_seq
+
+        PlannerDayItemService.update_day_item(
+            test_db, item.id, PlannerDayItemUpdateSchema(text='Changed'), user_id=test_user.id
+        )
+        assert item.change_seq > first_seq
+
+        # bulk updates are stamped too
+        other_item = PlannerDayItemService.create_day_item(
+            test_db, PlannerDayItemCreateSchema(day=day, text='Other'), user_id=test_user.id
+        )
+        seq_before_reorder = SyncService.get_change_seq(test_db, test_user.id)
+        PlannerDayItemService.reorder_day_items(test_db, [other_item.id, item.id], user_id=test_user.id)
+        test_db.refresh(item)
+        test_db.refresh(other_item)
+        assert item.change_seq == other_item.change_seq == seq_before_reorder + 1
+
+    def test_get_changes(self, test_db: Session, test_user):
+        user_id = test_user.id
+        root_folder = NotesFolderService.get_root_folder(test_db, user_id=user_id)
+        note = NoteService.create_note(
+            test_db, user_id=user_id, create_data=NoteCreateSchema(title='Note', body='Body', folder_id=root_folder.id)
+        )
+        deleted_note = NoteService.create_note(
+            test_db, user_id=user_id, create_data=NoteCreateSchema(title='Deleted', folder_id=root_folder.id)
+        )
+        NoteService.delete_note(test_db, note_id=deleted_note.id, user_id=user_id)
+
+        # initial sync returns all not deleted rows
+        changes = SyncService.get_changes(test_db, user_id=user_id)
+        assert changes['is_full']
+        assert [row.id for row in changes['notes']] == [note.id]
+        assert [row.id for row in changes['notes_folders']] == [root_folder.id]
+        since = changes['change_seq']
+
+        # nothing changed
+        changes = SyncService.get_changes(test_db, user_id=user_id, since=since)
+        assert not changes['is_full']
+        assert all(changes[key] == [] for key in SYNC_MODELS)
+
+        agenda = PlannerAgenda(name='Agenda', agenda_type=PlannerAgendaType.CUSTOM, user_id=user_id, index=1)
+        test_db.add(agenda)
+        test_db.commit()
+        agenda_item = PlannerAgendaItemService.create_agenda_item(
+            test_db, PlannerAgendaItemCreateSchema(agenda_id=agenda.id, text='Item'), user_id=user_id
+        )
+        folder = NotesFolderService.create_folder(
+            test_db, user_id=user_id, create_data=NotesFolderCreateSchema(name='Folder')
+        )
+        NoteService.update_note(test_db, note_id=note.id, user_id=user_id, update_data=NoteUpdateSchema(title='New'))
+        NoteService.delete_note(test_db, note_id=note.id, user_id=user_id)
+
+        changes = SyncService.get_changes(test_db, user_id=user_id, since=since)
+        assert changes['change_seq'] > since
+        assert changes['planner_day_items'] == []
+        assert [row.id for row in changes['planner_agendas']] == [agenda.id]
+        assert [row.id for row in changes['planner_agenda_items']] == [agenda_item.id]
+        assert [row.id for row in changes['notes_folders']] == [folder.id]
+        # soft deletions are returned as changes
+        assert [(row.id, row.title, row.is_deleted) for row in changes['notes']] == [(note.id, 'New', True)]
+
+    def test_get_changes_other_user(self, test_db: Session, test_user):
+        NotesFolderService.get_root_folder(test_db, user_id=test_user.id)
+        changes = SyncService.get_changes(test_db, user_id=test_user.id + 1)
+        assert changes['change_seq'] == 0
+        assert all(changes[key] == [] for key in SYNC_MODELS)
+
+    def test_get_changes_uses_change_seq_indexes(self, test_db: Session, test_user, query_plans):
+        user_id = test_user.id
+        NotesFolderService.get_root_folder(test_db, user_id=user_id)
+        query_plans.clear()
+
+        SyncService.get_changes(test_db, user_id=user_id, since=1)
+
+        for table_name in SYNC_MODELS:
+            plans = [plan for statement, plan in query_plans if f'FROM {table_name} ' in statement]
+            assert len(plans) == 1
+            assert f'USING INDEX idx_{table_name}_user_change_seq' in plans[0]
@@ -0,0 +1,78 @@
+from app.const.planner import WeekStartDay
+from app.schemas.user import UserSchema
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import UserCache
+
+
+def make_user(user_id: int) -> UserSchema:
+    return UserSchema(
+        id=user_id,
+        username=f'user{user_id}',
+        email=f'user{user_id}@example.com',
+        week_start_day=WeekStartDay.MONDAY,
+        merge_weekends=False,
+    )
+
+
+class TestUserCache:
+    def test_get_set(self):
+        cache = UserCache(max_size=10, ttl_seconds=60)
+        assert cache.get(1) is None
+
+        cache.set(make_user(1))
+        assert cache.get(1).username == 'user1'
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(user_cache_module.time, 'monotonic', lambda: now)
+
+        cache = UserCache(max_size=10, ttl_seconds=60)
+        cache.set(make_user(1))
+
+        now = 1059.0
+        assert cache.get(1) is not None
+
+        now = 1060.0
+        assert cache.get(1) is None
+        assert cache.get_stats()['size'] == 0
+
+    def test_lru_eviction(self):
+        cache = UserCache(max_size=2, ttl_seconds=60)
+        cache.set(make_user(1))
+        cache.set(make_user(2))
+
+        # Touch the first user, so the second one becomes least recently used
+        cache.get(1)
+        cache.set(make_user(3))
+
+        assert cache.get(1) is not None
+        assert cache.get(2) is None
+        assert cache.get(3) is not None
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_invalidate(self):
+        cache = UserCache(max_size=10, ttl_seconds=60)
+        cache.set(make_user(1))
+
+        cache.invalidate(1)
+        cache.invalidate(2)
+        assert cache.get(1) is None
+        assert cache.get_stats()['invalidations'] == 1
+
+    def test_disabled(self):
+        cache = UserCache(max_size=10, ttl_seconds=0)
+        cache.set(make_user(1))
+        assert cache.get(1) is None
+
+    def test_stats(self):
+        cache = UserCache(max_size=10, ttl_seconds=60)
+        cache.record_lookup(is_hit=True, duration=0.001)
+        cache.record_lookup(is_hit=True, duration=0.003)
+        cache.record_lookup(is_hit=False, duration=0.01)
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert round(stats['hit_rate'], 2) == 0.67
+        assert round(stats['avg_hit_ms'], 2) == 2.0
+        assert round(stats['avg_miss_ms'], 2) == 10.0
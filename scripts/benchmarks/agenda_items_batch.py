@@ -0,0 +1,78 @@
+"""
+Benchmarks moving items of one agenda to another: one move_agenda_item call per item (one HTTP request each)
+against a single batch of move operations applied in one transaction.
+
+Usage: python scripts/benchmarks/agenda_items_batch.py [--database-url postgresql://...]
+"""
+import itertools
+
+from common import (
+    count_queries, create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser,
+    measure, print_table,
+)
+
+from app.const.planner import PlannerAgendaType, PLANNER_ITEM_INDEX_STEP
+from app.models.planner import PlannerAgenda, PlannerAgendaItem
+from app.schemas.planner_agenda import AgendaItemsBatchSchema
+from app.services.planner_agenda_item_service import PlannerAgendaItemService
+
+ITEMS_COUNTS = (10, 30, 100)
+# agenda names are unique per user
+agenda_numbers = itertools.count()
+
+
+def seed_agenda(db, items_count: int, user_id: int) -> list[int]:
+    agenda = PlannerAgenda(
+        name=f'Source {next(agenda_numbers)}', index=0, agenda_type=PlannerAgendaType.CUSTOM, user_id=user_id
+    )
+    db.add(agenda)
+    db.flush()
+    items = [
+        PlannerAgendaItem(text=f'Task {i}', index=i * PLANNER_ITEM_INDEX_STEP, agenda_id=agenda.id, user_id=user_id)
+        for i in range(items_count)
+    ]
+    db.add_all(items)
+    db.commit()
+    return [item.id for item in items]
+
+
+def move_one_by_one(db, item_ids: list[int], agenda_id: int, user_id: int) -> None:
+    for item_id in item_ids:
+        PlannerAgendaItemService.move_agenda_item(db, item_id, agenda_id, user_id)
+
+
+def move_batch(db, item_ids: list[int], agenda_id: int, user_id: int) -> None:
+    batch = AgendaItemsBatchSchema.model_validate({
+        'operations': [{'op': 'move', 'item_id': item_id, 'agenda_id': agenda_id} for item_id in item_ids]
+    })
+    PlannerAgendaItemService.apply_agenda_items_batch(db, batch.operations, user_id)
+
+
+def main():
+    args = get_arg_parser(__doc__).parse_args()
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+    target_agenda = PlannerAgenda(name='Target', index=1, agenda_type=PlannerAgendaType.CUSTOM, user_id=user_id)
+    db.add(target_agenda)
+    db.commit()
+    target_agenda_id = target_agenda.id
+
+    rows = []
+    for items_count in ITEMS_COUNTS:
+        for name, func in (('one by one', move_one_by_one), ('batch', move_batch)):
+            item_ids = seed_agenda(db, items_count, user_id)
+            with count_queries(engine) as statements:
+                func(db, item_ids, target_agenda_id, user_id)
+            # moved items are deleted, so every run moves items of a freshly seeded agenda
+            timings = []
+            for _ in range(5):
+                item_ids = seed_agenda(db, items_count, user_id)
+                timings.append(measure(lambda: func(db, item_ids, target_agenda_id, user_id), repeat=1))
+            rows.append([name, items_count, len(statements), f'{min(timings):.1f}'])
+
+    print_table(['move', 'items', 'queries', 'best ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Load benchmark comparing latency of a sync route (sync session, threadpool)
+and an async route (AsyncSession) doing the same current user lookup.
+
+Usage: python scripts/benchmarks/async_db.py [--database-url postgresql://...] [--requests 2000] [--concurrency 100]
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from common import create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser, print_table
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.services.user_service import UserService
+
+
+def get_async_database_url(database_url: str) -> str:
+    if database_url.startswith('sqlite'):
+        return database_url.replace('sqlite://', 'sqlite+aiosqlite://', 1)
+    return database_url.replace('postgresql://', 'postgresql+asyncpg://', 1)
+
+
+def create_app(database_url: str, user_id: int) -> FastAPI:
+    engine = create_engine(database_url)
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+    async_engine = create_async_engine(get_async_database_url(database_url))
+    async_session_factory = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get('/sync/')
+    def sync_route(db: Session = Depends(get_db)):
+        return {'id': UserService.get_user_by_id(db, user_id).id}
+
+    @app.get('/async/')
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        return {'id': (await UserService.async_get_user_by_id(db, user_id)).id}
+
+    return app
+
+
+async def run_load(app: FastAPI, path: str, requests_count: int, concurrency: int) -> list[float]:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://benchmark') as client:
+        async def send_request():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(send_request() for _ in range(requests_count)))
+    return latencies
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url == 'sqlite:///:memory:':
+        # in-memory database can't be shared between sync and async drivers
+        database_url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "benchmark.db")}'
+
+    db = create_benchmark_session(create_benchmark_engine(database_url))
+    user_id = create_benchmark_user(db).id
+    db.close()
+
+    app = create_app(database_url, user_id)
+    rows = []
+    for path in ('/sync/', '/async/'):
+        latencies = sorted(asyncio.run(run_load(app, path, args.requests, args.concurrency)))
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        rows.append([path, len(latencies), f'{statistics.median(latencies):.1f}', f'{p99:.1f}'])
+
+    print_table(['route', 'requests', 'p50 ms', 'p99 ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
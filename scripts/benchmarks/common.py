@@ -0,0 +1,118 @@
+"""
+Shared helpers for benchmark scripts.
+
+Benchmarks use an in-memory SQLite database by default,
+pass --database-url to run them against PostgreSQL instead.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+
+# Add the project root to the Python path and set required settings before importing app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+os.environ.setdefault('CORS_ORIGINS', json.dumps(['http://localhost']))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+SQLITE_DATABASE_URL = 'sqlite:///:memory:'
+
+
+def get_arg_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--database-url', default=SQLITE_DATABASE_URL, help='Database to run the benchmark against')
+    return parser
+
+
+def create_benchmark_engine(database_url: str = SQLITE_DATABASE_URL) -> Engine:
+    if database_url.startswith('sqlite'):
+        engine = create_engine(database_url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(database_url)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def create_benchmark_session(engine: Engine) -> Session:
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def create_benchmark_user(db: Session, username: str = 'benchmark') -> User:
+    user = User(username=username, email=f'{username}@example.com', hashed_password='-', is_active=True)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Generator[list[str], None, None]:
+    """ Collects SQL statements executed on the engine inside the context """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def count_fetched_bytes(engine: Engine) -> Generator[list[int], None, None]:
+    """
+    Collects sizes of SELECT results on the engine inside the context, as sent by PostgreSQL text protocol.
+    Results are fetched again by running the statement with the same parameters on a separate cursor.
+    """
+    sizes = []
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return
+
+        size_cursor = conn.connection.cursor()
+        try:
+            size_cursor.execute(statement, parameters)
+            sizes.append(sum(
+                len(value) if isinstance(value, bytes) else len(str(value).encode('utf-8'))
+                for row in size_cursor.fetchall() for value in row if value is not None
+            ))
+        finally:
+            size_cursor.close()
+
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    try:
+        yield sizes
+    finally:
+        event.remove(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def measure(func: Callable, repeat: int = 5) -> float:
+    """ Returns the best wall-clock time of func in milliseconds """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def print_table(headers: list[str], rows: list[list]) -> None:
+    widths = [max(len(str(value)) for value in [header] + [row[i] for row in rows]) for i, header in enumerate(headers)]
+    print('  '.join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(value).ljust(width) for value, width in zip(row, widths)))
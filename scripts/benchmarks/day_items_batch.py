@@ -0,0 +1,53 @@
+"""
+Benchmarks pasting a list of tasks into a day: one create_day_item call per item (one HTTP request each)
+against a single batch of create operations applied in one transaction.
+On SQLite inserts with RETURNING are executed row by row, on PostgreSQL they are sent in batches.
+
+Usage: python scripts/benchmarks/day_items_batch.py [--database-url postgresql://...]
+"""
+import datetime as dt
+
+from common import (
+    count_queries, create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser,
+    measure, print_table,
+)
+
+from app.schemas.planner_day import DayItemsBatchSchema, PlannerDayItemCreateSchema
+from app.services.planner_day_service import PlannerDayItemService
+
+ITEMS_COUNTS = (10, 100, 500)
+DAY = dt.date(2026, 2, 2)
+
+
+def create_one_by_one(db, items_count: int, user_id: int) -> None:
+    for i in range(items_count):
+        PlannerDayItemService.create_day_item(db, PlannerDayItemCreateSchema(day=DAY, text=f'Task {i}'), user_id)
+
+
+def create_batch(db, items_count: int, user_id: int) -> None:
+    batch = DayItemsBatchSchema.model_validate({
+        'operations': [{'op': 'create', 'day': DAY, 'text': f'Task {i}'} for i in range(items_count)]
+    })
+    PlannerDayItemService.apply_day_items_batch(db, batch.operations, user_id)
+
+
+def main():
+    args = get_arg_parser(__doc__).parse_args()
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+
+    rows = []
+    for items_count in ITEMS_COUNTS:
+        for name, func in (('one by one', create_one_by_one), ('batch', create_batch)):
+            with count_queries(engine) as statements:
+                func(db, items_count, user_id)
+            rows.append([
+                name, items_count, len(statements), f'{measure(lambda: func(db, items_count, user_id)):.1f}'
+            ])
+
+    print_table(['create', 'items', 'queries', 'best ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmarks steady-state cost of a client polling GET /notes/folders/ and GET /notes/{id}/ for changes:
+full responses against conditional requests with If-None-Match answered by 304 Not Modified.
+
+Usage: python scripts/benchmarks/etag_polling.py [--database-url postgresql://...] [--polls 50]
+"""
+from common import (
+    count_fetched_bytes, count_queries, create_benchmark_engine, create_benchmark_session, create_benchmark_user,
+    get_arg_parser, measure, print_table,
+)
+from folders_tree import seed_tree
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.models.notes import Note
+from app.services.auth_utils import create_access_token
+from app.services.notes_folders_service import NotesFolderService
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--polls', type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+    root_folder = NotesFolderService.get_root_folder(db, user_id)
+    NotesFolderService.get_trash_folder(db, user_id)
+    seed_tree(db, user_id, root_folder.id, branching=10, depth=3)
+    note_id = db.query(Note.id).filter(Note.user_id == user_id).first().id
+
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+    headers = {'Authorization': f'Bearer {create_access_token(data={"sub": str(user_id)})}'}
+
+    rows = []
+    for path in ('/notes/folders/', f'/notes/{note_id}/'):
+        url = f'{settings.API_V1_STR}{path}'
+        etag = client.get(url, headers=headers).headers['ETag']
+
+        for name, poll_headers in (('full', headers), ('If-None-Match', {**headers, 'If-None-Match': etag})):
+            def poll():
+                # start from an empty identity map, as a new request does
+                db.expire_all()
+                return client.get(url, headers=poll_headers)
+
+            with count_queries(engine) as statements, count_fetched_bytes(engine) as sizes:
+                response = poll()
+            rows.append([
+                path, name, response.status_code, len(statements), f'{sum(sizes) / 1024:.1f}',
+                f'{len(response.content) / 1024:.1f}', f'{measure(poll, repeat=args.polls):.2f}',
+            ])
+
+    app.dependency_overrides.clear()
+    print_table(['endpoint', 'poll', 'status', 'queries', 'fetched KB', 'response KB', 'best ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Measures peak RSS growth of exporting all notes of an account to a ZIP archive:
+loading full ORM notes with .all() (previous implementation) against streaming notes columns through yield_per.
+Each export runs in a separate process, so peaks of different runs do not affect each other.
+
+Usage: python scripts/benchmarks/export_memory.py [--database-url postgresql://...] [--body-size 4096]
+"""
+import argparse
+import os
+import resource
+import secrets
+import subprocess
+import sys
+import tempfile
+
+from common import create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser, print_table
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.const.notes import ExportType
+from app.models.notes import Note
+from app.services.notes_export_service import NotesExportService
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_service import NoteService
+
+NOTES_COUNTS = (1000, 10000, 50000)
+MODES = ('orm_all', 'streaming')
+
+
+def get_peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak_rss / 1024 / 1024 if sys.platform == 'darwin' else peak_rss / 1024
+
+
+def seed_notes(database_url: str, notes_count: int, body_size: int) -> int:
+    engine = create_benchmark_engine(database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+    root_folder = NotesFolderService.get_root_folder(db, user_id)
+
+    batch_size = 1000
+    for offset in range(0, notes_count, batch_size):
+        db.execute(insert(Note), [
+            {
+                'user_id': user_id,
+                'folder_id': root_folder.id,
+                'title': f'Note {i}',
+                'body': f'<p>{secrets.token_hex(body_size // 2)}</p>',
+                'is_deleted': False,
+            }
+            for i in range(offset, min(offset + batch_size, notes_count))
+        ])
+        db.commit()
+    db.close()
+    engine.dispose()
+    return user_id
+
+
+def run_export(database_url: str, user_id: int, mode: str) -> None:
+    """ Runs in a child process and prints peak RSS growth in MB """
+    db = Session(bind=create_engine(database_url))
+    rss_before = get_peak_rss_mb()
+
+    if mode == 'orm_all':
+        notes = NoteService.get_base_query(db).filter(Note.user_id == user_id).all()
+        zip_chunks = NotesExportService._create_zip_archive(notes, ExportType.HTML)
+    else:
+        zip_chunks, _ = NotesExportService.export_all_notes(db, user_id, ExportType.HTML)
+
+    archive_size = sum(len(chunk) for chunk in zip_chunks)
+    print(f'{get_peak_rss_mb() - rss_before:.1f} {archive_size / 1024 / 1024:.1f}')
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--body-size', type=int, default=4096)
+    parser.add_argument('--child', nargs=2, metavar=('USER_ID', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url == 'sqlite:///:memory:':
+        # in-memory database can't be shared with child processes
+        database_url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "benchmark.db")}'
+
+    if args.child:
+        user_id, mode = args.child
+        run_export(database_url, int(user_id), mode)
+        return
+
+    rows = []
+    for notes_count in NOTES_COUNTS:
+        user_id = seed_notes(database_url, notes_count, args.body_size)
+        for mode in MODES:
+            output = subprocess.check_output([
+                sys.executable, __file__, '--database-url', database_url, '--child', str(user_id), mode
+            ], text=True)
+            rss_growth, archive_size = output.split()
+            rows.append([notes_count, mode, archive_size, rss_growth])
+
+    print_table(['notes', 'mode', 'archive MB', 'peak RSS growth MB'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmarks loading a notes folders tree of ~1000 folders: lazy walk over folder.subfolders/folder.notes relationships
+(previous implementation, loading note bodies) against a WITH RECURSIVE query for folders
+and a single query for notes metadata.
+
+Usage: python scripts/benchmarks/folders_tree.py [--database-url postgresql://...] [--branching 10] [--depth 3]
+"""
+from common import (
+    count_fetched_bytes, count_queries, create_benchmark_engine, create_benchmark_session, create_benchmark_user,
+    get_arg_parser, measure, print_table,
+)
+
+from sqlalchemy import insert
+
+from app.models.notes import Note, NotesFolder
+from app.schemas.notes_folders import GetFolderrsResponseSchema, NotesFolderResponseSchema
+from app.services.notes_folders_service import NotesFolderService
+
+
+def seed_tree(db, user_id: int, parent_id: int, branching: int, depth: int) -> int:
+    """ Creates branching^1 + ... + branching^depth folders with a note in each, returns folders count """
+    folders_count = 0
+    parent_ids = [parent_id]
+    for level in range(depth):
+        folders = [
+            {'user_id': user_id, 'parent_id': parent_id, 'folder_type': 'regular', 'name': f'Folder {level}.{i}',
+             'is_deleted': False}
+            for parent_id in parent_ids for i in range(branching)
+        ]
+        parent_ids = list(db.scalars(insert(NotesFolder).returning(NotesFolder.id), folders))
+        db.execute(insert(Note), [
+            {'user_id': user_id, 'folder_id': folder_id, 'title': 'Note', 'body': '<p>Body</p>' * 100,
+             'is_deleted': False}
+            for folder_id in parent_ids
+        ])
+        folders_count += len(parent_ids)
+    db.commit()
+    return folders_count
+
+
+def get_folders_lazy(db, user_id: int) -> dict:
+    """ Previous implementation: schemas are validated from ORM folders, loading relationships level by level """
+    root_folder = NotesFolderService.get_root_folder(db, user_id)
+    trash_folder = NotesFolderService.get_trash_folder(db, user_id)
+    return GetFolderrsResponseSchema(
+        root_folder=NotesFolderResponseSchema.model_validate(root_folder),
+        trash_folder=NotesFolderResponseSchema.model_validate(trash_folder),
+    ).model_dump()
+
+
+def get_folders_tree(db, user_id: int) -> dict:
+    return GetFolderrsResponseSchema.model_validate(NotesFolderService.get_folders(db, user_id)).model_dump()
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--branching', type=int, default=10)
+    parser.add_argument('--depth', type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+    root_folder = NotesFolderService.get_root_folder(db, user_id)
+    NotesFolderService.get_trash_folder(db, user_id)
+    folders_count = seed_tree(db, user_id, root_folder.id, args.branching, args.depth)
+
+    rows = []
+    for name, func in (('lazy relationships', get_folders_lazy), ('recursive CTE', get_folders_tree)):
+        def run():
+            # start from an empty identity map, as a new request does
+            db.expire_all()
+            func(db, user_id)
+
+        with count_queries(engine) as statements, count_fetched_bytes(engine) as sizes:
+            run()
+        rows.append([name, folders_count, len(statements), f'{sum(sizes) / 1024:.0f}', f'{measure(run):.1f}'])
+
+    print_table(['GET /notes/folders/', 'folders', 'queries', 'fetched KB', 'best ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmarks title and body extraction of imported HTML notes with each installed parser backend,
+on small, medium and huge notes, with and without sanitization of the extracted body.
+
+Usage: python scripts/benchmarks/notes_html_parser.py
+"""
+import argparse
+
+from common import measure, print_table
+
+from app.services.notes_parser import get_html_parser_backends, parse_html
+from app.services.notes_service import NoteService
+
+PARAGRAPH = (
+    '<p>Some <b>bold</b> and <i>italic</i> text with a <a href="https://example.com" target="_blank">link</a>'
+    ' &amp; entities.</p>\n'
+    '<ul data-type="taskList"><li data-type="taskItem"><p>task</p></li></ul>\n'
+)
+NOTES = {
+    'small (1KB)': 6,
+    'medium (100KB)': 600,
+    'huge (5MB)': 30000,
+}
+
+
+def make_note(paragraphs_count: int) -> str:
+    return (
+        '<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>Note</title></head>\n<body>\n<h1>Note</h1>\n'
+        + PARAGRAPH * paragraphs_count
+        + '</body>\n</html>\n'
+    )
+
+
+def parse_and_clean(content: str, backend: str) -> None:
+    _, body = parse_html(content, backend)
+    NoteService.clean_html(body)
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__).parse_args()
+
+    rows = []
+    for name, paragraphs_count in NOTES.items():
+        content = make_note(paragraphs_count)
+        repeat = 1 if paragraphs_count > 1000 else 20
+        for backend in get_html_parser_backends():
+            rows.append([
+                name,
+                backend.value,
+                f'{measure(lambda: parse_html(content, backend), repeat=repeat):.2f}',
+                f'{measure(lambda: parse_and_clean(content, backend), repeat=repeat):.2f}',
+            ])
+
+    print_table(['note', 'backend', 'parse best ms', 'parse + sanitize best ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
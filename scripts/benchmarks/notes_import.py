@@ -0,0 +1,78 @@
+"""
+Benchmarks importing a ZIP archive of Markdown notes in nested folders: creating each folder and note
+with a separate commit (previous implementation) against batched inserts within a single transaction.
+Commits are much more expensive on PostgreSQL with fsync than on in-memory SQLite.
+
+Usage: python scripts/benchmarks/notes_import.py [--database-url postgresql://...]
+"""
+import io
+import zipfile
+
+from common import (
+    count_queries, create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser,
+    measure, print_table,
+)
+
+from app.schemas.notes_folders import NotesFolderCreateSchema
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_import_service import NotesImportService
+
+FILES_COUNTS = (100, 500, 2000)
+FOLDERS_COUNT = 20
+
+
+def make_archive(files_count: int) -> bytes:
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for i in range(files_count):
+            zip_file.writestr(
+                f'folder {i % FOLDERS_COUNT}/subfolder {i % 3}/note {i}.md',
+                f'# Note {i}\n\nSome **text** of note {i}\n\n- item 1\n- item 2\n'
+            )
+    return zip_buffer.getvalue()
+
+
+def import_one_by_one(db, zip_content: bytes, folder_id: int, user_id: int) -> None:
+    with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_ref:
+        folders_map = {'': folder_id}
+        for file_info in zip_ref.infolist():
+            path_parts = file_info.filename.split('/')
+            current_path = ''
+            for part in path_parts[:-1]:
+                full_part_path = f'{current_path}/{part}'.strip('/')
+                if full_part_path not in folders_map:
+                    folders_map[full_part_path] = NotesFolderService.create_folder(
+                        db, user_id, NotesFolderCreateSchema(parent_id=folders_map[current_path], name=part)
+                    ).id
+                current_path = full_part_path
+
+            NotesImportService.import_file(
+                db, user_id, path_parts[-1], zip_ref.read(file_info), folders_map[current_path]
+            )
+
+
+def import_bulk(db, zip_content: bytes, folder_id: int, user_id: int) -> None:
+    NotesImportService.import_zip(db, user_id, zip_content, folder_id)
+
+
+def main():
+    args = get_arg_parser(__doc__).parse_args()
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+    root_folder_id = NotesFolderService.get_root_folder(db, user_id).id
+
+    rows = []
+    for files_count in FILES_COUNTS:
+        zip_content = make_archive(files_count)
+        for name, func in (('one by one', import_one_by_one), ('bulk', import_bulk)):
+            with count_queries(engine) as statements:
+                func(db, zip_content, root_folder_id, user_id)
+            elapsed = measure(lambda: func(db, zip_content, root_folder_id, user_id), repeat=3)
+            rows.append([name, files_count, len(statements), f'{elapsed:.1f}', f'{files_count / elapsed * 1000:.0f}'])
+
+    print_table(['import', 'files', 'queries', 'best ms', 'files/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
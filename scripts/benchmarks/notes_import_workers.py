@@ -0,0 +1,85 @@
+"""
+Benchmarks importing vaults of Markdown notes of different sizes with files parsed and sanitized in the importing
+thread, by always started worker processes and by the default pool, which starts workers only for imports
+of at least 2 * workers chunks. Shows the import size above which starting workers pays off.
+Notes are inserted by the importing thread only.
+
+Usage: python scripts/benchmarks/notes_import_workers.py [--database-url postgresql://...]
+    [--files 50 200 400 1000 5000] [--workers 2]
+"""
+import io
+import os
+import time
+import zipfile
+
+from common import create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser, print_table
+
+from app.const.notes import IMPORT_PARSE_CHUNK_SIZE
+from app.core.config import settings
+from app.services import notes_import_service
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_import_service import NotesImportService
+from app.services.notes_parse_pool import NotesParsePool
+
+FOLDERS_COUNT = 50
+NOTE_TEMPLATE = '''# Note {i}
+
+Some **bold** and _italic_ text with a [link](https://example.com/{i}) and `code`.
+
+- [ ] task {i}
+- [x] done task
+
+| column 1 | column 2 |
+| -------- | -------- |
+| cell {i} | cell     |
+
+''' + 'A paragraph of a longer note with some text in it.\n\n' * 20
+
+
+def make_vault(files_count: int) -> bytes:
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for i in range(files_count):
+            zip_file.writestr(f'folder {i % FOLDERS_COUNT}/note {i}.md', NOTE_TEMPLATE.format(i=i))
+    return zip_buffer.getvalue()
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--files', type=int, nargs='+', default=[50, 200, 400, 1000, 5000])
+    parser.add_argument('--workers', type=int, default=max(settings.NOTES_IMPORT_WORKERS, 1))
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+    root_folder_id = NotesFolderService.get_root_folder(db, user_id).id
+    pools = {
+        'in thread': NotesParsePool(max_workers=0, chunk_size=IMPORT_PARSE_CHUNK_SIZE),
+        'workers': NotesParsePool(max_workers=args.workers, chunk_size=IMPORT_PARSE_CHUNK_SIZE, min_chunks=1),
+        'default': NotesParsePool(max_workers=args.workers, chunk_size=IMPORT_PARSE_CHUNK_SIZE),
+    }
+
+    # warm up the forkserver, so its start is not measured, workers are started by each import
+    notes_import_service.notes_parse_pool = pools['workers']
+    NotesImportService.import_zip(db, user_id, make_vault(IMPORT_PARSE_CHUNK_SIZE * 2), root_folder_id)
+
+    rows = []
+    for files_count in args.files:
+        zip_content = make_vault(files_count)
+        row = [files_count]
+        for pool in pools.values():
+            notes_import_service.notes_parse_pool = pool
+            start = time.perf_counter()
+            NotesImportService.import_zip(db, user_id, zip_content, root_folder_id)
+            row.append(f'{time.perf_counter() - start:.2f}')
+        rows.append(row)
+    for pool in pools.values():
+        pool.shutdown()
+
+    print(f'{args.workers} workers, {os.cpu_count()} CPUs, seconds per import')
+    print_table(['files', *pools], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmarks re-importing a ZIP archive of Markdown notes into the same folder: a plain import, which creates
+duplicates of all notes, against an incremental import, which skips unchanged files by their content hash
+and updates changed notes in place. Each import gets a fresh folder, which is imported into first.
+
+Usage: python scripts/benchmarks/notes_reimport.py [--database-url postgresql://...]
+"""
+import io
+import itertools
+import time
+import zipfile
+
+from common import create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser, print_table
+
+from app.models.notes import Note
+from app.schemas.notes_folders import NotesFolderCreateSchema
+from app.services.notes_folders_service import NotesFolderService
+from app.services.notes_import_service import NotesImportService
+
+FILES_COUNT = 2000
+FOLDERS_COUNT = 20
+# share of files changed between the imports
+CHANGED_SHARES = (0, 0.1, 1)
+
+
+def make_archive(files_count: int, changed_count: int = 0) -> bytes:
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for i in range(files_count):
+            version = 'changed' if i < changed_count else 'original'
+            zip_file.writestr(
+                f'folder {i % FOLDERS_COUNT}/subfolder {i % 3}/note {i}.md',
+                f'# Note {i}\n\nSome **text** of note {i}, {version}\n\n- item 1\n- item 2\n'
+            )
+    return zip_buffer.getvalue()
+
+
+def main():
+    args = get_arg_parser(__doc__).parse_args()
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+    root_folder_id = NotesFolderService.get_root_folder(db, user_id).id
+    folder_names = (f'Import {i}' for i in itertools.count())
+
+    zip_content = make_archive(FILES_COUNT)
+    rows = []
+    for changed_share in CHANGED_SHARES:
+        changed_zip_content = make_archive(FILES_COUNT, int(FILES_COUNT * changed_share))
+        for name, incremental in (('plain', False), ('incremental', True)):
+            folder_id = NotesFolderService.create_folder(
+                db, user_id, NotesFolderCreateSchema(parent_id=root_folder_id, name=next(folder_names))
+            ).id
+            NotesImportService.import_zip(db, user_id, zip_content, folder_id, incremental=incremental)
+            notes_count = db.query(Note).filter_by(user_id=user_id).count()
+
+            start = time.perf_counter()
+            result = NotesImportService.import_zip(db, user_id, changed_zip_content, folder_id, incremental=incremental)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            rows.append([
+                name, f'{changed_share:.0%}', result.created, result.updated, result.skipped,
+                db.query(Note).filter_by(user_id=user_id).count() - notes_count, f'{elapsed:.1f}',
+            ])
+
+    print_table(['import', 'changed', 'created', 'updated', 'skipped', 'new notes', 'ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Load benchmark of logins running concurrently with planner reads,
+with bcrypt work done in request threads and in the bounded password pool.
+
+Usage: python scripts/benchmarks/password_pool.py [--logins 200] [--reads 2000] [--concurrency 100] [--rounds 12]
+"""
+import asyncio
+import datetime as dt
+import os
+import statistics
+import tempfile
+import time
+
+from common import create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser, print_table
+
+import bcrypt
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.services import auth_utils
+from app.services.auth_service import AuthService
+from app.services.password_pool import PasswordPool, PasswordPoolFull
+from app.services.planner_day_service import PlannerDayItemService
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def create_app(engine, username: str, user_id: int) -> FastAPI:
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.post('/login/')
+    def login(db: Session = Depends(get_db)):
+        try:
+            user = AuthService.authenticate_user(db, username, BENCHMARK_PASSWORD)
+        except PasswordPoolFull:
+            raise HTTPException(status_code=429)
+        return {'id': user.id}
+
+    @app.get('/read/')
+    def read(db: Session = Depends(get_db)):
+        return {'items': len(PlannerDayItemService.get_items_by_days(db, [dt.date.today()], user_id))}
+
+    return app
+
+
+async def run_load(app: FastAPI, logins_count: int, reads_count: int, concurrency: int) -> dict:
+    results = {'login': [], 'read': [], 'rejected': 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://benchmark') as client:
+        async def send_request(method: str, path: str, kind: str):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.request(method, path)
+                if response.status_code == 429:
+                    results['rejected'] += 1
+                    return
+                response.raise_for_status()
+                results[kind].append((time.perf_counter() - start) * 1000)
+
+        requests = [send_request('POST', '/login/', 'login') for _ in range(logins_count)]
+        requests += [send_request('GET', '/read/', 'read') for _ in range(reads_count)]
+        start = time.perf_counter()
+        await asyncio.gather(*requests)
+        results['duration'] = time.perf_counter() - start
+    return results
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--reads', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=settings.BCRYPT_ROUNDS)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url == 'sqlite:///:memory:':
+        # requests run in different threads, use a file database to not share a single connection
+        database_url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "benchmark.db")}'
+
+    engine = create_benchmark_engine(database_url)
+    db = create_benchmark_session(engine)
+    user = create_benchmark_user(db)
+    user.hashed_password = bcrypt.hashpw(BENCHMARK_PASSWORD.encode(), bcrypt.gensalt(rounds=args.rounds)).decode()
+    db.commit()
+    username, user_id = user.username, user.id
+    db.close()
+
+    app = create_app(engine, username, user_id)
+    pools = {
+        'request threads': PasswordPool(max_workers=0, queue_size=0),
+        'password pool': PasswordPool(
+            max_workers=settings.PASSWORD_POOL_WORKERS, queue_size=settings.PASSWORD_POOL_QUEUE_SIZE
+        ),
+    }
+
+    rows = []
+    for name, pool in pools.items():
+        auth_utils.password_pool = pool
+        results = asyncio.run(run_load(app, args.logins, args.reads, args.concurrency))
+        pool.shutdown()
+
+        reads = sorted(results['read'])
+        p99 = reads[int(len(reads) * 0.99) - 1]
+        rows.append([
+            name,
+            f"{len(results['login']) / results['duration']:.1f}",
+            results['rejected'],
+            f'{statistics.median(reads):.1f}',
+            f'{p99:.1f}',
+        ])
+
+    print_table(['bcrypt in', 'logins/s', 'rejected', 'read p50 ms', 'read p99 ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
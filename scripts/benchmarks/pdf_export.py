@@ -0,0 +1,46 @@
+"""
+Measures wall-clock time of rendering notes to PDF for a folder export against the number of worker processes,
+0 workers renders notes serially in the calling thread (previous implementation).
+
+Usage: python scripts/benchmarks/pdf_export.py [--notes 500] [--workers 0 1 2 4 8]
+"""
+import os
+import time
+
+from common import get_arg_parser, print_table
+
+from app.core.config import settings
+from app.services.pdf_render_pool import PdfRenderPool
+
+NOTE_BODY = ''.join(
+    f'<h2>Section {i}</h2><p>{"Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 10}</p>'
+    '<ul><li>First</li><li>Second</li><li>Third</li></ul>'
+    for i in range(5)
+)
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--notes', type=int, default=500)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({0, 1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    notes = [(i, f'Note {i}', NOTE_BODY) for i in range(args.notes)]
+    rows = []
+    baseline = None
+    for workers in args.workers:
+        pool = PdfRenderPool(max_workers=workers, timeout=settings.EXPORT_PDF_TIMEOUT_SECONDS)
+        start = time.perf_counter()
+        results = list(pool.render_many(notes))
+        duration = time.perf_counter() - start
+        pool.shutdown()
+
+        baseline = baseline or duration
+        failed = sum(1 for _, content, _ in results if content is None)
+        rows.append([workers, f'{duration:.2f}', f'{len(notes) / duration:.1f}', f'{baseline / duration:.2f}x', failed])
+
+    print_table(['workers', 'seconds', 'notes/s', 'speedup', 'failed'], rows)
+
+
+if __name__ == '__main__':
+    main()
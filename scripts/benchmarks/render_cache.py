@@ -0,0 +1,70 @@
+"""
+Exports the same folder of notes twice, to measure cold and warm render cache timings.
+
+Usage: python scripts/benchmarks/render_cache.py [--database-url postgresql://...] [--notes 1000]
+    [--export-types markdown pdf]
+"""
+import shutil
+import tempfile
+import time
+
+from common import create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser, print_table
+
+from sqlalchemy import insert
+
+from app.const.notes import ExportType
+from app.models.notes import Note
+from app.schemas.notes_folders import NotesFolderCreateSchema
+from app.services.notes_export_service import NotesExportService
+from app.services.notes_folders_service import NotesFolderService
+from app.services.pdf_render_pool import pdf_render_pool
+from app.services.render_cache import render_cache
+
+NOTE_BODY = ''.join(
+    f'<h2>Section {i}</h2><p>{"Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 10}</p>'
+    '<ul><li>First</li><li>Second</li><li>Third</li></ul>'
+    for i in range(5)
+)
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--notes', type=int, default=1000)
+    parser.add_argument('--export-types', nargs='+', default=[ExportType.MARKDOWN.value, ExportType.PDF.value])
+    args = parser.parse_args()
+
+    db = create_benchmark_session(create_benchmark_engine(args.database_url))
+    user_id = create_benchmark_user(db).id
+    folder = NotesFolderService.create_folder(db, user_id, NotesFolderCreateSchema(name='Benchmark'))
+    db.execute(insert(Note), [
+        {'user_id': user_id, 'folder_id': folder.id, 'title': f'Note {i}', 'body': NOTE_BODY, 'is_deleted': False}
+        for i in range(args.notes)
+    ])
+    db.commit()
+
+    cache_dir = tempfile.mkdtemp()
+    render_cache.directory = cache_dir
+    rows = []
+    try:
+        for export_type in args.export_types:
+            render_cache.clear()
+            for run in ('cold', 'warm'):
+                start = time.perf_counter()
+                zip_chunks, _ = NotesExportService.export_folder(db, user_id, folder.id, ExportType(export_type))
+                archive_size = sum(len(chunk) for chunk in zip_chunks)
+                duration = time.perf_counter() - start
+
+                stats = render_cache.get_stats()
+                rows.append([
+                    export_type, run, f'{duration:.2f}', f'{archive_size / 1024 / 1024:.1f}',
+                    stats['hits'], stats['misses'],
+                ])
+    finally:
+        pdf_render_pool.shutdown()
+        shutil.rmtree(cache_dir)
+
+    print_table(['export type', 'run', 'seconds', 'archive MB', 'hits (total)', 'misses (total)'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmarks reordering of planner day items: per-item SELECTs (previous implementation)
+against a single ownership check and a single UPDATE ... CASE statement.
+
+Usage: python scripts/benchmarks/reorder.py [--database-url postgresql://...]
+"""
+import datetime as dt
+
+from common import (
+    count_queries, create_benchmark_engine, create_benchmark_session, create_benchmark_user, get_arg_parser,
+    measure, print_table,
+)
+
+from app.core.db_utils import atomic_transaction
+from app.models.planner import PlannerDayItem
+from app.services.planner_day_service import PlannerDayItemService
+
+ITEMS_COUNTS = (10, 100, 1000)
+
+
+def reorder_per_item(db, ordered_item_ids: list[int], user_id: int) -> None:
+    """ Previous implementation: validation and update issue one SELECT per item """
+    for item_id in ordered_item_ids:
+        PlannerDayItemService.get_day_item(db, item_id, user_id)
+
+    with atomic_transaction(db):
+        for new_index, item_id in enumerate(ordered_item_ids):
+            db_item = PlannerDayItemService.get_day_item(db, item_id, user_id)
+            if db_item:
+                db_item.index = new_index
+
+
+def reorder_set_based(db, ordered_item_ids: list[int], user_id: int) -> None:
+    PlannerDayItemService.get_existing_ids(db, ordered_item_ids, user_id)
+    PlannerDayItemService.reorder_day_items(db, ordered_item_ids, user_id)
+
+
+def main():
+    args = get_arg_parser(__doc__).parse_args()
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+
+    rows = []
+    for items_count in ITEMS_COUNTS:
+        day = dt.date(2026, 1, 1) + dt.timedelta(days=items_count)
+        items = [PlannerDayItem(text=f'Item {i}', index=i, day=day, user_id=user_id) for i in range(items_count)]
+        db.add_all(items)
+        db.commit()
+        item_ids = [item.id for item in reversed(items)]
+
+        for name, func in (('per item', reorder_per_item), ('set based', reorder_set_based)):
+            with count_queries(engine) as statements:
+                func(db, item_ids, user_id)
+            timing = measure(lambda: func(db, item_ids, user_id))
+            rows.append([items_count, name, len(statements), f'{timing:.1f}'])
+
+    print_table(['items', 'implementation', 'queries', 'best ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmarks a client polling for changes: re-fetching a year of planner items and the folders tree
+against GET /sync/changes/ since the previous change sequence, with a few rows changed between polls.
+
+Usage: python scripts/benchmarks/sync_changes.py [--database-url postgresql://...] [--items-per-day 10]
+"""
+import datetime as dt
+
+from common import (
+    count_fetched_bytes, count_queries, create_benchmark_engine, create_benchmark_session, create_benchmark_user,
+    get_arg_parser, measure, print_table,
+)
+from folders_tree import seed_tree
+
+from sqlalchemy import insert
+
+from app.models.planner import PlannerDayItem
+from app.services.notes_folders_service import NotesFolderService
+from app.services.planner_day_service import PlannerDayItemService
+from app.services.sync_service import SyncService
+
+START_DAY = dt.date(2026, 1, 1)
+DAYS_COUNT = 365
+
+
+def main():
+    parser = get_arg_parser(__doc__)
+    parser.add_argument('--items-per-day', type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_benchmark_engine(args.database_url)
+    db = create_benchmark_session(engine)
+    user_id = create_benchmark_user(db).id
+    db.execute(insert(PlannerDayItem), [
+        {'user_id': user_id, 'day': START_DAY + dt.timedelta(days=day), 'text': f'Item {i}', 'index': i,
+         'state': 'todo', 'is_deleted': False}
+        for day in range(DAYS_COUNT) for i in range(args.items_per_day)
+    ])
+    root_folder = NotesFolderService.get_root_folder(db, user_id)
+    NotesFolderService.get_trash_folder(db, user_id)
+    seed_tree(db, user_id, root_folder.id, branching=10, depth=2)
+    since = SyncService.get_change_seq(db, user_id)
+
+    # a few changes made on another device
+    for item in PlannerDayItemService.get_items_by_range(db, START_DAY, 1, user_id)[START_DAY][:5]:
+        item.text = f'{item.text} changed'
+    db.commit()
+
+    def refetch():
+        db.expire_all()
+        PlannerDayItemService.get_items_by_range(db, START_DAY, DAYS_COUNT, user_id)
+        NotesFolderService.get_folders(db, user_id)
+
+    def sync():
+        db.expire_all()
+        SyncService.get_changes(db, user_id, since=since)
+
+    rows = []
+    for name, func in (('re-fetch range and tree', refetch), ('changes since', sync)):
+        with count_queries(engine) as statements, count_fetched_bytes(engine) as sizes:
+            func()
+        rows.append([name, len(statements), f'{sum(sizes) / 1024:.1f}', f'{measure(func):.1f}'])
+
+    print_table(['poll', 'queries', 'fetched KB', 'best ms'], rows)
+
+
+if __name__ == '__main__':
+    main()